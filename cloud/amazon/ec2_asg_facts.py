@@ -209,6 +209,15 @@ def match_asg_tags(tags_to_match, asg):
         else: return False
     return True
 
+def exact_asg_name(name):
+    """
+    Return the group name matched by name if name only matches one complete
+    name, i.e. it ends with '$' and has no other regular expression syntax.
+    """
+    if name.endswith('$') and not re.search(r'[\\^$.|?*+()\[\]{}]', name[:-1]):
+        return name[:-1]
+    return None
+
 def find_asgs(conn, module, name=None, tags=None):
     """
     Args:
@@ -293,8 +302,14 @@ def find_asgs(conn, module, name=None, tags=None):
         ]
     """
 
+    params = {}
+    if name is not None and exact_asg_name(name):
+        # A complete name match can be done by the API
+        params['AutoScalingGroupNames'] = [exact_asg_name(name)]
+
     try:
-        asgs = conn.describe_auto_scaling_groups()
+        paginator = conn.get_paginator('describe_auto_scaling_groups')
+        asgs = paginator.paginate(**params).build_full_result()
     except ClientError as e:
         module.fail_json(msg=e.message, **camel_dict_to_snake_dict(e.response))
 
@@ -304,7 +319,7 @@ def find_asgs(conn, module, name=None, tags=None):
         # if the user didn't specify a name
         name_prog = re.compile(r'^' + name)
 
-    for asg in asgs['AutoScalingGroups']:
+    for asg in asgs.get('AutoScalingGroups', []):
         if name:
             matched_name = name_prog.search(asg['AutoScalingGroupName'])
         else:
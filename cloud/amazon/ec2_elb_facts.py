@@ -74,14 +74,58 @@ EXAMPLES = '''
 
 '''
 
+import threading
+import time
+
 try:
     import boto.ec2.elb
-    from boto.ec2.tag import Tag
     from boto.exception import BotoServerError
     HAS_BOTO = True
 except ImportError:
     HAS_BOTO = False
 
+# DescribeLoadBalancers and DescribeTags take at most 20 names per call
+NAMES_PER_CALL = 20
+# Concurrent DescribeInstanceHealth calls
+HEALTH_WORKERS = 8
+
+
+class ElbTag(object):
+    """ A Key/Value member of the Tags of an ELB in a DescribeTags response """
+
+    def __init__(self, connection=None):
+        self.key = None
+        self.value = None
+
+    def startElement(self, name, attrs, connection):
+        return None
+
+    def endElement(self, name, value, connection):
+        if name == 'Key':
+            self.key = value
+        elif name == 'Value':
+            self.value = value
+
+
+class ElbTagDescription(object):
+    """ A member of a DescribeTags response: the name of an ELB and its tags """
+
+    def __init__(self, connection=None):
+        self.load_balancer_name = None
+        self.tags = []
+
+    def startElement(self, name, attrs, connection):
+        if name == 'member':
+            tag = ElbTag()
+            self.tags.append(tag)
+            return tag
+        return None
+
+    def endElement(self, name, value, connection):
+        if name == 'LoadBalancerName':
+            self.load_balancer_name = value
+
+
 class ElbInformation(object):
     """ Handles ELB information """
 
@@ -97,13 +141,73 @@ class ElbInformation(object):
         self.aws_connect_params = aws_connect_params
         self.connection = self._get_elb_connection()
 
-    def _get_tags(self, elbname):
-        params = {'LoadBalancerNames.member.1': elbname}
-        try:
-            elb_tags = self.connection.get_list('DescribeTags', params, [('member', Tag)])
-            return dict((tag.Key, tag.Value) for tag in elb_tags if hasattr(tag, 'Key'))
-        except:
-            return {}
+    def _retry_throttled(self, call, *args, **kwargs):
+        """ Call call, backing off exponentially while AWS throttles requests """
+        wait = 1
+        while True:
+            try:
+                return call(*args, **kwargs)
+            except BotoServerError as err:
+                if err.error_code == 'Throttling' and wait < 60:
+                    time.sleep(wait)
+                    wait = wait * 2
+                    continue
+                raise
+
+    def _get_tags(self, elbnames):
+        """ Tags of every ELB in elbnames, as a dict of dicts by ELB name, asking for 20 ELBs per call """
+        tags = dict((name, {}) for name in elbnames)
+        for i in range(0, len(elbnames), NAMES_PER_CALL):
+            params = {}
+            for n, name in enumerate(elbnames[i:i + NAMES_PER_CALL]):
+                params['LoadBalancerNames.member.%d' % (n + 1)] = name
+            try:
+                descriptions = self._retry_throttled(self.connection.get_list, 'DescribeTags', params,
+                                                     [('member', ElbTagDescription)])
+            except BotoServerError:
+                continue
+            for description in descriptions:
+                if description.load_balancer_name in tags:
+                    tags[description.load_balancer_name] = dict((tag.key, tag.value) for tag in description.tags
+                                                                if tag.key is not None)
+        return tags
+
+    def _get_instance_health(self, elbs):
+        """
+        Instance health of every ELB in elbs that has instances, as a dict by
+        ELB name, from up to HEALTH_WORKERS concurrent calls.
+        """
+        pending = [elb.name for elb in elbs if elb.instances]
+        health = {}
+        errors = []
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                lock.acquire()
+                try:
+                    if not pending or errors:
+                        return
+                    name = pending.pop(0)
+                finally:
+                    lock.release()
+                try:
+                    health[name] = self._retry_throttled(self.connection.describe_instance_health, name)
+                except BotoServerError as err:
+                    errors.append(err)
+
+        workers = []
+        for n in range(min(HEALTH_WORKERS, len(pending))):
+            t = threading.Thread(target=worker)
+            t.daemon = True
+            t.start()
+            workers.append(t)
+        for t in workers:
+            t.join()
+
+        if errors:
+            self.module.fail_json(msg=errors[0].message)
+        return health
 
     def _get_elb_connection(self):
         try:
@@ -155,7 +259,7 @@ class ElbInformation(object):
             health_check_dict['ping_path'] = path
         return health_check_dict
 
-    def _get_elb_info(self, elb):
+    def _get_elb_info(self, elb, tags, instance_health):
         elb_info = {
             'name': elb.name,
             'zones': elb.availability_zones,
@@ -175,17 +279,13 @@ class ElbInformation(object):
             'instances_outofservice': [],
             'instances_outofservice_count': 0,
             'instances_inservice_percent': 0.0,
-            'tags': self._get_tags(elb.name)
+            'tags': tags
         }
 
         if elb.vpc_id:
             elb_info['vpc_id'] = elb.vpc_id
 
         if elb.instances:
-            try:
-                instance_health = self.connection.describe_instance_health(elb.name)
-            except BotoServerError as err:
-                self.module.fail_json(msg=err.message)
             elb_info['instances_inservice'] = [inst.instance_id for inst in instance_health if inst.state == 'InService']
             elb_info['instances_inservice_count'] = len(elb_info['instances_inservice'])
             elb_info['instances_outofservice'] = [inst.instance_id for inst in instance_health if inst.state == 'OutOfService']
@@ -196,20 +296,44 @@ class ElbInformation(object):
         return elb_info
 
 
-    def list_elbs(self):
-        elb_array = []
+    def _get_all_load_balancers(self, names=None):
+        """ Every ELB, or the ELBs in names, following the pagination markers """
+        elbs = []
+        marker = None
+        while True:
+            page = self._retry_throttled(self.connection.get_all_load_balancers,
+                                         load_balancer_names=names, marker=marker)
+            elbs.extend(page)
+            marker = getattr(page, 'next_marker', None)
+            if not marker:
+                return elbs
+
+    def _get_elbs(self):
+        if not self.names:
+            return self._get_all_load_balancers()
+
+        elbs = []
+        try:
+            for i in range(0, len(self.names), NAMES_PER_CALL):
+                elbs.extend(self._get_all_load_balancers(self.names[i:i + NAMES_PER_CALL]))
+        except BotoServerError as err:
+            if err.error_code != 'LoadBalancerNotFound':
+                raise
+            # Names that do not exist are skipped rather than reported
+            elbs = [elb for elb in self._get_all_load_balancers() if elb.name in self.names]
+        return elbs
 
+    def list_elbs(self):
         try:
-            all_elbs = self.connection.get_all_load_balancers()
+            elbs = self._get_elbs()
         except BotoServerError as err:
             self.module.fail_json(msg = "%s: %s" % (err.error_code, err.error_message))
 
-        if all_elbs:
-            for existing_lb in all_elbs:
-                if existing_lb.name in self.names:
-                    elb_array.append(self._get_elb_info(existing_lb))
+        tags = self._get_tags([elb.name for elb in elbs])
+        instance_health = self._get_instance_health(elbs)
 
-        return elb_array
+        return [self._get_elb_info(elb, tags.get(elb.name, {}), instance_health.get(elb.name, []))
+                for elb in elbs]
 
 def main():
     argument_spec = ec2_argument_spec()
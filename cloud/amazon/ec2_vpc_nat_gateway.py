@@ -219,6 +219,14 @@ import time
 
 from dateutil.tz import tzutc
 
+# First and longest sleep between two polls while waiting, in seconds
+WAIT_DELAY = 1
+WAIT_MAX_DELAY = 30
+# Error codes of requests refused because of the API rate limit
+THROTTLING_ERRORS = (
+    'Throttling', 'ThrottlingException', 'RequestLimitExceeded'
+)
+
 DRY_RUN_GATEWAYS = [
     {
         "nat_gateway_id": "nat-123456789",
@@ -388,6 +396,147 @@ def get_nat_gateways(client, subnet_id=None, nat_gateway_id=None,
     return gateways_retrieved, err_msg, existing_gateways
 
 
+# wait_for_resources is duplicated byte for byte in cloud/amazon/kinesis_stream.py
+# and cloud/amazon/ec2_vpc_nat_gateway.py until it can move to module_utils.
+# Keep the two copies identical.
+def wait_for_resources(describe, ids, done, wait_timeout=300):
+    """Poll many resources at once until all of them are done.
+    Every poll calls describe once for all resources that are not done yet.
+    Polls are spaced by a jittered, exponentially growing delay, which jumps
+    to the longest delay when AWS throttles the requests.
+    Args:
+        describe (function): Takes a list of ids, returns a dict of the
+            resources found by id.
+        ids (list): The ids of the resources to wait for.
+        done (function): Takes an id and its resource, or None when it was
+            not found, and tells whether that resource is done. It raises
+            ValueError when the resource can no longer get done.
+
+    Kwargs:
+        wait_timeout (int): Number of seconds to wait, until this timeout is reached.
+
+    Basic Usage:
+        >>> describe = lambda ids: dict((i, get_resource(client, i)) for i in ids)
+        >>> wait_for_resources(describe, ['id-1', 'id-2'], lambda i, r: r and r['state'] == 'ready')
+
+    Returns:
+        Tuple (bool, str, dict)
+    """
+    deadline = time.time() + wait_timeout
+    delay = WAIT_DELAY
+    pending = list(ids)
+    resources = dict()
+    err_msg = ''
+
+    while True:
+        throttled = False
+        try:
+            found = describe(pending)
+            for resource_id in list(pending):
+                resource = found.get(resource_id)
+                if resource is not None:
+                    resources[resource_id] = resource
+                if done(resource_id, resource):
+                    pending.remove(resource_id)
+        except botocore.exceptions.ClientError as e:
+            err_msg = str(e)
+            throttled = e.response['Error']['Code'] in THROTTLING_ERRORS
+        except ValueError as e:
+            return False, str(e), resources
+
+        if not pending:
+            return True, '', resources
+
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return False, err_msg or "Wait time out reached, while waiting for results", resources
+
+        if throttled:
+            delay = WAIT_MAX_DELAY
+        time.sleep(min(random.uniform(delay / 2.0, delay), remaining))
+        delay = min(delay * 2, WAIT_MAX_DELAY)
+
+
+def describe_nat_gateways(client, nat_gateway_ids, check_mode=False):
+    """Retrieve many NAT Gateways with one call
+    Args:
+        client (botocore.client.EC2): Boto3 client
+        nat_gateway_ids (list): The Amazon nat ids.
+
+    Basic Usage:
+        >>> client = boto3.client('ec2')
+        >>> describe_nat_gateways(client, ['nat-123456789'])
+        {
+            "nat-123456789": {
+                "nat_gateway_id": "nat-123456789",
+                "state": "available",
+                ...
+            }
+        }
+
+    Returns:
+        Dict
+    """
+    gateways = dict()
+    if check_mode:
+        for gw in DRY_RUN_GATEWAYS:
+            if gw['nat_gateway_id'] in nat_gateway_ids:
+                gateways[gw['nat_gateway_id']] = gw
+        return gateways
+
+    params = {
+        'NatGatewayIds': nat_gateway_ids,
+    }
+    try:
+        for gw in client.describe_nat_gateways(**params)['NatGateways']:
+            gateways[gw['NatGatewayId']] = convert_to_lower(gw)
+    except botocore.exceptions.ClientError as e:
+        # Gateways created a moment ago may not be visible yet
+        if e.response['Error']['Code'] != 'NatGatewayNotFound':
+            raise
+    return gateways
+
+
+def wait_for_gateways(client, wait_timeout, nat_gateway_ids, status,
+                      check_mode=False):
+    """Wait for many NAT Gateways to reach a status, describing them all
+    with one call per poll
+    Args:
+        client (botocore.client.EC2): Boto3 client
+        wait_timeout (int): Number of seconds to wait, until this timeout is reached.
+        nat_gateway_ids (list): The Amazon nat ids.
+        status (str): The status to wait for.
+            examples. status=available, status=deleted
+
+    Basic Usage:
+        >>> client = boto3.client('ec2')
+        >>> wait_for_gateways(client, 300, ['nat-1', 'nat-2'], 'available')
+
+    Returns:
+        Tuple (bool, str, dict)
+    """
+    def describe(ids):
+        return describe_nat_gateways(client, ids, check_mode=check_mode)
+
+    def done(nat_gateway_id, nat_gateway):
+        if nat_gateway is None:
+            # Deleted gateways disappear after a while
+            return status == 'deleted' and not check_mode
+        if check_mode:
+            nat_gateway['state'] = status
+
+        if nat_gateway.get('state') == status:
+            return True
+        elif nat_gateway.get('state') == 'failed':
+            raise ValueError(nat_gateway.get('failure_message'))
+        elif nat_gateway.get('state') == 'pending':
+            if 'failure_message' in nat_gateway:
+                raise ValueError(nat_gateway.get('failure_message'))
+        return False
+
+    return wait_for_resources(describe, nat_gateway_ids, done, wait_timeout)
+
+
 def wait_for_status(client, wait_timeout, nat_gateway_id, status,
                     check_mode=False):
     """Wait for the NAT Gateway to reach a status
@@ -427,48 +576,13 @@ def wait_for_status(client, wait_timeout, nat_gateway_id, status,
     Returns:
         Tuple (bool, str, dict)
     """
-    polling_increment_secs = 5
-    wait_timeout = time.time() + wait_timeout
-    status_achieved = False
-    nat_gateway = dict()
-    states = ['pending', 'failed', 'available', 'deleting', 'deleted']
-    err_msg = ""
-
-    while wait_timeout > time.time():
-        try:
-            gws_retrieved, err_msg, nat_gateways = (
-                get_nat_gateways(
-                    client, nat_gateway_id=nat_gateway_id,
-                    states=states, check_mode=check_mode
-                )
-            )
-            if gws_retrieved and nat_gateways:
-                nat_gateway = nat_gateways[0]
-                if check_mode:
-                    nat_gateway['state'] = status
-
-                if nat_gateway.get('state') == status:
-                    status_achieved = True
-                    break
-
-                elif nat_gateway.get('state') == 'failed':
-                    err_msg = nat_gateway.get('failure_message')
-                    break
-
-                elif nat_gateway.get('state') == 'pending':
-                    if 'failure_message' in nat_gateway:
-                        err_msg = nat_gateway.get('failure_message')
-                        status_achieved = False
-                        break
-
-            else:
-                time.sleep(polling_increment_secs)
-
-        except botocore.exceptions.ClientError as e:
-            err_msg = str(e)
-
-    if not status_achieved:
-        err_msg = "Wait time out reached, while waiting for results"
+    status_achieved, err_msg, nat_gateways = (
+        wait_for_gateways(
+            client, wait_timeout, [nat_gateway_id], status,
+            check_mode=check_mode
+        )
+    )
+    nat_gateway = nat_gateways.get(nat_gateway_id, dict())
 
     return status_achieved, err_msg, nat_gateway
 
@@ -31,8 +31,11 @@ options:
     required: true
   shards:
     description:
-      - "The number of shards you want to have with this stream. This can not
-      be modified after being created."
+      - "The number of shards you want to have with this stream."
+      - "When it differs from the number of open shards of an existing stream, the stream is resharded in as few
+      steps as possible: UpdateShardCount calls that at most double or halve the shard count each, or, with
+      versions of botocore that lack UpdateShardCount, one SplitShard or MergeShards call per shard added or
+      removed. The stream has to become ACTIVE again between two steps."
       - "This is required when state == present"
     required: false
     default: None
@@ -65,6 +68,16 @@ options:
     required: false
     default: null
     aliases: [ "resource_tags" ]
+  streams:
+    description:
+      - "A list of streams to manage in this one task, each a dictionary with the C(name), C(shards),
+      C(retention_period), C(tags) and C(state) keys. Missing keys default to the module parameters. All streams
+      are created or deleted first and then waited on together, after which the streams are updated
+      concurrently."
+      - "Mutually exclusive with name."
+    required: false
+    default: null
+    version_added: "2.3"
 extends_documentation_fragment:
     - aws
     - ec2
@@ -105,6 +118,23 @@ EXAMPLES = '''
     wait_timeout: 600
   register: test_stream
 
+# Create or reshard several streams in one task
+- name: Set up the Kinesis Streams of the ingest pipeline
+  kinesis_stream:
+    streams:
+      - name: clicks
+        shards: 16
+      - name: impressions
+        shards: 8
+        retention_period: 48
+      - name: legacy-events
+        state: absent
+    tags:
+      Env: production
+    wait: yes
+    wait_timeout: 1200
+  register: pipeline_streams
+
 # Basic delete example:
 - name: Delete Kinesis Stream test-stream and wait for it to finish deleting.
   kinesis_stream:
@@ -144,6 +174,20 @@ tags:
       "Name": "Splunk",
       "Env": "development"
   }
+streams:
+  description: The facts of every stream managed with the streams option, with its success, changed and msg.
+  returned: when streams is used.
+  type: list
+  sample: [
+      {
+          "stream_name": "clicks",
+          "stream_status": "ACTIVE",
+          "open_shards_count": 16,
+          "success": true,
+          "changed": true,
+          "msg": "Kinesis Stream clicks updated successfully."
+      }
+  ]
 '''
 
 try:
@@ -155,9 +199,24 @@ except ImportError:
 
 import re
 import datetime
+import random
+import threading
 import time
 from functools import reduce
 
+# First and longest sleep between two polls while waiting, in seconds
+WAIT_DELAY = 1
+WAIT_MAX_DELAY = 30
+# Attempts of a throttled call before giving up
+WAIT_RETRIES = 8
+# Streams updated concurrently by manage_streams
+STREAM_WORKERS = 4
+# Error codes of requests refused because of the API rate limit
+THROTTLING_ERRORS = (
+    'LimitExceededException', 'Throttling', 'ThrottlingException',
+    'RequestLimitExceeded'
+)
+
 
 def convert_to_lower(data):
     """Convert all uppercase keys in dict with lowercase_
@@ -329,6 +388,7 @@ def find_stream(client, stream_name, check_mode=False):
                 has_more_shards = results['HasMoreShards']
             results['Shards'] = shards
             results['ShardsCount'] = len(shards)
+            results['OpenShardsCount'] = len(open_shards(shards))
         else:
             results = {
                 'HasMoreShards': True,
@@ -344,6 +404,306 @@ def find_stream(client, stream_name, check_mode=False):
     return success, err_msg, results
 
 
+def open_shards(shards):
+    """Return the shards that are still open, leaving out the closed parents
+    of earlier splits and merges.
+    Args:
+        shards (list): Shards of a Kinesis Stream, as returned by DescribeStream.
+
+    Basic Usage:
+        >>> open_shards(stream['Shards'])
+
+    Returns:
+        List
+    """
+    return [
+        shard for shard in shards
+        if 'EndingSequenceNumber' not in shard['SequenceNumberRange']
+    ]
+
+
+def plan_resharding(current_count, target_count):
+    """Compute the shard counts to pass to UpdateShardCount, one call at a
+    time, to go from current_count to target_count open shards. Every call
+    may at most double or halve the number of shards, so the plan doubles or
+    halves until target_count is within reach.
+    Args:
+        current_count (int): The number of open shards.
+        target_count (int): The number of shards wanted.
+
+    Basic Usage:
+        >>> plan_resharding(4, 20)
+        [8, 16, 20]
+
+    Returns:
+        List
+    """
+    steps = list()
+    count = current_count
+    while count < target_count:
+        count = min(count * 2, target_count)
+        steps.append(count)
+    while count > target_count:
+        count = max((count + 1) // 2, target_count)
+        steps.append(count)
+    return steps
+
+
+def next_split_or_merge(shards, target_count):
+    """Choose the SplitShard or MergeShards call that brings the open shards
+    one step closer to target_count. The shard covering the widest hash key
+    range is split in its middle, and the two adjacent shards covering the
+    narrowest hash key range together are merged, so the hash key space
+    stays evenly spread.
+    Args:
+        shards (list): Open shards of a Kinesis Stream.
+        target_count (int): The number of shards wanted.
+
+    Basic Usage:
+        >>> next_split_or_merge(open_shards(stream['Shards']), 20)
+        ('split', {'ShardToSplit': 'shardId-000000000000', 'NewStartingHashKey': '170141183460469231731687303715884105728'})
+
+    Returns:
+        Tuple (str, dict), or None when there are target_count shards
+    """
+    def hash_range(shard):
+        return (
+            int(shard['HashKeyRange']['StartingHashKey']),
+            int(shard['HashKeyRange']['EndingHashKey'])
+        )
+
+    if len(shards) < target_count:
+        shard = max(shards, key=lambda s: hash_range(s)[1] - hash_range(s)[0])
+        start, end = hash_range(shard)
+        return 'split', {
+            'ShardToSplit': shard['ShardId'],
+            'NewStartingHashKey': str((start + end + 1) // 2),
+        }
+    elif len(shards) > target_count:
+        ordered = sorted(shards, key=lambda s: hash_range(s)[0])
+        pairs = zip(ordered, ordered[1:])
+        first, second = min(
+            pairs, key=lambda p: hash_range(p[1])[1] - hash_range(p[0])[0]
+        )
+        return 'merge', {
+            'ShardToMerge': first['ShardId'],
+            'AdjacentShardToMerge': second['ShardId'],
+        }
+    return None
+
+
+def call_with_backoff(call, **params):
+    """Make an API call, retrying with a jittered, exponentially growing
+    delay while the account is over the API or shard limits.
+    Args:
+        call (function): Boto3 client method.
+
+    Basic Usage:
+        >>> call_with_backoff(client.update_shard_count, StreamName='test-stream', TargetShardCount=8,
+                              ScalingType='UNIFORM_SCALING')
+
+    Returns:
+        Dict
+    """
+    delay = WAIT_DELAY
+    for attempt in range(WAIT_RETRIES):
+        try:
+            return call(**params)
+        except botocore.exceptions.ClientError as e:
+            if (e.response['Error']['Code'] not in THROTTLING_ERRORS or
+                    attempt == WAIT_RETRIES - 1):
+                raise
+        time.sleep(random.uniform(delay / 2.0, delay))
+        delay = min(delay * 2, WAIT_MAX_DELAY)
+
+
+def reshard_stream(client, stream_name, target_count, wait_timeout=300,
+                   check_mode=False):
+    """Change the number of open shards of a Kinesis Stream, waiting for
+    the stream to become ACTIVE before every step.
+    Args:
+        client (botocore.client.EC2): Boto3 client.
+        stream_name (str): The name of the kinesis stream.
+        target_count (int): The number of shards wanted.
+
+    Kwargs:
+        wait_timeout (int): Number of seconds to wait for each step.
+        check_mode (bool): This will pass DryRun as one of the parameters to the aws api.
+            default=False
+
+    Basic Usage:
+        >>> client = boto3.client('kinesis')
+        >>> reshard_stream(client, 'test-stream', 20)
+
+    Returns:
+        Tuple (bool, bool, str)
+    """
+    if check_mode:
+        return True, True, ''
+
+    uniform = hasattr(client, 'update_shard_count')
+    try:
+        while True:
+            wait_success, wait_msg, _ = (
+                wait_for_streams(client, [stream_name], 'ACTIVE', wait_timeout)
+            )
+            if not wait_success:
+                return False, True, wait_msg
+
+            find_success, find_msg, stream = find_stream(client, stream_name)
+            if not find_success:
+                return False, True, find_msg
+            shards = open_shards(stream['Shards'])
+            if len(shards) == target_count:
+                break
+
+            if uniform:
+                call_with_backoff(
+                    client.update_shard_count, StreamName=stream_name,
+                    TargetShardCount=plan_resharding(len(shards), target_count)[0],
+                    ScalingType='UNIFORM_SCALING'
+                )
+            else:
+                action, params = next_split_or_merge(shards, target_count)
+                if action == 'split':
+                    call_with_backoff(client.split_shard, StreamName=stream_name, **params)
+                else:
+                    call_with_backoff(client.merge_shards, StreamName=stream_name, **params)
+    except botocore.exceptions.ClientError as e:
+        return False, True, str(e)
+
+    return True, True, (
+        'Kinesis Stream {0} resharded to {1} shards'
+        .format(stream_name, target_count)
+    )
+
+
+# wait_for_resources is duplicated byte for byte in cloud/amazon/kinesis_stream.py
+# and cloud/amazon/ec2_vpc_nat_gateway.py until it can move to module_utils.
+# Keep the two copies identical.
+def wait_for_resources(describe, ids, done, wait_timeout=300):
+    """Poll many resources at once until all of them are done.
+    Every poll calls describe once for all resources that are not done yet.
+    Polls are spaced by a jittered, exponentially growing delay, which jumps
+    to the longest delay when AWS throttles the requests.
+    Args:
+        describe (function): Takes a list of ids, returns a dict of the
+            resources found by id.
+        ids (list): The ids of the resources to wait for.
+        done (function): Takes an id and its resource, or None when it was
+            not found, and tells whether that resource is done. It raises
+            ValueError when the resource can no longer get done.
+
+    Kwargs:
+        wait_timeout (int): Number of seconds to wait, until this timeout is reached.
+
+    Basic Usage:
+        >>> describe = lambda ids: dict((i, get_resource(client, i)) for i in ids)
+        >>> wait_for_resources(describe, ['id-1', 'id-2'], lambda i, r: r and r['state'] == 'ready')
+
+    Returns:
+        Tuple (bool, str, dict)
+    """
+    deadline = time.time() + wait_timeout
+    delay = WAIT_DELAY
+    pending = list(ids)
+    resources = dict()
+    err_msg = ''
+
+    while True:
+        throttled = False
+        try:
+            found = describe(pending)
+            for resource_id in list(pending):
+                resource = found.get(resource_id)
+                if resource is not None:
+                    resources[resource_id] = resource
+                if done(resource_id, resource):
+                    pending.remove(resource_id)
+        except botocore.exceptions.ClientError as e:
+            err_msg = str(e)
+            throttled = e.response['Error']['Code'] in THROTTLING_ERRORS
+        except ValueError as e:
+            return False, str(e), resources
+
+        if not pending:
+            return True, '', resources
+
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return False, err_msg or "Wait time out reached, while waiting for results", resources
+
+        if throttled:
+            delay = WAIT_MAX_DELAY
+        time.sleep(min(random.uniform(delay / 2.0, delay), remaining))
+        delay = min(delay * 2, WAIT_MAX_DELAY)
+
+
+def describe_stream_status(client, stream_name):
+    """Retrieve the status of a Kinesis Stream, without paging through its shards.
+    Args:
+        client (botocore.client.EC2): Boto3 client.
+        stream_name (str): Name of the Kinesis stream.
+
+    Basic Usage:
+        >>> client = boto3.client('kinesis')
+        >>> describe_stream_status(client, 'test-stream')
+        'ACTIVE'
+
+    Returns:
+        String, or None if the stream does not exist
+    """
+    try:
+        return (
+            client.describe_stream(StreamName=stream_name, Limit=1)
+            ['StreamDescription']['StreamStatus']
+        )
+    except botocore.exceptions.ClientError as e:
+        if e.response['Error']['Code'] == 'ResourceNotFoundException':
+            return None
+        raise
+
+
+def wait_for_streams(client, stream_names, status, wait_timeout=300,
+                     check_mode=False):
+    """Wait for the status to change for many Kinesis Streams.
+    Args:
+        client (botocore.client.EC2): Boto3 client
+        stream_names (list): The names of the kinesis streams.
+        status (str): The status to wait for. DELETING waits until the
+            streams are gone.
+
+    Kwargs:
+        wait_timeout (int): Number of seconds to wait, until this timeout is reached.
+        check_mode (bool): This will pass DryRun as one of the parameters to the aws api.
+            default=False
+
+    Basic Usage:
+        >>> client = boto3.client('kinesis')
+        >>> wait_for_streams(client, ['stream-a', 'stream-b'], 'ACTIVE', 300)
+
+    Returns:
+        Tuple (bool, str, dict)
+    """
+    if check_mode:
+        return True, '', dict(
+            (name, find_stream(client, name, check_mode=True)[2])
+            for name in stream_names
+        )
+
+    def describe(names):
+        return dict(
+            (name, describe_stream_status(client, name)) for name in names
+        )
+
+    if status == 'DELETING':
+        done = lambda name, stream_status: stream_status is None
+    else:
+        done = lambda name, stream_status: stream_status == status
+
+    return wait_for_resources(describe, stream_names, done, wait_timeout)
+
+
 def wait_for_status(client, stream_name, status, wait_timeout=300,
                     check_mode=False):
     """Wait for the the status to change for a Kinesis Stream.
@@ -366,40 +726,18 @@ def wait_for_status(client, stream_name, status, wait_timeout=300,
     Returns:
         Tuple (bool, str, dict)
     """
-    polling_increment_secs = 5
-    wait_timeout = time.time() + wait_timeout
-    status_achieved = False
+    status_achieved, err_msg, streams = (
+        wait_for_streams(
+            client, [stream_name], status, wait_timeout, check_mode=check_mode
+        )
+    )
     stream = dict()
-    err_msg = ""
+    if check_mode:
+        stream = streams[stream_name]
+    elif status_achieved and status != 'DELETING':
+        find_success, find_msg, stream = find_stream(client, stream_name)
 
-    while wait_timeout > time.time():
-        try:
-            find_success, find_msg, stream = (
-                find_stream(client, stream_name, check_mode=check_mode)
-            )
-            if check_mode:
-                status_achieved = True
-                break
-
-            elif status != 'DELETING':
-                if find_success and stream:
-                    if stream.get('StreamStatus') == status:
-                        status_achieved = True
-                        break
-
-            elif status == 'DELETING' and not check_mode:
-                if not find_success:
-                    status_achieved = True
-                    break
-
-            else:
-                time.sleep(polling_increment_secs)
-        except botocore.exceptions.ClientError as e:
-            err_msg = str(e)
-
-    if not status_achieved:
-        err_msg = "Wait time out reached, while waiting for results"
-    else:
+    if status_achieved:
         err_msg = "Status {0} achieved successfully".format(status)
 
     return status_achieved, err_msg, stream
@@ -691,7 +1029,8 @@ def retention_action(client, stream_name, retention_period=24,
 
 
 def update(client, current_stream, stream_name, retention_period=None,
-           tags=None, wait=False, wait_timeout=300, check_mode=False):
+           tags=None, wait=False, wait_timeout=300, check_mode=False,
+           number_of_shards=None):
     """Update an Amazon Kinesis Stream.
     Args:
         client (botocore.client.EC2): Boto3 client.
@@ -707,6 +1046,8 @@ def update(client, current_stream, stream_name, retention_period=None,
             default=300
         check_mode (bool): This will pass DryRun as one of the parameters to the aws api.
             default=False
+        number_of_shards (int): Reshard the stream to this number of open shards.
+            default=None
 
     Basic Usage:
         >>> client = boto3.client('kinesis')
@@ -728,6 +1069,20 @@ def update(client, current_stream, stream_name, retention_period=None,
     success = True
     changed = False
     err_msg = ''
+    current_shards = current_stream.get('OpenShardsCount')
+    if number_of_shards and current_shards and current_shards != number_of_shards:
+        success, changed, err_msg = (
+            reshard_stream(
+                client, stream_name, number_of_shards, wait_timeout,
+                check_mode=check_mode
+            )
+        )
+        if not success:
+            return success, changed, err_msg
+        _, _, current_stream = (
+            find_stream(client, stream_name, check_mode=check_mode)
+        )
+
     if retention_period:
         if wait:
             wait_success, wait_msg, current_stream = (
@@ -857,11 +1212,6 @@ def create_stream(client, stream_name, number_of_shards=1, retention_period=None
     stream_found, stream_msg, current_stream = (
         find_stream(client, stream_name, check_mode=check_mode)
     )
-    if stream_found:
-        if current_stream['ShardsCount'] != number_of_shards:
-            err_msg = 'Can not change the number of shards in a Kinesis Stream'
-            return success, changed, err_msg, results
-
     if stream_found and current_stream['StreamStatus'] == 'DELETING' and wait:
         wait_success, wait_msg, current_stream = (
             wait_for_status(
@@ -872,7 +1222,8 @@ def create_stream(client, stream_name, number_of_shards=1, retention_period=None
     if stream_found and current_stream['StreamStatus'] != 'DELETING':
         success, changed, err_msg = update(
             client, current_stream, stream_name, retention_period, tags,
-            wait, wait_timeout, check_mode=check_mode
+            wait, wait_timeout, check_mode=check_mode,
+            number_of_shards=number_of_shards
         )
     else:
         create_success, create_msg = (
@@ -1016,22 +1367,163 @@ def delete_stream(client, stream_name, wait=False, wait_timeout=300,
     return success, changed, err_msg, results
 
 
+def manage_streams(client, streams, wait=False, wait_timeout=300,
+                   check_mode=False):
+    """Create, update or delete many Amazon Kinesis Streams in one go.
+    Missing streams are created and unwanted ones deleted first, then all of
+    them are waited on together, and finally the tags, retention period and
+    shards of every stream are brought up to date by STREAM_WORKERS threads.
+    Args:
+        client (botocore.client.EC2): Boto3 client.
+        streams (list): Dicts with the name, shards, retention_period, tags
+            and state of every stream.
+
+    Kwargs:
+        wait (bool): Wait until the Streams are ACTIVE or deleted.
+            default=False
+        wait_timeout (int): How long to wait until this operation is considered failed.
+            default=300
+        check_mode (bool): This will pass DryRun as one of the parameters to the aws api.
+            default=False
+
+    Basic Usage:
+        >>> client = boto3.client('kinesis')
+        >>> streams = [
+            {'name': 'clicks', 'shards': 16, 'retention_period': None, 'tags': None, 'state': 'present'},
+            {'name': 'legacy', 'shards': None, 'retention_period': None, 'tags': None, 'state': 'absent'},
+        ]
+        >>> manage_streams(client, streams, wait=True)
+
+    Returns:
+        Tuple (bool, bool, str, list)
+    """
+    results = [dict(stream_name=stream['name']) for stream in streams]
+    created = list()
+    deleted = list()
+
+    for stream, result in zip(streams, results):
+        stream_found, stream_msg, current_stream = (
+            find_stream(client, stream['name'], check_mode=check_mode)
+        )
+        try:
+            if stream['state'] == 'present' and not stream_found:
+                if not check_mode:
+                    call_with_backoff(
+                        client.create_stream, StreamName=stream['name'],
+                        ShardCount=stream['shards']
+                    )
+                created.append(stream['name'])
+                result['changed'] = True
+            elif stream['state'] == 'absent' and stream_found:
+                if not check_mode:
+                    call_with_backoff(
+                        client.delete_stream, StreamName=stream['name']
+                    )
+                deleted.append(stream['name'])
+                result.update(changed=True, success=True, msg=(
+                    'Stream {0} is in the process of being deleted'
+                    .format(stream['name'])
+                ))
+            elif stream['state'] == 'absent':
+                result.update(changed=False, success=True, msg=(
+                    'Stream {0} does not exist'.format(stream['name'])
+                ))
+        except botocore.exceptions.ClientError as e:
+            result.update(changed=False, success=False, msg=str(e))
+
+    # New streams have to be ACTIVE before they can be tagged or updated
+    if created:
+        wait_success, wait_msg, _ = (
+            wait_for_streams(
+                client, created, 'ACTIVE', wait_timeout, check_mode=check_mode
+            )
+        )
+        if not wait_success:
+            for result in results:
+                if result['stream_name'] in created:
+                    result.update(success=False, msg=wait_msg)
+    if deleted and wait:
+        wait_success, wait_msg, _ = (
+            wait_for_streams(
+                client, deleted, 'DELETING', wait_timeout, check_mode=check_mode
+            )
+        )
+        for result in results:
+            if result['stream_name'] in deleted:
+                result.update(success=wait_success, msg=wait_msg or (
+                    'Stream {0} deleted successfully'
+                    .format(result['stream_name'])
+                ))
+
+    pending = [
+        i for i, stream in enumerate(streams)
+        if stream['state'] == 'present' and 'success' not in results[i]
+    ]
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            lock.acquire()
+            try:
+                if not pending:
+                    return
+                i = pending.pop(0)
+            finally:
+                lock.release()
+
+            stream = streams[i]
+            success, changed, err_msg, facts = (
+                create_stream(
+                    client, stream['name'], stream['shards'],
+                    stream['retention_period'], stream['tags'], wait,
+                    wait_timeout, check_mode
+                )
+            )
+            results[i].update(facts or dict())
+            results[i].update(
+                success=success, msg=err_msg,
+                changed=changed or results[i].get('changed', False)
+            )
+
+    workers = list()
+    for n in range(min(STREAM_WORKERS, len(pending))):
+        t = threading.Thread(target=worker)
+        t.daemon = True
+        t.start()
+        workers.append(t)
+    for t in workers:
+        t.join()
+
+    success = all(result['success'] for result in results)
+    changed = any(result['changed'] for result in results)
+    failed = [result['stream_name'] for result in results if not result['success']]
+    if success:
+        err_msg = '{0} Kinesis Streams managed successfully'.format(len(results))
+    else:
+        err_msg = 'Failed to manage Kinesis Streams {0}'.format(', '.join(failed))
+
+    return success, changed, err_msg, results
+
+
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(
         dict(
-            name=dict(default=None, required=True),
+            name=dict(default=None, required=False),
             shards=dict(default=None, required=False, type='int'),
             retention_period=dict(default=None, required=False, type='int'),
             tags=dict(default=None, required=False, type='dict', aliases=['resource_tags']),
             wait=dict(default=True, required=False, type='bool'),
             wait_timeout=dict(default=300, required=False, type='int'),
             state=dict(default='present', choices=['present', 'absent']),
+            streams=dict(default=None, required=False, type='list'),
         )
     )
     module = AnsibleModule(
         argument_spec=argument_spec,
         supports_check_mode=True,
+        mutually_exclusive=[['name', 'streams']],
+        required_one_of=[['name', 'streams']],
     )
 
     retention_period = module.params.get('retention_period')
@@ -1042,12 +1534,25 @@ def main():
     wait = module.params.get('wait')
     wait_timeout = module.params.get('wait_timeout')
 
-    if state == 'present' and not shards:
-        module.fail_json(msg='Shards is required when state == present.')
-
-    if retention_period:
-        if retention_period < 24:
-            module.fail_json(msg='Retention period can not be less than 24 hours.')
+    streams = list()
+    for stream in module.params.get('streams') or list():
+        if not isinstance(stream, dict) or not stream.get('name'):
+            module.fail_json(msg='Every item of streams needs a name.')
+        streams.append(dict(
+            name=stream['name'],
+            shards=stream.get('shards', shards),
+            retention_period=stream.get('retention_period', retention_period),
+            tags=stream.get('tags', tags),
+            state=stream.get('state', state),
+        ))
+
+    for stream in streams or [dict(name=stream_name, shards=shards, retention_period=retention_period, state=state)]:
+        if stream['state'] == 'present' and not stream['shards']:
+            module.fail_json(msg='Shards is required when state == present.')
+
+        if stream['retention_period']:
+            if stream['retention_period'] < 24:
+                module.fail_json(msg='Retention period can not be less than 24 hours.')
 
     if not HAS_BOTO3:
         module.fail_json(msg='boto3 is required.')
@@ -1069,7 +1574,12 @@ def main():
             success=False, changed=False, result={}, msg=err_msg
         )
 
-    if state == 'present':
+    if streams:
+        success, changed, err_msg, results = (
+            manage_streams(client, streams, wait, wait_timeout, check_mode)
+        )
+        results = dict(streams=results)
+    elif state == 'present':
         success, changed, err_msg, results = (
             create_stream(
                 client, stream_name, shards, retention_period, tags,
@@ -54,6 +54,13 @@ options:
       - For query type 'mappings', this is the Amazon Resource Name (ARN) of the Amazon Kinesis or DynamoDB stream.
     default: null
     required: false
+  all_pages:
+    description:
+      - Return every function, alias, version and event source mapping, following all pages of the list calls
+        within this one task, instead of only the first page.
+    required: false
+    default: false
+    version_added: "2.3"
 author: Pierre Jodouin (@pjodouin)
 requirements:
     - boto3
@@ -81,6 +88,11 @@ EXAMPLES = '''
   lambda_facts:
     query: all
     max_items: 20
+# List every lambda function in the region, however many pages that takes
+- name: List all functions
+  lambda_facts:
+    query: config
+    all_pages: yes
 - name: show Lambda facts
   debug: var=lambda_facts
 '''
@@ -125,6 +137,29 @@ def fix_return(node):
     return node_value
 
 
+def list_items(client, module, method, key, **params):
+    """
+    Returns the items under key from client.method, from every page when all_pages is set.
+    :param client: AWS API client reference (boto3)
+    :param module: Ansible module reference
+    :param method: name of the list call
+    :param key: response key holding the items
+    :return list:
+    """
+    if not module.params.get('all_pages'):
+        return getattr(client, method)(**params)[key]
+
+    pagination = dict()
+    if 'MaxItems' in params:
+        pagination['PageSize'] = params.pop('MaxItems')
+    if 'Marker' in params:
+        pagination['StartingToken'] = params.pop('Marker')
+    items = []
+    for page in client.get_paginator(method).paginate(PaginationConfig=pagination, **params):
+        items.extend(page[key])
+    return items
+
+
 def alias_details(client, module):
     """
     Returns list of aliases for a specified function.
@@ -145,7 +180,7 @@ def alias_details(client, module):
         if module.params.get('next_marker'):
             params['Marker'] = module.params.get('next_marker')
         try:
-            lambda_facts.update(aliases=client.list_aliases(FunctionName=function_name, **params)['Aliases'])
+            lambda_facts.update(aliases=list_items(client, module, 'list_aliases', 'Aliases', FunctionName=function_name, **params))
         except ClientError as e:
             if e.response['Error']['Code'] == 'ResourceNotFoundException':
                 lambda_facts.update(aliases=[])
@@ -214,7 +249,7 @@ def config_details(client, module):
             params['Marker'] = module.params.get('next_marker')
 
         try:
-            lambda_facts.update(function_list=client.list_functions(**params)['Functions'])
+            lambda_facts.update(function_list=list_items(client, module, 'list_functions', 'Functions', **params))
         except ClientError as e:
             if e.response['Error']['Code'] == 'ResourceNotFoundException':
                 lambda_facts.update(function_list=[])
@@ -255,7 +290,7 @@ def mapping_details(client, module):
         params['Marker'] = module.params.get('next_marker')
 
     try:
-        lambda_facts.update(mappings=client.list_event_source_mappings(**params)['EventSourceMappings'])
+        lambda_facts.update(mappings=list_items(client, module, 'list_event_source_mappings', 'EventSourceMappings', **params))
     except ClientError as e:
         if e.response['Error']['Code'] == 'ResourceNotFoundException':
             lambda_facts.update(mappings=[])
@@ -319,7 +354,7 @@ def version_details(client, module):
             params['Marker'] = module.params.get('next_marker')
 
         try:
-            lambda_facts.update(versions=client.list_versions_by_function(FunctionName=function_name, **params)['Versions'])
+            lambda_facts.update(versions=list_items(client, module, 'list_versions_by_function', 'Versions', FunctionName=function_name, **params))
         except ClientError as e:
             if e.response['Error']['Code'] == 'ResourceNotFoundException':
                 lambda_facts.update(versions=[])
@@ -342,7 +377,8 @@ def main():
         dict(
             function_name=dict(required=False, default=None, aliases=['function', 'name']),
             query=dict(required=False, choices=['aliases', 'all', 'config', 'mappings', 'policy',  'versions'], default='all'),
-            event_source_arn=dict(required=False, default=None)
+            event_source_arn=dict(required=False, default=None),
+            all_pages=dict(required=False, default=False, type='bool'),
         )
     )
 
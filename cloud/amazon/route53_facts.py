@@ -112,6 +112,34 @@ options:
         'tags',
         ]
     default: 'list'
+  all_pages:
+    description:
+      - "Walk every page of the hosted zone list, health check list or record sets within this one task
+        instead of returning a single page and a next_marker. max_items then sets the page size."
+    required: false
+    default: false
+    version_added: "2.3"
+  record_types:
+    description:
+      - "Only return record sets of these types (query: record_sets)."
+    required: false
+    default: null
+    version_added: "2.3"
+  record_name:
+    description:
+      - "Only return record sets for this name and the names below it (query: record_sets). The listing
+        starts at this name and, with all_pages, stops after the last name below it. Mutually exclusive
+        with start_record_name."
+    required: false
+    default: null
+    version_added: "2.3"
+  fields:
+    description:
+      - "Only return these keys of each hosted zone, health check or record set, e.g. C(Name), C(Type) and
+        C(ResourceRecords) for record sets."
+    required: false
+    default: null
+    version_added: "2.3"
 author: Karen Cheng(@Etherdaemon)
 extends_documentation_fragment: aws
 '''
@@ -138,6 +166,16 @@ EXAMPLES = '''
     max_items: 20
   register: record_sets
 
+- name: List the names and addresses of all A records below a name, in one task
+  route53_facts:
+    query: record_sets
+    hosted_zone_id: 'ZZZ1111112222'
+    all_pages: yes
+    record_name: internal.example.com
+    record_types: [ 'A' ]
+    fields: [ 'Name', 'ResourceRecords' ]
+  register: record_sets
+
 - name: List first 20 health checks
   route53_facts:
     query: health_check
@@ -173,6 +211,53 @@ except ImportError:
     HAS_BOTO3 = False
 
 
+def project(item, fields):
+    if not fields:
+        return item
+    return dict((field, item[field]) for field in fields if field in item)
+
+
+def collect(client, module, method, key, params, keep=None, stop=None):
+    """
+    Call method with params, following every page when all_pages is set.
+    The items under key are filtered with keep and projected to fields one
+    page at a time, so only what is returned is held in memory. Paging ends
+    at the first item for which stop is true.
+    """
+    fields = module.params.get('fields')
+    if module.params.get('all_pages'):
+        pagination = dict()
+        if 'MaxItems' in params:
+            pagination['PageSize'] = params.pop('MaxItems')
+        if 'Marker' in params:
+            pagination['StartingToken'] = params.pop('Marker')
+        results = dict()
+        pages = client.get_paginator(method).paginate(PaginationConfig=pagination, **params)
+    else:
+        results = getattr(client, method)(**params)
+        pages = [results]
+
+    items = []
+    stopped = False
+    for page in pages:
+        for item in page[key]:
+            if stop is not None and stop(item):
+                stopped = True
+                break
+            if keep is None or keep(item):
+                items.append(project(item, fields))
+        if stopped:
+            break
+
+    results[key] = items
+    if stopped:
+        # Nothing further is wanted, so there is no next page either
+        results['IsTruncated'] = False
+        for marker in ('NextMarker', 'NextRecordName', 'NextRecordType', 'NextRecordIdentifier'):
+            results.pop(marker, None)
+    return results
+
+
 def get_hosted_zone(client, module):
     params = dict()
 
@@ -214,7 +299,7 @@ def list_hosted_zones(client, module):
     if module.params.get('delegation_set_id'):
         params['DelegationSetId'] = module.params.get('delegation_set_id')
 
-    results = client.list_hosted_zones(**params)
+    results = collect(client, module, 'list_hosted_zones', 'HostedZones', params)
     return results
 
 
@@ -304,7 +389,7 @@ def list_health_checks(client, module):
     if module.params.get('next_marker'):
         params['Marker'] = module.params.get('next_marker')
 
-    results = client.list_health_checks(**params)
+    results = collect(client, module, 'list_health_checks', 'HealthChecks', params)
     return results
 
 
@@ -327,7 +412,20 @@ def record_sets_details(client, module):
     elif module.params.get('type'):
         params['StartRecordType'] = module.params.get('type')
 
-    results = client.list_resource_record_sets(**params)
+    keep = None
+    stop = None
+    record_types = module.params.get('record_types')
+    record_name = module.params.get('record_name')
+    if record_name:
+        record_name = record_name.lower().rstrip('.') + '.'
+        # Record sets are listed by name with the labels in reverse order,
+        # so the names below record_name follow it without interruption
+        params['StartRecordName'] = record_name
+        stop = lambda record: not (record['Name'] == record_name or record['Name'].endswith('.' + record_name))
+    if record_types:
+        keep = lambda record: record['Type'] in record_types
+
+    results = collect(client, module, 'list_resource_record_sets', 'ResourceRecordSets', params, keep=keep, stop=stop)
     return results
 
 
@@ -396,6 +494,10 @@ def main():
             'count',
             'tags',
         ], default='list'),
+        all_pages=dict(type='bool', default=False),
+        record_types=dict(type='list'),
+        record_name=dict(),
+        fields=dict(type='list'),
         )
     )
 
@@ -403,6 +505,7 @@ def main():
         argument_spec=argument_spec,
         mutually_exclusive=[
             ['hosted_zone_method', 'health_check_method'],
+            ['record_name', 'start_record_name'],
         ],
     )
 
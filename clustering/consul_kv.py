@@ -58,6 +58,25 @@ options:
           - the value should be associated with the given key, required if state
             is present
         required: true
+    values:
+        description:
+          - a tree of values to store below the key, which is used as a
+            prefix. Nested dicts become nested key paths. The prefix is read
+            once and only the differing keys are written, through consul
+            transactions of at most 64 operations, each guarded by the
+            ModifyIndex read. The added, updated and deleted keys are
+            returned. Requires a consul agent with transaction support
+            (0.7 or later).
+        required: false
+        default: None
+        version_added: "2.3"
+    purge:
+        description:
+          - when syncing values, delete the keys below the prefix that are
+            not in values.
+        required: false
+        default: false
+        version_added: "2.3"
     recurse:
         description:
           - if the key represents a prefix, each entry with the prefix can be
@@ -137,15 +156,46 @@ EXAMPLES = '''
       value: 20160509
       session: "{{ sessionid }}"
       state: acquire
+
+  - name: sync an application config tree, removing keys no longer in it
+    consul_kv:
+      key: apps/billing/config
+      values:
+        db:
+          host: db.example.com
+          port: 5432
+        log_level: info
+      purge: yes
+'''
+
+RETURN = '''
+added:
+    description: keys created when syncing values
+    returned: when values is set
+    type: list
+    sample: ["apps/billing/config/db/host"]
+updated:
+    description: keys whose value or flags were changed when syncing values
+    returned: when values is set
+    type: list
+    sample: ["apps/billing/config/log_level"]
+deleted:
+    description: keys deleted when syncing values with purge
+    returned: when values is set
+    type: list
+    sample: ["apps/billing/config/old_setting"]
 '''
 
+import base64
 import sys
 
+from ansible.module_utils.pycompat24 import get_exception
+
 try:
     import consul
     from requests.exceptions import ConnectionError
     python_consul_installed = True
-except ImportError, e:
+except ImportError:
     python_consul_installed = False
 
 from requests.exceptions import ConnectionError
@@ -156,7 +206,9 @@ def execute(module):
 
     if state == 'acquire' or state == 'release':
         lock(module, state)
-    if state == 'present':
+    if state == 'present' and module.params.get('values') is not None:
+        sync_values(module)
+    elif state == 'present':
         add_value(module)
     else:
         remove_value(module)
@@ -240,6 +292,111 @@ def remove_value(module):
                      data=existing)
 
 
+# consul rejects transactions with more operations
+TXN_MAX_OPERATIONS = 64
+
+
+def flatten_values(values, prefix):
+    ''' flatten a tree of values into a dict of full keys and string values '''
+    flat = {}
+    for name, value in values.items():
+        key = prefix + str(name).strip('/')
+        if isinstance(value, dict):
+            flat.update(flatten_values(value, key + '/'))
+        else:
+            flat[key] = '%s' % (value,)
+    return flat
+
+
+def diff_values(existing, desired, flags=None, purge=False):
+    ''' compare the entries read below a prefix with the desired values.
+    returns the transaction operations needed, each guarded by the
+    ModifyIndex read, and the added, updated and deleted keys. '''
+    current = dict((entry['Key'], entry) for entry in existing or [])
+    operations = []
+    added, updated, deleted = [], [], []
+
+    for key in sorted(desired):
+        value = desired[key]
+        entry = current.get(key)
+        if entry is not None:
+            stored = entry.get('Value')
+            if isinstance(stored, bytes) and not isinstance(stored, str):
+                stored = stored.decode('utf-8')
+            if stored == value and (flags is None or entry.get('Flags') == flags):
+                continue
+        operation = {'Verb': 'cas',
+                     'Key': key,
+                     'Value': base64.b64encode(value.encode('utf-8')).decode('ascii'),
+                     'Index': entry['ModifyIndex'] if entry else 0}
+        if flags is not None:
+            operation['Flags'] = flags
+        elif entry is not None and entry.get('Flags'):
+            # cas writes Flags as 0 when they are left out
+            operation['Flags'] = entry['Flags']
+        operations.append({'KV': operation})
+        (updated if entry else added).append(key)
+
+    if purge:
+        for key in sorted(current):
+            if key not in desired:
+                operations.append({'KV': {'Verb': 'delete-cas',
+                                          'Key': key,
+                                          'Index': current[key]['ModifyIndex']}})
+                deleted.append(key)
+
+    return operations, added, updated, deleted
+
+
+def apply_operations(consul_api, operations):
+    ''' run the operations as consul transactions of at most
+    TXN_MAX_OPERATIONS operations. a transaction that fails a cas check is
+    rolled back entirely and stops the sync. '''
+    for i in range(0, len(operations), TXN_MAX_OPERATIONS):
+        chunk = operations[i:i + TXN_MAX_OPERATIONS]
+        try:
+            result = consul_api.txn.put(chunk)
+        except consul.ConsulException:
+            e = get_exception()
+            result = {'Errors': [{'What': str(e)}]}
+        if result and result.get('Errors'):
+            failed = [chunk[error['OpIndex']]['KV']['Key'] if 'OpIndex' in error
+                      else error.get('What') for error in result['Errors']]
+            raise Exception('transaction rolled back after %d of %d operations were applied, '
+                            'keys modified concurrently or rejected: %s'
+                            % (i, len(operations), ', '.join(failed)))
+
+
+def sync_values(module):
+    ''' make the keys below the key prefix match the given values, reading
+    the prefix once and writing only the differences. '''
+    consul_api = get_consul_api(module)
+
+    prefix = module.params.get('key').rstrip('/') + '/'
+    flags = module.params.get('flags')
+    if flags is not None:
+        flags = int(flags)
+    desired = flatten_values(module.params.get('values'), prefix)
+
+    index, existing = consul_api.kv.get(prefix, recurse=True)
+
+    operations, added, updated, deleted = diff_values(
+        existing, desired, flags, module.params.get('purge'))
+
+    if operations and not module.check_mode:
+        if not hasattr(consul_api, 'txn'):
+            module.fail_json(msg='syncing values requires a python-consul '
+                                 'version with transaction support')
+        apply_operations(consul_api, operations)
+
+    module.exit_json(changed=bool(operations),
+                     index=index,
+                     key=prefix,
+                     added=added,
+                     updated=updated,
+                     deleted=deleted)
+
+
 def get_consul_api(module, token=None):
     return consul.Consul(host=module.params.get('host'),
                          port=module.params.get('port'),
@@ -267,6 +424,8 @@ def main():
         state=dict(default='present', choices=['present', 'absent', 'acquire', 'release']),
         token=dict(required=False, default='anonymous', no_log=True),
         value=dict(required=False),
+        values=dict(required=False, type='dict'),
+        purge=dict(required=False, type='bool', default=False),
         session=dict(required=False)
     )
 
@@ -276,10 +435,12 @@ def main():
         
     try:
         execute(module)
-    except ConnectionError, e:
+    except ConnectionError:
+        e = get_exception()
         module.fail_json(msg='Could not connect to consul agent at %s:%s, error was %s' % (
                             module.params.get('host'), module.params.get('port'), str(e)))
-    except Exception, e:
+    except Exception:
+        e = get_exception()
         module.fail_json(msg=str(e))
 
 
@@ -85,6 +85,22 @@ options:
         hostname matching (exists in >= python3.5.0).
     required: false
     default: false
+  bulk:
+    description:
+      - With C(state=present), apply all the documents of the data at once.
+        The current objects are read with one list call per kind and
+        namespace; only missing objects are created and only objects that
+        differ from their manifest are patched, over keep-alive connections.
+        C(changed) is only reported when something was sent.
+    required: false
+    default: false
+    version_added: "2.3"
+  workers:
+    description:
+      - Number of concurrent API connections used in bulk mode.
+    required: false
+    default: 8
+    version_added: "2.3"
 
 author: "Eric Johnson (@erjohnso) <erjohnso@google.com>"
 '''
@@ -126,6 +142,17 @@ EXAMPLES = '''
     file_reference: /path/to/create_namespace.yaml
     state: present
 
+# Apply a multi-document bundle, sending only what differs
+- name: Apply the application namespace bundle
+  kubernetes:
+    api_endpoint: 123.45.67.89
+    url_username: admin
+    url_password: redacted
+    file_reference: /path/to/bundle.yaml
+    bulk: yes
+    workers: 16
+    state: present
+
 '''
 
 RETURN = '''
@@ -152,6 +179,16 @@ api_response:
 
 import yaml
 import base64
+import socket
+import ssl
+import threading
+
+from ansible.module_utils.pycompat24 import get_exception
+
+try:
+    import httplib
+except ImportError:
+    import http.client as httplib
 
 ############################################################################
 ############################################################################
@@ -303,6 +340,211 @@ def k8s_update_resource(module, url, data):
     return True, body
 
 
+class K8sConnection(object):
+    """Persistent connection to the Kubernetes API server.
+
+    Requests are sent over a single keep-alive connection, which is
+    reopened once when the server has closed it.
+
+    Attributes:
+        host: API endpoint, as host or host:port.
+        secure: Whether to use HTTPS.
+        headers: Headers sent with every request.
+        context: SSL context of HTTPS connections, if any.
+    """
+
+    def __init__(self, host, secure=True, headers=None, context=None):
+        self.host = host
+        self.secure = secure
+        self.headers = headers or {}
+        self.context = context
+        self.connection = None
+
+    def connect(self):
+        if not self.secure:
+            return httplib.HTTPConnection(self.host, timeout=30)
+        if self.context is not None:
+            return httplib.HTTPSConnection(self.host, timeout=30, context=self.context)
+        return httplib.HTTPSConnection(self.host, timeout=30)
+
+    def request(self, method, path, data=None, content_type="application/json"):
+        """Send a request and return its status and decoded JSON body."""
+        headers = dict(self.headers)
+        body = None
+        if data is not None:
+            body = json.dumps(data)
+            headers["Content-Type"] = content_type
+        for attempt in (1, 2):
+            if self.connection is None:
+                self.connection = self.connect()
+            try:
+                self.connection.request(method, path, body, headers)
+                response = self.connection.getresponse()
+                content = response.read()
+                break
+            except (httplib.HTTPException, socket.error):
+                self.close()
+                if attempt == 2:
+                    raise
+        if response.getheader("connection", "").lower() == "close":
+            self.close()
+        try:
+            return response.status, json.loads(content.decode("utf-8"))
+        except ValueError:
+            return response.status, None
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def k8s_matches(desired, current):
+    """Tell whether the current state already has all the desired fields.
+
+    Fields set by the server, such as defaults and status, are ignored,
+    so that objects read back from the API compare equal to the manifests
+    they were created from.
+    """
+    if isinstance(desired, dict):
+        if not isinstance(current, dict):
+            return False
+        return all(k8s_matches(v, current.get(k)) for k, v in desired.items())
+    if isinstance(desired, list):
+        if not isinstance(current, list) or len(desired) != len(current):
+            return False
+        return all(k8s_matches(d, c) for d, c in zip(desired, current))
+    if isinstance(current, (int, float)) and not isinstance(desired, bool):
+        try:
+            return float(desired) == current
+        except (TypeError, ValueError):
+            return False
+    return desired == current
+
+
+def k8s_map(connect, func, items, workers):
+    """Return [func(connection, item) for item in items].
+
+    Items are spread over at most workers threads, each with its own
+    connection from connect().
+    """
+    results = [None] * len(items)
+    errors = []
+    pending = list(range(len(items)))
+    lock = threading.Lock()
+
+    def worker():
+        connection = connect()
+        try:
+            while True:
+                lock.acquire()
+                try:
+                    if not pending or errors:
+                        return
+                    i = pending.pop(0)
+                finally:
+                    lock.release()
+                try:
+                    results[i] = func(connection, items[i])
+                except Exception:
+                    errors.append(get_exception())
+        finally:
+            connection.close()
+
+    threads = []
+    for i in range(min(workers, len(items))):
+        t = threading.Thread(target=worker)
+        t.daemon = True
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+
+    if errors:
+        raise errors[0]
+    return results
+
+
+def k8s_apply_resources(connect, data, workers=8):
+    """Create or patch the resources in data that differ from the cluster.
+
+    The current objects are read with one list call per kind and
+    namespace. Missing objects are created, and objects not matching
+    their manifest are patched with a strategic merge patch guarded by
+    the resourceVersion read. Cluster-scoped objects such as namespaces
+    are applied before the namespaced ones. Returns whether anything changed, the API
+    response for each item, and the created, updated and unchanged
+    objects.
+    """
+    paths = []
+    for item in data:
+        kind = item.get('kind', '').lower()
+        if kind not in KIND_URL:
+            raise ValueError("invalid resource kind specified in the data: '%s'" % kind)
+        if not item.get('metadata', {}).get('name'):
+            raise ValueError("Missing a named resource in object metadata when trying to apply a resource")
+        namespace = item['metadata'].get('namespace', "default")
+        paths.append(KIND_URL[kind].replace("{namespace}", namespace))
+
+    def list_objects(connection, path):
+        status, body = connection.request("GET", path)
+        if status == 404:
+            return {}
+        if status >= 400:
+            raise Exception("failed to list the resources at %s: %s" % (path, status))
+        return dict((obj['metadata']['name'], obj) for obj in body.get('items') or [])
+
+    list_paths = sorted(set(paths))
+    current = dict(zip(list_paths, k8s_map(connect, list_objects, list_paths, workers)))
+
+    created, updated, unchanged = [], [], []
+    actions = []
+    for i, (item, path) in enumerate(zip(data, paths)):
+        name = item['metadata']['name']
+        live = current[path].get(name)
+        if live is None:
+            created.append(path + '/' + name)
+            actions.append((i, "POST", path, item))
+        elif k8s_matches(item, live):
+            unchanged.append(path + '/' + name)
+        else:
+            patch = dict(item)
+            patch['metadata'] = dict(item['metadata'],
+                                     resourceVersion=live['metadata'].get('resourceVersion'))
+            updated.append(path + '/' + name)
+            actions.append((i, "PATCH", path + '/' + name, patch))
+
+    body = [current[path].get(item['metadata']['name']) for item, path in zip(data, paths)]
+
+    def apply_object(connection, action):
+        i, method, path, item = action
+        content_type = "application/json"
+        if method == "PATCH":
+            content_type = "application/strategic-merge-patch+json"
+        status, response = connection.request(method, path, item, content_type)
+        if status >= 400:
+            raise Exception("failed to apply the resource %s: %s %s" % (
+                path, status, (response or {}).get('message', '')))
+        return response
+
+    # Namespaces, like the other cluster-scoped objects, must exist
+    # before anything can be created inside them
+    cluster_actions, namespaced_actions = [], []
+    for action in actions:
+        if '{namespace}' in KIND_URL[data[action[0]]['kind'].lower()]:
+            namespaced_actions.append(action)
+        else:
+            cluster_actions.append(action)
+
+    for batch in (cluster_actions, namespaced_actions):
+        if batch:
+            responses = k8s_map(connect, apply_object, batch, workers)
+            for (i, method, path, item), response in zip(batch, responses):
+                body[i] = response
+
+    return bool(actions), body, dict(created=created, updated=updated, unchanged=unchanged)
+
+
 def main():
     module = AnsibleModule(
         argument_spec=dict(
@@ -317,7 +559,9 @@ def main():
             api_endpoint=dict(required=True),
             file_reference=dict(required=False),
             inline_data=dict(required=False),
-            state=dict(default="present", choices=["present", "absent", "update", "replace"])
+            state=dict(default="present", choices=["present", "absent", "update", "replace"]),
+            bulk=dict(default=False, type='bool'),
+            workers=dict(default=8, type='int')
         ),
         mutually_exclusive = (('file_reference', 'inline_data'),
                               ('url_username', 'insecure'),
@@ -362,6 +606,25 @@ def main():
     if not isinstance(data, list):
         data = [ data ]
 
+    if module.params.get('bulk'):
+        if state != 'present':
+            module.fail_json(msg="bulk mode is only supported with state=present")
+        headers = {"User-Agent": module.params.get('http_agent')}
+        if not insecure:
+            credentials = "%s:%s" % (module.params.get('url_username'), module.params.get('url_password'))
+            headers["Authorization"] = "Basic %s" % base64.b64encode(credentials.encode('utf-8')).decode('ascii')
+        context = None
+        if not insecure and not module.params.get('validate_certs') and hasattr(ssl, '_create_unverified_context'):
+            context = ssl._create_unverified_context()
+        connect = lambda: K8sConnection(api_endpoint, not insecure, headers, context)
+        try:
+            changed, body, summary = k8s_apply_resources(
+                connect, [item for item in data if item], module.params.get('workers'))
+        except Exception:
+            e = get_exception()
+            module.fail_json(msg=str(e))
+        module.exit_json(changed=changed, api_response=body, **summary)
+
     for item in data:
         namespace = "default"
         if item and 'metadata' in item:
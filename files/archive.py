@@ -54,6 +54,25 @@ options:
     type: bool
     required: false
     default: false
+  incremental:
+    description:
+      - Keep a sidecar manifest (C(<dest>.manifest)) recording the size, modification time and SHA1 digest of every archived member.
+      - When the manifest matches the source tree the archive is left untouched. When members were only added and the format
+        supports it (C(tar) and C(zip)) they are appended to the existing archive instead of rebuilding it.
+      - Only applies to multi-file archives.
+    type: bool
+    required: false
+    default: false
+    version_added: "2.3"
+  threads:
+    description:
+      - Number of worker processes used to compress C(gz) and C(bz2) output. Input is split into independent blocks
+        that are compressed in parallel and written as concatenated gzip members or bzip2 streams, which standard
+        C(gzip)/C(bzip2) tools read as a single file.
+      - C(1) keeps the single-threaded behaviour, C(0) uses one process per CPU. Ignored for C(zip) and C(tar).
+    required: false
+    default: 1
+    version_added: "2.3"
 
 author: "Ben Doherty (@bendoh)"
 notes:
@@ -104,6 +123,18 @@ arcroot:
 expanded_paths:
     description: The list of matching paths from paths argument.
     type: list
+added:
+    description: Archive members that were not present in the previous manifest.
+    type: list
+    returned: when incremental=True
+modified:
+    description: Archive members whose content changed since the previous manifest.
+    type: list
+    returned: when incremental=True
+removed:
+    description: Archive members listed in the previous manifest that no longer exist in the source.
+    type: list
+    returned: when incremental=True
 '''
 
 import os
@@ -112,9 +143,306 @@ import glob
 import shutil
 import gzip
 import bz2
-import filecmp
 import zipfile
 import tarfile
+import tempfile
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+try:
+    from io import BytesIO
+except ImportError:
+    from cStringIO import StringIO as BytesIO
+
+try:
+    import multiprocessing
+    HAS_MULTIPROCESSING = True
+except ImportError:
+    HAS_MULTIPROCESSING = False
+
+try:
+    import json
+except ImportError:
+    try:
+        import simplejson as json
+    except ImportError:
+        # Let snippet from module_utils/basic.py return a proper error in this case
+        pass
+
+
+# Block sizes handed to each compression worker. bzip2 works on 900k blocks
+# internally, so splitting on that boundary costs nothing in ratio.
+BLOCK_SIZES = dict(gz=1024 * 1024, bz2=900 * 1024)
+
+
+def compress_block(args):
+    """Compress one block into a self-contained gzip member or bzip2 stream."""
+    format, data = args
+
+    if format == 'bz2':
+        return bz2.compress(data, 9)
+
+    buf = BytesIO()
+    f = gzip.GzipFile(fileobj=buf, mode='wb', compresslevel=9)
+    f.write(data)
+    f.close()
+
+    return buf.getvalue()
+
+
+class ParallelCompressor(object):
+    """
+    Write-only file object that compresses its input in fixed size blocks
+    on a pool of worker processes, pigz/pbzip2 style. Compressed blocks are
+    written in order, with at most two blocks per worker held in memory.
+    """
+
+    def __init__(self, dest, format, threads):
+        self.format = format
+        self.blocksize = BLOCK_SIZES[format]
+        self.window = threads * 2
+        self.buffer = BytesIO()
+        self.pending = []
+        self.fileobj = open(dest, 'wb')
+        self.pool = multiprocessing.Pool(threads)
+
+    def write(self, data):
+        self.buffer.write(data)
+
+        if self.buffer.tell() >= self.blocksize:
+            data = self.buffer.getvalue()
+            offset = 0
+
+            while len(data) - offset >= self.blocksize:
+                self._submit(data[offset:offset + self.blocksize])
+                offset += self.blocksize
+
+            self.buffer = BytesIO()
+            self.buffer.write(data[offset:])
+
+    def _submit(self, block):
+        self.pending.append(self.pool.apply_async(compress_block, ((self.format, block),)))
+
+        while len(self.pending) >= self.window:
+            self.fileobj.write(self.pending.pop(0).get())
+
+    def close(self):
+        try:
+            if self.buffer.tell():
+                self._submit(self.buffer.getvalue())
+                self.buffer = BytesIO()
+
+            while self.pending:
+                self.fileobj.write(self.pending.pop(0).get())
+
+            self.pool.close()
+        finally:
+            self.pool.terminate()
+            self.fileobj.close()
+
+
+def open_compressed(dest, format, threads):
+    """Open dest for writing a gz or bz2 stream, in parallel when threads > 1."""
+    if threads > 1 and HAS_MULTIPROCESSING and format in BLOCK_SIZES:
+        return ParallelCompressor(dest, format, threads)
+    elif format == 'gz':
+        return gzip.open(dest, 'wb')
+    elif format == 'bz2':
+        return bz2.BZ2File(dest, 'wb')
+
+    raise OSError("Invalid format")
+
+
+def file_identity(path):
+    """Return the (device, inode) pair of path, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    return (st.st_dev, st.st_ino)
+
+
+def scan_tree(top):
+    """
+    Yield (dirpath, dirnames, files) for every directory below top, like a
+    top-down os.walk, where files is a list of (name, inode). Uses scandir
+    when available so the inode comes from the directory read itself.
+    """
+    if scandir is None:
+        for dirpath, dirnames, filenames in os.walk(top, topdown=True):
+            if not dirpath.endswith(os.sep):
+                dirpath += os.sep
+
+            files = []
+            for filename in filenames:
+                try:
+                    files.append((filename, os.lstat(dirpath + filename).st_ino))
+                except OSError:
+                    files.append((filename, None))
+
+            yield dirpath, dirnames, files
+        return
+
+    stack = [top]
+    while stack:
+        dirpath = stack.pop()
+        if not dirpath.endswith(os.sep):
+            dirpath += os.sep
+
+        dirnames = []
+        files = []
+        recurse = []
+        try:
+            for entry in scandir(dirpath):
+                try:
+                    isdir = entry.is_dir()
+                except OSError:
+                    isdir = False
+
+                if isdir:
+                    dirnames.append(entry.name)
+                    # Like os.walk, list symlinks to directories but don't follow them
+                    if not entry.is_symlink():
+                        recurse.append(dirpath + entry.name)
+                else:
+                    files.append((entry.name, entry.inode()))
+        except OSError:
+            continue
+
+        yield dirpath, dirnames, files
+
+        recurse.reverse()
+        stack.extend(recurse)
+
+
+def walk_archive_paths(archive_paths, arcroot, dest, exclude=()):
+    """
+    Yield (fullpath, arcname, isdir) for every member to put in the archive.
+    The destination and any excluded paths are skipped by device and inode,
+    looked up once, so the archive never ends up inside itself.
+    """
+    skip = set()
+    for path in (dest,) + tuple(exclude):
+        identity = file_identity(path)
+        if identity:
+            skip.add(identity)
+    skip_inodes = set([inode for dev, inode in skip])
+
+    for path in archive_paths:
+        if os.path.isdir(path):
+            # Recurse into directories
+            for dirpath, dirnames, files in scan_tree(path):
+                for dirname in dirnames:
+                    fullpath = dirpath + dirname
+                    yield fullpath, fullpath[len(arcroot):], True
+
+                for filename, inode in files:
+                    fullpath = dirpath + filename
+
+                    # Only stat the rare file whose inode collides with an excluded one
+                    if inode in skip_inodes:
+                        try:
+                            st = os.lstat(fullpath)
+                        except OSError:
+                            continue
+
+                        if (st.st_dev, st.st_ino) in skip:
+                            continue
+
+                    yield fullpath, fullpath[len(arcroot):], False
+        else:
+            yield path, path[len(arcroot):], False
+
+
+def read_manifest(manifest_path):
+    """Return the previously written manifest, or an empty one."""
+    try:
+        f = open(manifest_path, 'r')
+        try:
+            manifest = json.load(f)
+        finally:
+            f.close()
+    except (IOError, ValueError):
+        return {}
+
+    if not isinstance(manifest, dict):
+        return {}
+
+    return manifest
+
+
+def build_manifest(module, entries, previous):
+    """
+    Stat every entry and return a manifest dict mapping arcname to
+    [size, mtime, digest]. Digests are reused from the previous manifest
+    when size and mtime are unchanged, so only new or touched files are read.
+    """
+    manifest = {}
+
+    for fullpath, arcname, isdir in entries:
+        st = os.lstat(fullpath)
+        mtime = int(st.st_mtime)
+
+        if isdir:
+            manifest[arcname] = [0, mtime, None]
+            continue
+
+        old = previous.get(arcname)
+        if old and old[0] == st.st_size and old[1] == mtime and old[2]:
+            digest = old[2]
+        elif os.path.islink(fullpath):
+            digest = 'link:' + os.readlink(fullpath)
+        else:
+            digest = module.sha1(fullpath)
+
+        manifest[arcname] = [st.st_size, mtime, digest]
+
+    return manifest
+
+
+def diff_manifests(old, new):
+    """Return sorted (added, modified, removed) arcname lists between two manifests."""
+    added = []
+    modified = []
+    removed = []
+
+    for arcname, entry in new.items():
+        if arcname not in old:
+            added.append(arcname)
+        elif entry[2] != old[arcname][2]:
+            # Directories carry no digest; a new mtime only means their
+            # contents changed, which shows up in the entries below them.
+            modified.append(arcname)
+
+    for arcname in old:
+        if arcname not in new:
+            removed.append(arcname)
+
+    added.sort()
+    modified.sort()
+    removed.sort()
+
+    return added, modified, removed
+
+
+def write_manifest(module, manifest_path, manifest):
+    """Atomically replace the sidecar manifest."""
+    tmpfd, tmpfile = tempfile.mkstemp(dir=os.path.dirname(manifest_path) or '.')
+    f = os.fdopen(tmpfd, 'w')
+    try:
+        json.dump(manifest, f)
+    finally:
+        f.close()
+
+    module.atomic_move(tmpfile, manifest_path)
+
 
 def main():
     module = AnsibleModule(
@@ -123,6 +451,8 @@ def main():
             format  = dict(choices=['gz', 'bz2', 'zip', 'tar'], default='gz', required=False),
             dest = dict(required=False, type='path'),
             remove = dict(required=False, default=False, type='bool'),
+            incremental = dict(required=False, default=False, type='bool'),
+            threads = dict(required=False, default=1, type='int'),
         ),
         add_file_common_args=True,
         supports_check_mode=True,
@@ -133,6 +463,8 @@ def main():
     paths = params['path']
     dest = params['dest']
     remove = params['remove']
+    incremental = params['incremental']
+    threads = params['threads']
 
     expanded_paths = []
     format = params['format']
@@ -143,6 +475,7 @@ def main():
     # Simple or archive file compression (inapplicable with 'zip' since it's always an archive)
     archive = False
     successes = []
+    diff = None
 
     for i, path in enumerate(paths):
         path = os.path.expanduser(os.path.expandvars(path))
@@ -158,6 +491,14 @@ def main():
         else:
             expanded_paths.append(path)
 
+    if threads < 0:
+        module.fail_json(threads=threads, msg='Error, threads must be 0 or a positive number')
+    elif threads == 0:
+        if HAS_MULTIPROCESSING:
+            threads = multiprocessing.cpu_count()
+        else:
+            threads = 1
+
     if len(expanded_paths) == 0:
         return module.fail_json(path=', '.join(paths), expanded_paths=', '.join(expanded_paths), msg='Error, no source paths were found')
 
@@ -221,73 +562,86 @@ def main():
             state = 'incomplete'
 
         archive = None
+        arcfile = compressor = None
         size = 0
         errors = []
+        entries = None
+        manifest = None
+        manifest_path = dest + '.manifest'
+        unchanged = False
+        append = False
 
         if os.path.lexists(dest):
             size = os.path.getsize(dest)
 
         if state != 'archive':
+            if incremental:
+                previous = read_manifest(manifest_path)
+                old_entries = {}
+
+                # A manifest written for another format or root doesn't describe this archive
+                if os.path.lexists(dest) and previous.get('format') == format and previous.get('arcroot') == arcroot:
+                    old_entries = previous.get('entries', {})
+
+                try:
+                    entries = list(walk_archive_paths(archive_paths, arcroot, dest, exclude=(manifest_path,)))
+                    manifest = build_manifest(module, entries, old_entries)
+                except (IOError, OSError):
+                    e = get_exception()
+                    module.fail_json(msg='Error reading source files for %s: %s' % (dest, str(e)))
+
+                added, modified, removed = diff_manifests(old_entries, manifest)
+                diff = dict(added=added, modified=modified, removed=removed)
+
+                if old_entries and not (added or modified or removed):
+                    unchanged = True
+
+                # tar and zip can take new members at the end; compressed tar streams can't
+                elif old_entries and not (modified or removed) and format in ('tar', 'zip'):
+                    append = True
+                    successes = [fullpath for fullpath, arcname, isdir in entries if not isdir and arcname not in added]
+                    entries = [entry for entry in entries if entry[1] in added]
+
             if check_mode:
-                changed = True
+                changed = not unchanged
+
+            elif unchanged:
+                successes = [fullpath for fullpath, arcname, isdir in entries if not isdir]
+                state = 'archive'
 
             else:
                 try:
                     # Slightly more difficult (and less efficient!) compression using zipfile module
                     if format == 'zip':
-                        arcfile = zipfile.ZipFile(dest, 'w', zipfile.ZIP_DEFLATED)
+                        arcfile = zipfile.ZipFile(dest, append and 'a' or 'w', zipfile.ZIP_DEFLATED)
 
                     # Easier compression using tarfile module
                     elif format == 'gz' or format == 'bz2':
-                        arcfile = tarfile.open(dest, 'w|' + format)
+                        if threads > 1 and HAS_MULTIPROCESSING:
+                            compressor = open_compressed(dest, format, threads)
+                            arcfile = tarfile.open(fileobj=compressor, mode='w|')
+                        else:
+                            arcfile = tarfile.open(dest, 'w|' + format)
 
                     # Or plain tar archiving
                     elif format == 'tar':
-                        arcfile = tarfile.open(dest, 'w')
-
-                    for path in archive_paths:
-                        if os.path.isdir(path):
-                            # Recurse into directories
-                            for dirpath, dirnames, filenames in os.walk(path, topdown=True):
-                                if not dirpath.endswith(os.sep):
-                                    dirpath += os.sep
-
-                                for dirname in dirnames:
-                                    fullpath = dirpath + dirname
-                                    arcname = fullpath[len(arcroot):]
-
-                                    try:
-                                        if format == 'zip':
-                                            arcfile.write(fullpath, arcname)
-                                        else:
-                                            arcfile.add(fullpath, arcname, recursive=False)
-
-                                    except Exception:
-                                        e = get_exception()
-                                        errors.append('%s: %s' % (fullpath, str(e)))
-
-                                for filename in filenames:
-                                    fullpath = dirpath + filename
-                                    arcname = fullpath[len(arcroot):]
-
-                                    if not filecmp.cmp(fullpath, dest):
-                                        try:
-                                            if format == 'zip':
-                                                arcfile.write(fullpath, arcname)
-                                            else:
-                                                arcfile.add(fullpath, arcname, recursive=False)
-
-                                            successes.append(fullpath)
-                                        except Exception:
-                                            e = get_exception()
-                                            errors.append('Adding %s: %s' % (path, str(e)))
-                        else:
+                        arcfile = tarfile.open(dest, append and 'a' or 'w')
+
+                    if entries is None:
+                        entries = walk_archive_paths(archive_paths, arcroot, dest)
+
+                    for fullpath, arcname, isdir in entries:
+                        try:
                             if format == 'zip':
-                                arcfile.write(path, path[len(arcroot):])
+                                arcfile.write(fullpath, arcname)
                             else:
-                                arcfile.add(path, path[len(arcroot):], recursive=False)
+                                arcfile.add(fullpath, arcname, recursive=False)
 
-                            successes.append(path)
+                            if not isdir:
+                                successes.append(fullpath)
+                        except Exception:
+                            e = get_exception()
+                            errors.append('Adding %s: %s' % (fullpath, str(e)))
 
                 except Exception:
                     e = get_exception()
@@ -296,10 +650,19 @@ def main():
                 if arcfile:
                     arcfile.close()
                     state = 'archive'
+                if compressor:
+                    compressor.close()
 
                 if len(errors) > 0:
                     module.fail_json(msg='Errors when writing archive at %s: %s' % (dest, '; '.join(errors)))
 
+                if manifest is not None:
+                    try:
+                        write_manifest(module, manifest_path, dict(format=format, arcroot=arcroot, entries=manifest))
+                    except (IOError, OSError):
+                        e = get_exception()
+                        module.fail_json(msg='Error writing archive manifest %s: %s' % (manifest_path, str(e)))
+
         if state in ['archive', 'incomplete'] and remove:
             for path in successes:
                 try:
@@ -314,8 +677,11 @@ def main():
             if len(errors) > 0:
                 module.fail_json(dest=dest, msg='Error deleting some source files: ' + str(e), files=errors)
 
+        if diff is not None:
+            changed = not unchanged
+
         # Rudimentary check: If size changed then file changed. Not perfect, but easy.
-        if os.path.getsize(dest) != size:
+        elif os.path.getsize(dest) != size:
             changed = True
 
         if len(successes) and state != 'incomplete':
@@ -354,12 +720,7 @@ def main():
                     else:
                         f_in = open(path, 'rb')
 
-                        if format == 'gz':
-                            f_out = gzip.open(dest, 'wb')
-                        elif format == 'bz2':
-                            f_out = bz2.BZ2File(dest, 'wb')
-                        else:
-                            raise OSError("Invalid format")
+                        f_out = open_compressed(dest, format, threads)
 
                         shutil.copyfileobj(f_in, f_out)
 
@@ -395,7 +756,12 @@ def main():
 
     changed = module.set_fs_attributes_if_different(file_args, changed)
 
-    module.exit_json(archived=successes, dest=dest, changed=changed, state=state, arcroot=arcroot, missing=missing, expanded_paths=expanded_paths)
+    result = dict(archived=successes, dest=dest, changed=changed, state=state, arcroot=arcroot, missing=missing, expanded_paths=expanded_paths)
+
+    if diff is not None:
+        result.update(diff)
+
+    module.exit_json(**result)
 
 if __name__ == '__main__':
     main()
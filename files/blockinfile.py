@@ -80,6 +80,18 @@ options:
         expresion has no matches, the block will be inserted at the end of the
         file.
     choices: [ 'BOF', '*regex*' ]
+  blocks:
+    required: false
+    default: null
+    version_added: "2.3"
+    description:
+      - A list of blocks to manage in the same file in one pass. Each item is a
+        dict taking the C(marker), C(block), C(state), C(insertafter) and
+        C(insertbefore) keys, defaulting to the values given to the module.
+      - The file is read, validated and written once for all blocks. Every
+        item needs its own marker and blocks may not overlap each other.
+      - Insertion points are looked up in the file as it was before any of
+        the blocks were applied.
   create:
     required: false
     default: 'no'
@@ -134,6 +146,22 @@ EXAMPLES = r"""
     marker: "<!-- {mark} ANSIBLE MANAGED BLOCK -->"
     content: ""
 
+- name: manage several blocks in /etc/ssh/sshd_config with one write and one validation
+  blockinfile:
+    dest: /etc/ssh/sshd_config
+    validate: /usr/sbin/sshd -T -f %s
+    blocks:
+      - marker: "# {mark} ANSIBLE MANAGED BLOCK agent"
+        block: |
+          Match User ansible-agent
+          PasswordAuthentication no
+      - marker: "# {mark} ANSIBLE MANAGED BLOCK backup"
+        block: |
+          Match User backup
+          ForceCommand internal-sftp
+      - marker: "# {mark} ANSIBLE MANAGED BLOCK legacy"
+        state: absent
+
 - name: Add mappings to /etc/hosts
   blockinfile:
     dest: /etc/hosts
@@ -150,13 +178,192 @@ import re
 import os
 import tempfile
 
+# Size of the chunks copied through unchanged between edited ranges
+COPY_BUFSIZE = 64 * 1024
+
+
+def scan_file(f, specs):
+    """
+    Make a single pass over the lines of f. For every spec (a dict with
+    marker0, marker1 and insertre) record the byte ranges (start, end) of
+    the last BEGIN marker line as n0, the last END marker line as n1 and
+    the last line matching insertre as match. Returns the file size and
+    whether it ends with a newline. Only one line is held in memory.
+    """
+    for spec in specs:
+        spec['n0'] = spec['n1'] = spec['match'] = None
+
+    pos = 0
+    line = ''
+
+    for line in f:
+        end = pos + len(line)
+        text = line.rstrip('\r\n')
+
+        for spec in specs:
+            if text.startswith(spec['marker0']):
+                spec['n0'] = (pos, end)
+            if text.startswith(spec['marker1']):
+                spec['n1'] = (pos, end)
+            if spec['insertre'] is not None and spec['insertre'].search(text):
+                spec['match'] = (pos, end)
+
+        pos = end
+
+    return dict(size=pos, newline=line.endswith('\n'))
+
+
+def read_range(f, start, end):
+    f.seek(start)
+    return f.read(end - start)
+
+
+def plan_replace(f, info, spec):
+    """
+    Return the (start, end, text) edit replacing the lines between the
+    markers of spec, both included, with its blocklines. Updates the tail
+    of info if the edit reaches the end of the file.
+    """
+    size = info['size']
+    blocklines = spec['blocklines']
+    text = '\n'.join(blocklines)
+    start = min(spec['n0'][0], spec['n1'][0])
+    end = max(spec['n0'][1], spec['n1'][1])
+
+    if end < size:
+        if blocklines:
+            text += '\n'
+    elif info['newline']:
+        if blocklines:
+            text += '\n'
+        info['tail'] = 'newline'
+    elif blocklines:
+        info['tail'] = 'open'
+    elif start > 0:
+        # The block was the unterminated last line: drop the newline before it too
+        start -= 1
+        if start > 0 and read_range(f, start - 1, start) == '\r':
+            start -= 1
+        info['tail'] = 'open'
+    else:
+        info['tail'] = 'empty'
+
+    return start, end, text
+
+
+def plan_insert(info, spec):
+    """
+    Return the (start, end, text) edit inserting the blocklines of spec
+    before or after the last line matching its regex, or at the beginning
+    or the end of the file.
+    """
+    size = info['size']
+    text = '\n'.join(spec['blocklines'])
+
+    if spec['match'] is not None:
+        if spec['insertafter'] is not None:
+            offset = spec['match'][1]
+        else:
+            offset = spec['match'][0]
+    elif spec['insertbefore'] == 'BOF':
+        offset = 0
+    else:
+        offset = size        # insertafter=EOF or no match
+
+    if offset < size:
+        text += '\n'
+    elif info['tail'] == 'newline':
+        text += '\n'
+    elif info['tail'] == 'open':
+        text = '\n' + text
+
+    if offset == size:
+        # Blocks appended after this one go after its last line
+        if text.endswith('\n'):
+            info['tail'] = 'newline'
+        else:
+            info['tail'] = 'open'
+
+    return offset, offset, text
+
+
+def plan_edits(f, info, specs):
+    """
+    Return the sorted list of (start, end, text) edits that bring every
+    spec to its wanted state, producing the same content as splitting the
+    file into lines, splicing in each block and joining them again. Lines
+    outside the edited ranges are left byte for byte as they are and edits
+    which would not change anything are dropped. Returns None if two
+    blocks overlap.
+    """
+    if info['size'] == 0:
+        info['tail'] = 'empty'
+    elif info['newline']:
+        info['tail'] = 'newline'
+    else:
+        info['tail'] = 'open'
+
+    edits = []
+
+    # Replacements first, so blocks appended at EOF see the final tail
+    for spec in specs:
+        if spec['n0'] is not None and spec['n1'] is not None:
+            edits.append(plan_replace(f, info, spec))
+
+    for spec in specs:
+        if (spec['n0'] is None or spec['n1'] is None) and spec['blocklines']:
+            edits.append(plan_insert(info, spec))
+
+    edits.sort(key=lambda edit: (edit[0], edit[1]))
+
+    pos = 0
+    for start, end, text in edits:
+        if start < pos:
+            return None
+        pos = end
+
+    if f is None:
+        return edits
+
+    return [edit for edit in edits if read_range(f, edit[0], edit[1]) != edit[2]]
+
+
+def copy_range(src, dst, start, end):
+    src.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        data = src.read(min(COPY_BUFSIZE, remaining))
+        if not data:
+            break
+        dst.write(data)
+        remaining -= len(data)
 
-def write_changes(module, contents, dest):
 
+def write_changes(module, edits, dest, path_exists):
+    """
+    Stream dest into a temporary file, replacing each (start, end, text)
+    range in edits, then validate it and move it into place.
+    """
     tmpfd, tmpfile = tempfile.mkstemp()
     f = os.fdopen(tmpfd, 'wb')
-    f.write(contents)
-    f.close()
+    src = None
+    if path_exists:
+        src = open(dest, 'rb')
+
+    try:
+        pos = 0
+        for start, end, text in edits:
+            if src is not None:
+                copy_range(src, f, pos, start)
+            f.write(text)
+            pos = end
+
+        if src is not None:
+            copy_range(src, f, pos, os.fstat(src.fileno()).st_size)
+    finally:
+        if src is not None:
+            src.close()
+        f.close()
 
     validate = module.params.get('validate', None)
     valid = not validate
@@ -197,8 +404,9 @@ def main():
             create=dict(default=False, type='bool'),
             backup=dict(default=False, type='bool'),
             validate=dict(default=None, type='str'),
+            blocks=dict(default=None, type='list'),
         ),
-        mutually_exclusive=[['insertbefore', 'insertafter']],
+        mutually_exclusive=[['insertbefore', 'insertafter'], ['block', 'blocks']],
         add_file_common_args=True,
         supports_check_mode=True
     )
@@ -217,85 +425,100 @@ def main():
         if not module.boolean(params['create']):
             module.fail_json(rc=257,
                              msg='Destination %s does not exist !' % dest)
-        original = None
-        lines = []
+
+    if params['blocks'] is None:
+        items = [dict()]
     else:
-        f = open(dest, 'rb')
-        original = f.read()
-        f.close()
-        lines = original.splitlines()
+        items = params['blocks']
+
+    specs = []
+    markers = []
+    for item in items:
+        if not isinstance(item, dict):
+            module.fail_json(msg='Each item of blocks must be a dict, got %r' % (item,))
+
+        unknown = set(item) - set(['marker', 'block', 'content', 'state', 'insertafter', 'insertbefore'])
+        if unknown:
+            module.fail_json(msg='Unsupported keys in blocks item: %s' % ', '.join(sorted(unknown)))
 
-    insertbefore = params['insertbefore']
-    insertafter = params['insertafter']
-    block = params['block']
-    marker = params['marker']
-    present = params['state'] == 'present'
+        spec = dict()
+        for key in ('marker', 'block', 'state', 'insertafter', 'insertbefore'):
+            spec[key] = item.get(key, params[key])
+        if 'content' in item:
+            spec['block'] = item['content']
+        if 'insertafter' in item or 'insertbefore' in item:
+            spec['insertafter'] = item.get('insertafter')
+            spec['insertbefore'] = item.get('insertbefore')
+
+        if spec['state'] not in ('absent', 'present'):
+            module.fail_json(msg='state must be one of present, absent, got %s' % spec['state'])
+        if spec['insertafter'] is not None and spec['insertbefore'] is not None:
+            module.fail_json(msg='parameters are mutually exclusive: insertbefore, insertafter')
+
+        if spec['marker'] in markers:
+            module.fail_json(msg='Marker %s is used by more than one block' % spec['marker'])
+        markers.append(spec['marker'])
+
+        specs.append(spec)
+
+    present = [spec for spec in specs if spec['state'] == 'present']
 
     if not present and not path_exists:
         module.exit_json(changed=False, msg="File not present")
 
-    if insertbefore is None and insertafter is None:
-        insertafter = 'EOF'
+    for spec in specs:
+        insertbefore = spec['insertbefore']
+        insertafter = spec['insertafter']
+        block = spec['block']
+        marker = spec['marker']
 
-    if insertafter not in (None, 'EOF'):
-        insertre = re.compile(insertafter)
-    elif insertbefore not in (None, 'BOF'):
-        insertre = re.compile(insertbefore)
-    else:
-        insertre = None
-
-    marker0 = re.sub(r'{mark}', 'BEGIN', marker)
-    marker1 = re.sub(r'{mark}', 'END', marker)
-    if present and block:
-        # Escape seqeuences like '\n' need to be handled in Ansible 1.x
-        if module.ansible_version.startswith('1.'):
-            block = re.sub('', block, '')
-        blocklines = [marker0] + block.splitlines() + [marker1]
-    else:
-        blocklines = []
-
-    n0 = n1 = None
-    for i, line in enumerate(lines):
-        if line.startswith(marker0):
-            n0 = i
-        if line.startswith(marker1):
-            n1 = i
-
-    if None in (n0, n1):
-        n0 = None
-        if insertre is not None:
-            for i, line in enumerate(lines):
-                if insertre.search(line):
-                    n0 = i
-            if n0 is None:
-                n0 = len(lines)
-            elif insertafter is not None:
-                n0 += 1
-        elif insertbefore is not None:
-            n0 = 0           # insertbefore=BOF
+        if insertbefore is None and insertafter is None:
+            insertafter = spec['insertafter'] = 'EOF'
+
+        if insertafter not in (None, 'EOF'):
+            spec['insertre'] = re.compile(insertafter)
+        elif insertbefore not in (None, 'BOF'):
+            spec['insertre'] = re.compile(insertbefore)
+        else:
+            spec['insertre'] = None
+
+        spec['marker0'] = re.sub(r'{mark}', 'BEGIN', marker)
+        spec['marker1'] = re.sub(r'{mark}', 'END', marker)
+        if spec['state'] == 'present' and block:
+            # Escape seqeuences like '\n' need to be handled in Ansible 1.x
+            if module.ansible_version.startswith('1.'):
+                block = re.sub('', block, '')
+            spec['blocklines'] = [spec['marker0']] + block.splitlines() + [spec['marker1']]
         else:
-            n0 = len(lines)  # insertafter=EOF
-    elif n0 < n1:
-        lines[n0:n1+1] = []
+            spec['blocklines'] = []
+
+    if path_exists:
+        f = open(dest, 'rb')
+        try:
+            info = scan_file(f, specs)
+            edits = plan_edits(f, info, specs)
+        finally:
+            f.close()
     else:
-        lines[n1:n0+1] = []
-        n0 = n1
+        for spec in specs:
+            spec['n0'] = spec['n1'] = spec['match'] = None
+        edits = plan_edits(None, dict(size=0, newline=False), specs)
 
-    lines[n0:n0] = blocklines
+    if edits is None:
+        module.fail_json(msg='Blocks overlap each other in %s' % dest)
 
-    if lines:
-        result = '\n'.join(lines)
-        if original and original.endswith('\n'):
-            result += '\n'
-    else:
-        result = ''
-    if original == result:
+    inserted = [spec for spec in specs if spec['blocklines']]
+
+    if not path_exists:
+        msg = 'File created'
+        changed = True
+    elif not edits:
         msg = ''
         changed = False
-    elif original is None:
-        msg = 'File created'
+    elif len(specs) > 1:
+        msg = '%d blocks changed' % len(edits)
         changed = True
-    elif not blocklines:
+    elif not inserted:
         msg = 'Block removed'
         changed = True
     else:
@@ -305,7 +528,7 @@ def main():
     if changed and not module.check_mode:
         if module.boolean(params['backup']) and path_exists:
             module.backup_local(dest)
-        write_changes(module, result, dest)
+        write_changes(module, edits, dest, path_exists)
 
     if module.check_mode and not path_exists:
         module.exit_json(changed=changed, msg=msg)
@@ -17,13 +17,27 @@
    along with this program; if not, write to the Free Software Foundation,
    Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301  USA"""
 
+import base64
 import datetime
 import os
 import platform
 import socket
 import sys
+import threading
 import types
 import urllib
+import urlparse
+
+try:
+    import httplib
+except ImportError:
+    import http.client as httplib
+
+try:
+    import ssl
+    HAS_SSL_CONTEXT = hasattr(ssl, "create_default_context")
+except ImportError:
+    HAS_SSL_CONTEXT = False
 
 HAS_LIB_JSON = True
 try:
@@ -185,6 +199,35 @@ options:
       - Optional for putting an object into SDT (action=sdt)
     required: false
     default: 30
+  hosts:
+    description:
+      - A list of hosts to add, update or remove in a single run
+        (target=host, action=add, update or remove). Each item is a hash
+        of the host parameters (hostname, displayname, collector,
+        description, properties, groups, alertenable); parameters not
+        given default to the ones of the task.
+      - The account's collectors, hosts and host groups are fetched once
+        and the changes are applied concurrently. The added, updated,
+        removed and unchanged hosts are returned in C(report).
+    required: false
+    default: null
+    version_added: "2.3"
+  hostgroups:
+    description:
+      - A list of host groups to add, update or remove in a single run
+        (target=hostgroup). Each item is a hash of the host group
+        parameters (fullpath, description, properties, alertenable),
+        handled like the items of C(hosts).
+    required: false
+    default: null
+    version_added: "2.3"
+  workers:
+    description:
+      - The number of hosts or host groups changed concurrently when
+        using C(hosts) or C(hostgroups)
+    required: false
+    default: 8
+    version_added: "2.3"
 ...
 '''
 EXAMPLES = '''
@@ -534,17 +577,133 @@ EXAMPLES = '''
           company='{{ company }}'
           user='{{ user }}'
           password='{{ password }}'
+
+    #example of adding all the hosts of a group in a single run
+    ---
+    - hosts: localhost
+      vars:
+        company: 'mycompany'
+        user: 'myusername'
+        password: 'mypassword'
+      tasks:
+      - name: Deploy LogicMonitor hosts in bulk
+        logicmonitor:
+          target: host
+          action: add
+          collector: mycompany-Collector
+          company: '{{ company }}'
+          user: '{{ user }}'
+          password: '{{ password }}'
+          groups: ['/servers/production']
+          workers: 16
+          hosts: "{{ groups['webservers'] | map('extract', hostvars, ['lm_host']) | list }}"
+      register: lm_report
 '''
 
 
+class LogicMonitorSession(object):
+    """Keep-alive HTTPS connection to a LogicMonitor account.
+
+    Every RPC and do call of a run goes over the same connection, which
+    is reopened once if the server closed it in between. The certificate
+    of the account is validated and https_proxy/no_proxy are honoured.
+    Without ssl.create_default_context (Python < 2.7.9) only
+    module_utils.urls can validate certificates, so every request then
+    goes through open_url on a connection of its own."""
+
+    def __init__(self, host, headers=None):
+        self.host = host
+        self.headers = headers or {}
+        self.connection = None
+
+    def connect(self):
+        context = ssl.create_default_context()
+        proxy = urllib.getproxies().get("https")
+        if not proxy or urllib.proxy_bypass(self.host):
+            return httplib.HTTPSConnection(self.host, timeout=60,
+                                           context=context)
+
+        # Tunnel through the proxy, the connection stays open to the host
+        proxy = urlparse.urlsplit(proxy)
+        tunnel_headers = {}
+        if proxy.username:
+            credentials = "%s:%s" % (urllib.unquote(proxy.username),
+                                     urllib.unquote(proxy.password or ""))
+            tunnel_headers["Proxy-Authorization"] = (
+                "Basic " + base64.b64encode(credentials))
+        connection = httplib.HTTPSConnection(proxy.hostname,
+                                             proxy.port or 3128,
+                                             timeout=60, context=context)
+        connection.set_tunnel(self.host, 443, tunnel_headers)
+        return connection
+
+    def get(self, path):
+        """Return the body of the response to a GET of path.
+        Raises IOError when the request fails."""
+        if not HAS_SSL_CONTEXT:
+            try:
+                return open_url("https://" + self.host + path,
+                                headers=self.headers, timeout=60).read()
+            except Exception:
+                raise IOError("Error: unable to reach " + self.host)
+
+        for attempt in (1, 2):
+            if self.connection is None:
+                self.connection = self.connect()
+            try:
+                self.connection.request("GET", path, headers=self.headers)
+                response = self.connection.getresponse()
+                body = response.read()
+            except ssl.CertificateError:
+                self.close()
+                raise IOError("Error: invalid certificate for " + self.host)
+            except (httplib.HTTPException, socket.error):
+                self.close()
+                if attempt == 2:
+                    raise IOError("Error: unable to reach " + self.host)
+                continue
+            if response.getheader("connection", "").lower() == "close":
+                self.close()
+            if response.status >= 400:
+                raise IOError("Error: HTTP " + str(response.status) +
+                              " from " + self.host)
+            return body
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
 class LogicMonitor(object):
 
-    def __init__(self, module, **params):
+    # RPC calls listing the account objects, with their parameters and
+    # a function extracting the list from the response data
+    LIST_CALLS = {
+        "getAgents": ({}, lambda data: data),
+        "getHostGroups": ({}, lambda data: data),
+        "getHosts": ({"hostGroupId": 1}, lambda data: data["hosts"]),
+    }
+
+    # RPC calls modifying the objects of a list. addHostGroup is missing
+    # since create_group adds the new groups to the list itself
+    LIST_CHANGED_BY = {
+        "addAgent": "getAgents",
+        "deleteAgent": "getAgents",
+        "addHost": "getHosts",
+        "updateHost": "getHosts",
+        "deleteHost": "getHosts",
+        "updateHostGroup": "getHostGroups",
+        "deleteHostGroup": "getHostGroups",
+    }
+
+    def __init__(self, module, account=None, **params):
         self.__version__ = "1.0-python"
         self.module = module
         self.module.debug("Instantiating LogicMonitor object")
 
         self.check_mode = False
+        self.change = False
         self.company = params["company"]
         self.user = params["user"]
         self.password = params["password"]
@@ -552,6 +711,25 @@ class LogicMonitor(object):
         self.lm_url = "logicmonitor.com/santaba"
         self.__version__ = self.__version__ + "-ansible-module"
 
+        domain, self.lm_path = self.lm_url.split("/", 1)
+        if account is not None:
+            # Objects of a batch share the session of their worker and
+            # the lists of the batch, which are a snapshot: every object
+            # is changed at most once, so they are not refetched
+            self.session = account.session
+            self.lists = account.lists
+            self.lists_lock = account.lists_lock
+            self.snapshot = True
+        else:
+            self.session = LogicMonitorSession(
+                self.company + "." + domain,
+                # Set custom LogicMonitor header with version
+                {"X-LM-User-Agent": self.__version__})
+            self.lists = {}
+            # Guards the indexes and the groups added by the workers
+            self.lists_lock = threading.Lock()
+            self.snapshot = False
+
     def rpc(self, action, params):
         """Make a call to the LogicMonitor RPC library
         and return the response"""
@@ -568,17 +746,12 @@ class LogicMonitor(object):
 
         param_str = param_str + creds
 
-        try:
-            url = ("https://" + self.company + "." + self.lm_url +
-                   "/rpc/" + action + "?" + param_str)
-
-            # Set custom LogicMonitor header with version
-            headers = {"X-LM-User-Agent": self.__version__}
-
-            # Set headers
-            f = open_url(url, headers=headers)
+        if action in self.LIST_CHANGED_BY and not self.snapshot:
+            self.lists.pop(self.LIST_CHANGED_BY[action], None)
 
-            raw = f.read()
+        try:
+            raw = self.session.get(
+                "/" + self.lm_path + "/rpc/" + action + "?" + param_str)
             resp = json.loads(raw)
             if resp["status"] == 403:
                 self.module.debug("Authentication failed.")
@@ -606,29 +779,59 @@ class LogicMonitor(object):
         try:
             self.module.debug("Attempting to open URL: " +
                               "https://" + self.company + "." + self.lm_url +
-                              "/do/" + action + "?" + param_str)
-            f = open_url(
-                "https://" + self.company + "." + self.lm_url +
-                "/do/" + action + "?" + param_str)
-            return f.read()
+                              "/do/" + action)
+            return self.session.get(
+                "/" + self.lm_path + "/do/" + action + "?" + param_str)
         except IOError:
             # self.module.debug("Error opening URL. " + ioe)
             self.fail("Unknown exception opening URL")
 
+    def get_list(self, action):
+        """Returns the objects listed by one of the LIST_CALLS,
+        fetched once per run, or None if the RPC call fails"""
+        self.module.debug("Running LogicMonitor.get_list...")
+
+        if action not in self.lists:
+            params, extract = self.LIST_CALLS[action]
+            self.module.debug("Making RPC call to '" + action + "'")
+            resp = json.loads(self.rpc(action, params))
+
+            if resp["status"] != 200:
+                self.module.debug("RPC call failed")
+                self.module.debug(resp)
+                return None
+
+            self.module.debug("RPC call succeeded")
+            self.lists[action] = {"items": extract(resp["data"]),
+                                  "indexes": {}}
+        return self.lists[action]["items"]
+
+    def lookup(self, action, fields, values):
+        """Returns the object listed by action whose fields
+        match values, using an index built once per list"""
+        if self.get_list(action) is None:
+            return None
+
+        self.lists_lock.acquire()
+        try:
+            indexes = self.lists[action]["indexes"]
+            if fields not in indexes:
+                indexes[fields] = dict(
+                    (tuple(item.get(field) for field in fields), item)
+                    for item in self.lists[action]["items"])
+            return indexes[fields].get(values)
+        finally:
+            self.lists_lock.release()
+
     def get_collectors(self):
         """Returns a JSON object containing a list of
         LogicMonitor collectors"""
         self.module.debug("Running LogicMonitor.get_collectors...")
 
-        self.module.debug("Making RPC call to 'getAgents'")
-        resp = self.rpc("getAgents", {})
-        resp_json = json.loads(resp)
-
-        if resp_json["status"] is 200:
-            self.module.debug("RPC call succeeded")
-            return resp_json["data"]
-        else:
-            self.fail(msg=resp)
+        collectors = self.get_list("getAgents")
+        if collectors is None:
+            self.fail(msg="Error: unable to retrieve the collector list")
+        return collectors
 
     def get_host_by_hostname(self, hostname, collector):
         """Returns a host object for the host matching the
@@ -636,30 +839,18 @@ class LogicMonitor(object):
         self.module.debug("Running LogicMonitor.get_host_by_hostname...")
 
         self.module.debug("Looking for hostname " + hostname)
-        self.module.debug("Making RPC call to 'getHosts'")
-        hostlist_json = json.loads(self.rpc("getHosts", {"hostGroupId": 1}))
-
         if collector:
-            if hostlist_json["status"] == 200:
-                self.module.debug("RPC call succeeded")
-
-                hosts = hostlist_json["data"]["hosts"]
-
-                self.module.debug(
-                    "Looking for host matching: hostname " + hostname +
-                    " and collector " + str(collector["id"]))
-
-                for host in hosts:
-                    if (host["hostName"] == hostname and
-                       host["agentId"] == collector["id"]):
-
-                        self.module.debug("Host match found")
-                        return host
-                self.module.debug("No host match found")
-                return None
-            else:
-                self.module.debug("RPC call failed")
-                self.module.debug(hostlist_json)
+            self.module.debug(
+                "Looking for host matching: hostname " + hostname +
+                " and collector " + str(collector["id"]))
+
+            host = self.lookup("getHosts", ("hostName", "agentId"),
+                               (hostname, collector["id"]))
+            if host:
+                self.module.debug("Host match found")
+                return host
+            self.module.debug("No host match found")
+            return None
         else:
             self.module.debug("No collector specified")
             return None
@@ -670,17 +861,12 @@ class LogicMonitor(object):
         self.module.debug("Running LogicMonitor.get_host_by_displayname...")
 
         self.module.debug("Looking for displayname " + displayname)
-        self.module.debug("Making RPC call to 'getHost'")
-        host_json = (json.loads(self.rpc("getHost",
-                                {"displayName": displayname})))
-
-        if host_json["status"] == 200:
-            self.module.debug("RPC call succeeded")
-            return host_json["data"]
-        else:
-            self.module.debug("RPC call failed")
-            self.module.debug(host_json)
-            return None
+        host = self.lookup("getHosts", ("displayedAs",), (displayname,))
+        if host:
+            self.module.debug("Host match found")
+            return host
+        self.module.debug("No host match found")
+        return None
 
     def get_collector_by_description(self, description):
         """Returns a JSON collector object for the collector
@@ -689,14 +875,13 @@ class LogicMonitor(object):
             "Running LogicMonitor.get_collector_by_description..."
         )
 
-        collector_list = self.get_collectors()
-        if collector_list is not None:
-            self.module.debug("Looking for collector with description {0}" +
-                              description)
-            for collector in collector_list:
-                if collector["description"] == description:
-                    self.module.debug("Collector match found")
-                    return collector
+        self.get_collectors()
+        self.module.debug("Looking for collector with description " +
+                          description)
+        collector = self.lookup("getAgents", ("description",), (description,))
+        if collector:
+            self.module.debug("Collector match found")
+            return collector
         self.module.debug("No collector match found")
         return None
 
@@ -705,30 +890,50 @@ class LogicMonitor(object):
         specified path"""
         self.module.debug("Running LogicMonitor.get_group...")
 
-        self.module.debug("Making RPC call to getHostGroups")
-        resp = json.loads(self.rpc("getHostGroups", {}))
-
-        if resp["status"] == 200:
-            self.module.debug("RPC called succeeded")
-            groups = resp["data"]
-
-            self.module.debug("Looking for group matching " + fullpath)
-            for group in groups:
-                if group["fullPath"] == fullpath.lstrip('/'):
-                    self.module.debug("Group match found")
-                    return group
+        self.module.debug("Looking for group matching " + fullpath)
+        group = self.lookup("getHostGroups", ("fullPath",),
+                            (fullpath.lstrip('/'),))
+        if group:
+            self.module.debug("Group match found")
+            return group
+        self.module.debug("No group match found")
+        return None
 
-            self.module.debug("No group match found")
-            return None
-        else:
+    def add_group(self, group):
+        """Adds a newly created group to the group list"""
+        self.lists_lock.acquire()
+        try:
+            if "getHostGroups" in self.lists:
+                self.lists["getHostGroups"]["items"].append(group)
+                indexes = self.lists["getHostGroups"]["indexes"]
+                for fields, index in indexes.items():
+                    index[tuple(group.get(field) for field in fields)] = group
+        finally:
+            self.lists_lock.release()
+
+    def refresh_group(self, fullpath):
+        """Returns a group created since the group list was fetched.
+        The shared list of a batch is kept and the group added to it,
+        other objects refetch the whole list"""
+        if not self.snapshot:
+            self.lists.pop("getHostGroups", None)
+            return self.get_group(fullpath)
+
+        params, extract = self.LIST_CALLS["getHostGroups"]
+        resp = json.loads(self.rpc("getHostGroups", params))
+        if resp["status"] != 200:
             self.module.debug("RPC call failed")
-            self.module.debug(resp)
+            return None
 
+        for group in extract(resp["data"]):
+            if group.get("fullPath") == fullpath.lstrip('/'):
+                self.add_group(group)
+                return group
         return None
 
     def create_group(self, fullpath):
-        """Recursively create a path of host groups.
-        Returns the id of the newly created hostgroup"""
+        """Create the missing host groups of a path, walking it
+        once from the root. Returns the id of the last hostgroup"""
         self.module.debug("Running LogicMonitor.create_group...")
 
         res = self.get_group(fullpath)
@@ -739,32 +944,32 @@ class LogicMonitor(object):
         if fullpath == "/":
             self.module.debug("Specified group is root. Doing nothing.")
             return 1
-        else:
-            self.module.debug("Creating group named " + fullpath)
-            self.module.debug("System changed")
-            self.change = True
 
-            if self.check_mode:
-                self.exit(changed=True)
+        self.module.debug("Creating group named " + fullpath)
+        self.module.debug("System changed")
+        self.change = True
 
-            parentpath, name = fullpath.rsplit('/', 1)
-            parentgroup = self.get_group(parentpath)
+        if self.check_mode:
+            self.exit(changed=True)
 
-            parentid = 1
+        names = fullpath.strip('/').split('/')
+        parentid = 1
 
-            if parentpath == "":
-                parentid = 1
-            elif parentgroup:
-                parentid = parentgroup["id"]
-            else:
-                parentid = self.create_group(parentpath)
+        for depth in range(1, len(names) + 1):
+            path = '/'.join(names[:depth])
+            name = names[depth - 1]
+
+            group = self.get_group(path)
+            if group:
+                parentid = group["id"]
+                continue
 
             h = None
 
             # Determine if we're creating a group from host or hostgroup class
             if hasattr(self, '_build_host_group_hash'):
                 h = self._build_host_group_hash(
-                    fullpath,
+                    '/' + path,
                     self.description,
                     self.properties,
                     self.alertenable)
@@ -782,17 +987,26 @@ class LogicMonitor(object):
 
             if resp["status"] == 200:
                 self.module.debug("RPC call succeeded")
-                return resp["data"]["id"]
+                group = resp["data"]
+                group.setdefault("fullPath", path)
+                self.add_group(group)
             elif resp["errmsg"] == "The record already exists":
                 self.module.debug("The hostgroup already exists")
-                group = self.get_group(fullpath)
-                return group["id"]
+                group = self.refresh_group(path)
+                if group is None:
+                    self.fail(
+                        msg="Error: unable to find existing hostgroup \"" +
+                            name + "\".")
             else:
                 self.module.debug("RPC call failed")
                 self.fail(
                     msg="Error: unable to create new hostgroup \"" +
                         name + "\".\n" + resp["errmsg"])
 
+            parentid = group["id"]
+
+        return parentid
+
     def fail(self, msg):
         self.module.fail_json(msg=msg, changed=self.change, failed=True)
 
@@ -1140,13 +1354,13 @@ class Collector(LogicMonitor):
 
 class Host(LogicMonitor):
 
-    def __init__(self, params, module=None):
+    def __init__(self, params, module=None, account=None):
         """Initializor for the LogicMonitor host object"""
         self.change = False
         self.params = params
         self.collector = None
 
-        LogicMonitor.__init__(self, module, **self.params)
+        LogicMonitor.__init__(self, module, account, **self.params)
         self.module.debug("Instantiating Host object")
 
         if self.params["hostname"]:
@@ -1718,12 +1932,12 @@ class Datasource(LogicMonitor):
 
 class Hostgroup(LogicMonitor):
 
-    def __init__(self, params, module=None):
+    def __init__(self, params, module=None, account=None):
         """Initializor for the LogicMonitor host object"""
         self.change = False
         self.params = params
 
-        LogicMonitor.__init__(self, module, **self.params)
+        LogicMonitor.__init__(self, module, account, **self.params)
         self.module.debug("Instantiating Hostgroup object")
 
         self.fullpath = self.params["fullpath"]
@@ -2063,12 +2277,122 @@ class Hostgroup(LogicMonitor):
                 msg="Error: Group doesn't exist. Unable to verify properties")
 
 
+class BatchError(Exception):
+    pass
+
+
+class BatchModule(object):
+    """Stand-in for the AnsibleModule given to the objects of a batch,
+    turning their failures into exceptions instead of exiting"""
+
+    def __init__(self, module):
+        self.module = module
+
+    def __getattr__(self, name):
+        return getattr(self.module, name)
+
+    def fail_json(self, **kwargs):
+        raise BatchError(kwargs.get("msg"))
+
+    def exit_json(self, **kwargs):
+        raise BatchError("Unexpected exit")
+
+
+def reconcile(module, target_class, items, workers):
+    """Add, update or remove a list of hosts or host groups in one run.
+    The account lists are fetched once, each item is compared with them
+    and the changes are applied by workers threads, each with its own
+    session. Returns the report of the changes"""
+    module.debug("Running reconcile...")
+
+    action = module.params["action"].lower()
+    batch_module = BatchModule(module)
+
+    account = LogicMonitor(module, **module.params)
+    for list_call in LogicMonitor.LIST_CALLS:
+        if account.get_list(list_call) is None:
+            module.fail_json(msg="Error: unable to retrieve " + list_call)
+
+    report = {"added": [], "updated": [], "removed": [], "unchanged": [],
+              "failed": {}}
+    pending = list(items)
+    lock = threading.Lock()
+
+    def apply_item(worker, item):
+        params = dict(module.params, **item)
+        if target_class is Host:
+            name = params["displayname"] or params["hostname"]
+            if ((action == "add" or params["displayname"] is None) and
+               params["collector"] is None):
+                raise BatchError("Parameter 'collector' required.")
+        else:
+            name = params["fullpath"]
+            if name is None:
+                raise BatchError("Parameter 'fullpath' required.")
+
+        target = target_class(params, batch_module, worker)
+        existed = target.info is not None
+
+        if action == "add":
+            target.create()
+        elif action == "update":
+            target.update()
+        else:
+            target.remove()
+
+        if not target.change:
+            return name, "unchanged"
+        elif action == "remove":
+            return name, "removed"
+        elif existed:
+            return name, "updated"
+        return name, "added"
+
+    def run():
+        worker = LogicMonitor(batch_module, account, **module.params)
+        worker.session = LogicMonitorSession(account.session.host,
+                                             account.session.headers)
+        try:
+            while True:
+                lock.acquire()
+                try:
+                    if not pending:
+                        return
+                    item = pending.pop(0)
+                finally:
+                    lock.release()
+                try:
+                    name, result = apply_item(worker, item)
+                    report[result].append(name)
+                except Exception:
+                    e = get_exception()
+                    name = item.get("displayname") or item.get("hostname") or item.get("fullpath")
+                    report["failed"][str(name)] = str(e)
+        finally:
+            worker.session.close()
+
+    threads = []
+    for i in range(min(workers, len(items))):
+        t = threading.Thread(target=run)
+        t.daemon = True
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+
+    return report
+
+
 def selector(module):
     """Figure out which object and which actions
     to take given the right parameters"""
 
     if module.params["target"] == "collector":
         target = Collector(module.params, module)
+    elif module.params["target"] == "host" and module.params["hosts"]:
+        target = None
+        items = module.params["hosts"]
+        target_class = Host
     elif module.params["target"] == "host":
         # Make sure required parameter collector is specified
         if ((module.params["action"] == "add" or
@@ -2089,6 +2413,10 @@ def selector(module):
                           module.params["action"] + "\" was specified.")
                 module.fail_json(msg=errmsg)
 
+    elif module.params["target"] == "hostgroup" and module.params["hostgroups"]:
+        target = None
+        items = module.params["hostgroups"]
+        target_class = Hostgroup
     elif module.params["target"] == "hostgroup":
         # Validate target specific required parameters
         if module.params["fullpath"] is not None:
@@ -2101,6 +2429,22 @@ def selector(module):
             msg="Error: Unexpected target \"" + module.params["target"] +
                 "\" was specified.")
 
+    if target is None:
+        if module.params["action"].lower() not in ["add", "update", "remove"]:
+            module.fail_json(
+                msg="Error: Unexpected action \"" + module.params["action"] +
+                    "\" was specified for a list of objects.")
+        report = reconcile(module, target_class, items,
+                           module.params["workers"])
+        changed = bool(report["added"] or report["updated"] or
+                       report["removed"])
+        if report["failed"]:
+            module.fail_json(msg="Error: unable to apply " +
+                             str(len(report["failed"])) + " of " +
+                             str(len(items)) + " objects",
+                             changed=changed, report=report)
+        module.exit_json(changed=changed, report=report)
+
     if module.params["action"].lower() == "add":
         action = target.create
     elif module.params["action"].lower() == "remove":
@@ -2149,7 +2493,10 @@ def main():
             duration=dict(required=False, default=30),
             properties=dict(required=False, default={}, type="dict"),
             groups=dict(required=False, default=[], type="list"),
-            alertenable=dict(required=False, default="true", choices=BOOLEANS)
+            alertenable=dict(required=False, default="true", choices=BOOLEANS),
+            hosts=dict(required=False, default=None, type="list"),
+            hostgroups=dict(required=False, default=None, type="list"),
+            workers=dict(required=False, default=8, type="int")
         ),
         supports_check_mode=True
     )
@@ -2161,8 +2508,8 @@ def main():
 
 
 from ansible.module_utils.basic import *
+from ansible.module_utils.pycompat24 import get_exception
 from ansible.module_utils.urls import *
-from ansible.module_utils.urls import open_url
 
 
 if __name__ == "__main__":
@@ -79,6 +79,49 @@ options:
     default: null
     choices: []
     aliases: []
+  workers:
+    description:
+      - Number of fact categories to collect concurrently. Each worker
+        beyond the first opens its own iControl session.
+    required: false
+    default: 4
+    version_added: "2.3"
+  backend:
+    description:
+      - iControl API to collect facts with. C(rest) fetches each fact
+        category with a single iControl REST request and returns the
+        iControl REST attributes of each object, which differ from the
+        C(soap) ones. C(rest) does not require bigsuds.
+    required: false
+    default: soap
+    choices: ['soap', 'rest']
+    version_added: "2.3"
+  cache_dir:
+    description:
+      - Directory to cache collected facts in, keyed by server, include,
+        filter and backend. When cached facts younger than C(cache_ttl)
+        exist, they are returned without contacting the BIG-IP. By default
+        facts are not cached.
+    required: false
+    default: null
+    version_added: "2.3"
+  cache_ttl:
+    description:
+      - Number of seconds cached facts stay fresh.
+    required: false
+    default: 300
+    version_added: "2.3"
+  changed_since:
+    description:
+      - Collect fresh facts and compare them with the cached ones. Only
+        the objects that were added or changed since are returned, and
+        the keys of removed objects are returned in C(removed). Fact
+        categories without per-object keys are returned whole when they
+        changed. The cache is then updated. Requires C(cache_dir).
+    required: false
+    default: false
+    choices: ['yes', 'no']
+    version_added: "2.3"
 extends_documentation_fragment: f5
 '''
 
@@ -90,6 +133,39 @@ EXAMPLES = '''
       password: "secret"
       include: "interface,vlan"
   delegate_to: localhost
+
+- name: Collect BIG-IP facts with iControl REST
+  bigip_facts:
+      server: "lb.mydomain.com"
+      user: "admin"
+      password: "secret"
+      include: "virtual_server,pool,node"
+      backend: rest
+      workers: 8
+  delegate_to: localhost
+
+- name: Collect only the virtual servers changed since the last run
+  bigip_facts:
+      server: "lb.mydomain.com"
+      user: "admin"
+      password: "secret"
+      include: "virtual_server"
+      cache_dir: "~/.ansible/bigip_facts"
+      changed_since: yes
+  delegate_to: localhost
+'''
+
+RETURN = '''
+removed:
+    description: Keys of the objects removed since the cached facts, per fact category
+    returned: changed_since
+    type: dict
+    sample: {"pool": ["/Common/old_pool"]}
+cached:
+    description: Whether the facts were returned from the cache
+    returned: cache_dir
+    type: bool
+    sample: true
 '''
 
 try:
@@ -100,7 +176,14 @@ else:
     bigsuds_found = True
 
 import fnmatch
+import hashlib
+import json
+import os
 import re
+import sys
+import tempfile
+import threading
+import time
 import traceback
 
 
@@ -113,10 +196,12 @@ class F5(object):
         api: iControl API instance.
     """
 
-    def __init__(self, host, user, password, session=False, validate_certs=True, port=443):
+    def __init__(self, host, user, password, session=False, validate_certs=True, port=443, cache=None):
         self.api = bigip_api(host, user, password, validate_certs, port)
         if session:
             self.start_session()
+        if cache is not None:
+            self.api = CachedApi(self.api, cache)
 
     def start_session(self):
         self.api = self.api.with_session_id()
@@ -143,6 +228,67 @@ class F5(object):
         return self.api.System.Session.get_active_folder()
 
 
+class CallCache(object):
+    """iControl call cache.
+
+    Results of iControl calls keyed by method and arguments, shared by all
+    sessions of a run. A call in progress in another thread is waited for
+    rather than made again.
+
+    Attributes:
+        results: Call results keyed by method path and arguments.
+        locks: One lock per call key.
+    """
+
+    def __init__(self):
+        self.results = {}
+        self.locks = {}
+        self.lock = threading.Lock()
+
+    def call(self, path, method, args, kwargs):
+        key = (path, repr(args), repr(sorted(kwargs.items())))
+        self.lock.acquire()
+        try:
+            key_lock = self.locks.setdefault(key, threading.Lock())
+        finally:
+            self.lock.release()
+
+        key_lock.acquire()
+        try:
+            if key not in self.results:
+                self.results[key] = method(*args, **kwargs)
+            return self.results[key]
+        finally:
+            key_lock.release()
+
+
+class CachedApi(object):
+    """Memoizing iControl API proxy.
+
+    Identical get_* and is_* calls go to the BIG-IP once per run. Session
+    state calls are passed through, since they differ per session.
+
+    Attributes:
+        api: Wrapped iControl API, interface or method.
+        cache: CallCache shared by all sessions.
+        path: Attribute names leading from the API to the wrapped object.
+    """
+
+    def __init__(self, api, cache, path=()):
+        self.api = api
+        self.cache = cache
+        self.path = path
+
+    def __getattr__(self, name):
+        attr = getattr(self.api, name)
+        path = self.path + (name,)
+        if path[:2] == ('System', 'Session'):
+            return attr
+        if name.startswith('get_') or name.startswith('is_'):
+            return lambda *args, **kwargs: self.cache.call(path, attr, args, kwargs)
+        return CachedApi(attr, self.cache, path)
+
+
 class Interfaces(object):
     """Interfaces class.
 
@@ -1607,6 +1753,236 @@ def generate_provision_dict(f5):
     return generate_simple_dict(provisioned, fields)
 
 
+# Fact categories and the functions generating them
+FACT_GENERATORS = {
+    'address_class': generate_address_class_dict,
+    'certificate': generate_certificate_dict,
+    'client_ssl_profile': generate_client_ssl_profile_dict,
+    'device': generate_device_dict,
+    'device_group': generate_device_group_dict,
+    'interface': generate_interface_dict,
+    'key': generate_key_dict,
+    'node': generate_node_dict,
+    'pool': generate_pool_dict,
+    'provision': lambda f5, regex: generate_provision_dict(f5),
+    'rule': generate_rule_dict,
+    'self_ip': generate_self_ip_dict,
+    'software': lambda f5, regex: generate_software_list(f5),
+    'system_info': lambda f5, regex: generate_system_info_dict(f5),
+    'traffic_group': generate_traffic_group_dict,
+    'trunk': generate_trunk_dict,
+    'virtual_address': generate_virtual_address_dict,
+    'virtual_server': generate_vs_dict,
+    'vlan': generate_vlan_dict,
+}
+
+# Fact categories keyed by object
+PER_OBJECT_FACTS = ('address_class', 'certificate', 'client_ssl_profile',
+                    'device', 'device_group', 'interface', 'key', 'node',
+                    'pool', 'rule', 'self_ip', 'traffic_group', 'trunk',
+                    'virtual_address', 'virtual_server', 'vlan')
+
+# iControl REST collections of the fact categories
+REST_COLLECTIONS = {
+    'address_class': 'ltm/data-group/internal',
+    'certificate': 'sys/file/ssl-cert',
+    'client_ssl_profile': 'ltm/profile/client-ssl',
+    'device': 'cm/device',
+    'device_group': 'cm/device-group',
+    'interface': 'net/interface',
+    'key': 'sys/file/ssl-key',
+    'node': 'ltm/node',
+    'pool': 'ltm/pool',
+    'provision': 'sys/provision',
+    'rule': 'ltm/rule',
+    'self_ip': 'net/self',
+    'software': 'sys/software/volume',
+    'system_info': 'sys/hardware',
+    'traffic_group': 'cm/traffic-group',
+    'trunk': 'net/trunk',
+    'virtual_address': 'ltm/virtual-address',
+    'virtual_server': 'ltm/virtual',
+    'vlan': 'net/vlan',
+}
+
+
+def run_concurrently(workers, func, items):
+    """Return [func(worker, item) for item in items].
+
+    Each worker, such as an F5 session, is used by one thread at a time;
+    the items are spread over the workers.
+    """
+    if len(workers) == 1:
+        return [func(workers[0], item) for item in items]
+
+    results = [None] * len(items)
+    errors = []
+    pending = list(range(len(items)))
+    lock = threading.Lock()
+
+    def run(worker):
+        while True:
+            lock.acquire()
+            try:
+                if not pending or errors:
+                    return
+                i = pending.pop(0)
+            finally:
+                lock.release()
+            try:
+                results[i] = func(worker, items[i])
+            except Exception:
+                errors.append(sys.exc_info())
+
+    threads = []
+    for worker in workers[:len(items)]:
+        t = threading.Thread(target=run, args=(worker,))
+        t.daemon = True
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+
+    if errors:
+        raise errors[0][1]
+    return results
+
+
+def generate_rest_facts(module, include, regex, workers):
+    """Collect the fact categories in include over iControl REST.
+
+    Every category is a single request for its collection, with
+    subcollections such as pool members expanded in place. Objects are
+    keyed by their full path; their attributes are the iControl REST ones.
+    """
+    base = "https://%s:%s/mgmt/tm/" % (module.params['server'], module.params['server_port'])
+    re_filter = regex and re.compile(regex)
+
+    def fetch(worker, name):
+        response = open_url(base + REST_COLLECTIONS[name] + '?expandSubcollections=true',
+                            url_username=module.params['user'],
+                            url_password=module.params['password'],
+                            validate_certs=module.params['validate_certs'],
+                            force_basic_auth=True)
+        collection = json.loads(response.read())
+        if name == 'system_info':
+            return collection.get('entries', {})
+        items = collection.get('items', [])
+        if name in ('provision', 'software'):
+            return items
+        result = {}
+        for item in items:
+            key = item.get('fullPath', item.get('name'))
+            if not re_filter or re_filter.search(key):
+                result[key] = item
+        return result
+
+    return dict(zip(include, run_concurrently([None] * workers, fetch, include)))
+
+
+def generate_soap_facts(module, include, regex, workers):
+    """Collect the fact categories in include over iControl SOAP.
+
+    The categories are generated concurrently, each worker on its own
+    session; identical calls are made only once.
+    """
+    server = module.params['server']
+    server_port = module.params['server_port']
+    user = module.params['user']
+    password = module.params['password']
+    validate_certs = module.params['validate_certs']
+    session = module.params['session']
+
+    cache = CallCache()
+    f5 = F5(server, user, password, session, validate_certs, server_port, cache)
+    saved_active_folder = f5.get_active_folder()
+    saved_recursive_query_state = f5.get_recursive_query_state()
+    if saved_active_folder != "/":
+        f5.set_active_folder("/")
+    if saved_recursive_query_state != "STATE_ENABLED":
+        f5.enable_recursive_query_state()
+
+    # Folder and query state are per session, so the other workers
+    # always get their own
+    sessions = [f5]
+    for i in range(1, min(workers, len(include))):
+        worker = F5(server, user, password, True, validate_certs, server_port, cache)
+        worker.set_active_folder("/")
+        worker.enable_recursive_query_state()
+        sessions.append(worker)
+
+    generate = lambda worker, name: FACT_GENERATORS[name](worker, regex)
+    facts = dict(zip(include, run_concurrently(sessions, generate, include)))
+
+    # restore saved state
+    if saved_active_folder and saved_active_folder != "/":
+        f5.set_active_folder(saved_active_folder)
+    if saved_recursive_query_state and \
+       saved_recursive_query_state != "STATE_ENABLED":
+        f5.set_recursive_query_state(saved_recursive_query_state)
+
+    return facts
+
+
+def cache_path(module, include):
+    """Return the cache file of the facts collected with these parameters.
+
+    The user is part of the key, as what a BIG-IP returns depends on the
+    partitions and roles of the account.
+    """
+    key = json.dumps([module.params['server'], module.params['server_port'],
+                      module.params['user'], sorted(include), module.params['filter'],
+                      module.params['backend']])
+    cache_dir = os.path.expanduser(module.params['cache_dir'])
+    return os.path.join(cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+
+def load_cached_facts(path, ttl=None):
+    """Return the facts cached in path, or None if missing or older than ttl."""
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+    except (IOError, ValueError):
+        return None
+    if ttl is not None and time.time() - cached['timestamp'] > ttl:
+        return None
+    return cached['facts']
+
+
+def save_cached_facts(path, facts):
+    cache_dir = os.path.dirname(path)
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'timestamp': time.time(), 'facts': facts}, f)
+        os.rename(tmp, path)
+    except Exception:
+        os.unlink(tmp)
+        raise
+
+
+def diff_facts(old, new):
+    """Return the facts in new that differ from old, and the removed keys.
+
+    Categories keyed by object are compared object by object; other
+    categories are compared whole.
+    """
+    changed = {}
+    removed = {}
+    for name, value in new.items():
+        previous = old.get(name)
+        if isinstance(value, dict) and isinstance(previous, dict) and name in PER_OBJECT_FACTS:
+            changed[name] = dict((k, v) for k, v in value.items() if previous.get(k) != v)
+            gone = sorted(k for k in previous if k not in value)
+            if gone:
+                removed[name] = gone
+        elif value != previous:
+            changed[name] = value
+    return changed, removed
+
+
 def main():
     argument_spec = f5_argument_spec()
 
@@ -1614,6 +1990,11 @@ def main():
         session=dict(type='bool', default=False),
         include=dict(type='list', required=True),
         filter=dict(type='str', required=False),
+        workers=dict(type='int', default=4),
+        backend=dict(default='soap', choices=['soap', 'rest']),
+        cache_dir=dict(type='path'),
+        cache_ttl=dict(type='int', default=300),
+        changed_since=dict(type='bool', default=False),
     )
     argument_spec.update(meta_args)
 
@@ -1621,18 +2002,21 @@ def main():
         argument_spec=argument_spec
     )
 
-    if not bigsuds_found:
-        module.fail_json(msg="the python suds and bigsuds modules are required")
-
-    server = module.params['server']
-    server_port = module.params['server_port']
-    user = module.params['user']
-    password = module.params['password']
+    backend = module.params['backend']
+    workers = module.params['workers']
     validate_certs = module.params['validate_certs']
-    session = module.params['session']
     fact_filter = module.params['filter']
 
-    if validate_certs:
+    if backend == 'soap' and not bigsuds_found:
+        module.fail_json(msg="the python suds and bigsuds modules are required")
+
+    if workers < 1:
+        module.fail_json(msg="workers must be at least 1")
+
+    if module.params['changed_since'] and not module.params['cache_dir']:
+        module.fail_json(msg="changed_since requires cache_dir")
+
+    if backend == 'soap' and validate_certs:
         import ssl
         if not hasattr(ssl, 'SSLContext'):
             module.fail_json(msg='bigsuds does not support verifying certificates with python < 2.7.9.  Either update python or set validate_certs=False on the task')
@@ -1641,7 +2025,7 @@ def main():
         regex = fnmatch.translate(fact_filter)
     else:
         regex = None
-    include = [x.lower() for x in module.params['include']]
+    include = list(set(x.lower() for x in module.params['include']))
     valid_includes = ('address_class', 'certificate', 'client_ssl_profile',
                       'device', 'device_group', 'interface', 'key', 'node',
                       'pool', 'provision', 'rule', 'self_ip', 'software',
@@ -1653,63 +2037,30 @@ def main():
 
     try:
         facts = {}
+        result = {}
+
+        if module.params['cache_dir']:
+            path = cache_path(module, include)
+            if module.params['changed_since']:
+                cached_facts = load_cached_facts(path)
+            else:
+                cached_facts = load_cached_facts(path, module.params['cache_ttl'])
+                if cached_facts is not None:
+                    module.exit_json(ansible_facts=cached_facts, cached=True)
+            result['cached'] = False
 
         if len(include) > 0:
-            f5 = F5(server, user, password, session, validate_certs, server_port)
-            saved_active_folder = f5.get_active_folder()
-            saved_recursive_query_state = f5.get_recursive_query_state()
-            if saved_active_folder != "/":
-                f5.set_active_folder("/")
-            if saved_recursive_query_state != "STATE_ENABLED":
-                f5.enable_recursive_query_state()
-
-            if 'interface' in include:
-                facts['interface'] = generate_interface_dict(f5, regex)
-            if 'self_ip' in include:
-                facts['self_ip'] = generate_self_ip_dict(f5, regex)
-            if 'trunk' in include:
-                facts['trunk'] = generate_trunk_dict(f5, regex)
-            if 'vlan' in include:
-                facts['vlan'] = generate_vlan_dict(f5, regex)
-            if 'virtual_server' in include:
-                facts['virtual_server'] = generate_vs_dict(f5, regex)
-            if 'pool' in include:
-                facts['pool'] = generate_pool_dict(f5, regex)
-            if 'provision' in include:
-                facts['provision'] = generate_provision_dict(f5)
-            if 'device' in include:
-                facts['device'] = generate_device_dict(f5, regex)
-            if 'device_group' in include:
-                facts['device_group'] = generate_device_group_dict(f5, regex)
-            if 'traffic_group' in include:
-                facts['traffic_group'] = generate_traffic_group_dict(f5, regex)
-            if 'rule' in include:
-                facts['rule'] = generate_rule_dict(f5, regex)
-            if 'node' in include:
-                facts['node'] = generate_node_dict(f5, regex)
-            if 'virtual_address' in include:
-                facts['virtual_address'] = generate_virtual_address_dict(f5, regex)
-            if 'address_class' in include:
-                facts['address_class'] = generate_address_class_dict(f5, regex)
-            if 'software' in include:
-                facts['software'] = generate_software_list(f5)
-            if 'certificate' in include:
-                facts['certificate'] = generate_certificate_dict(f5, regex)
-            if 'key' in include:
-                facts['key'] = generate_key_dict(f5, regex)
-            if 'client_ssl_profile' in include:
-                facts['client_ssl_profile'] = generate_client_ssl_profile_dict(f5, regex)
-            if 'system_info' in include:
-                facts['system_info'] = generate_system_info_dict(f5)
-
-            # restore saved state
-            if saved_active_folder and saved_active_folder != "/":
-                f5.set_active_folder(saved_active_folder)
-            if saved_recursive_query_state and \
-               saved_recursive_query_state != "STATE_ENABLED":
-                f5.set_recursive_query_state(saved_recursive_query_state)
-
-        result = {'ansible_facts': facts}
+            if backend == 'rest':
+                facts = generate_rest_facts(module, include, regex, workers)
+            else:
+                facts = generate_soap_facts(module, include, regex, workers)
+
+        if module.params['cache_dir']:
+            save_cached_facts(path, facts)
+            if module.params['changed_since']:
+                facts, result['removed'] = diff_facts(cached_facts or {}, facts)
+
+        result['ansible_facts'] = facts
 
     except Exception as e:
         module.fail_json(msg="received exception: %s\ntraceback: %s" % (e, traceback.format_exc()))
@@ -1719,6 +2070,7 @@ def main():
 # include magic from lib/ansible/module_common.py
 from ansible.module_utils.basic import *
 from ansible.module_utils.f5 import *
+from ansible.module_utils.urls import open_url
 
 if __name__ == '__main__':
     main()
@@ -39,9 +39,27 @@ options:
     default: auto-detected
   host:
     description:
-      - Name of the backend host to change.
-    required: true
+      - Name of the backend host to change. Required unless C(hosts) is given.
+    required: false
+    default: null
+  hosts:
+    description:
+      - List of backend hosts to change in one pass, across all matched
+        backends (or only C(backend) if given). Commands for all of them are
+        pipelined over a single connection and, with C(wait), all servers are
+        polled together from one stat snapshot per retry.
+      - Mutually exclusive with C(host).
+    required: false
     default: null
+    version_added: "2.3"
+  host_match:
+    description:
+      - How the entries of C(hosts) are matched against server names,
+        literally, as shell-style globs or as regular expressions.
+    required: false
+    default: exact
+    choices: [ "exact", "glob", "regex" ]
+    version_added: "2.3"
   shutdown_sessions:
     description:
       - When disabling a server, immediately terminate all the sessions attached
@@ -66,6 +84,13 @@ options:
     required: false
     default: false
     version_added: "2.2"
+  timeout:
+    description:
+      - Number of seconds to wait for an answer of HAProxy on its socket
+        before failing.
+    required: false
+    default: 30
+    version_added: "2.3"
   wait:
     description:
       - Wait until the server reports a status of 'UP' when `state=enabled`, or
@@ -123,6 +148,18 @@ EXAMPLES = '''
 # enable server in 'www' backend pool wait until healthy. Retry 10 times with intervals of 5 seconds to retrieve the health
 - haproxy: state=enabled host={{ inventory_hostname }} backend=www wait=yes wait_retries=10 wait_interval=5
 
+# disable a whole rack in every backend and wait for all of them at once
+- haproxy: state=disabled hosts=rack12-* host_match=glob wait=yes
+
+# enable a list of servers in 'www' backend pool
+- haproxy:
+    state: enabled
+    backend: www
+    hosts:
+      - web01
+      - web02
+      - web03
+
 # enable server in 'www' backend pool with change server(s) weight
 - haproxy: state=enabled host={{ inventory_hostname }} socket=/var/run/haproxy.sock weight=10 backend=www
 
@@ -132,14 +169,20 @@ author: "Ravi Bhure (@ravibhure)"
 import socket
 import csv
 import time
+import re
+import fnmatch
 from string import Template
 
 
 DEFAULT_SOCKET_LOCATION="/var/run/haproxy.sock"
-RECV_SIZE = 1024
+RECV_SIZE = 65536
 ACTION_CHOICES = ['enabled', 'disabled']
 WAIT_RETRIES=25
 WAIT_INTERVAL=5
+SOCKET_TIMEOUT = 30
+PROMPT = '> '
+# Number of servers whose commands are sent on one line
+PIPELINE_SIZE = 20
 
 ######################################################################
 class TimeoutException(Exception):
@@ -151,6 +194,10 @@ class HAProxy(object):
     Perform common tasks in Haproxy related to enable server and
     disable server.
 
+    A single connection is kept open in HAProxy's interactive 'prompt' mode
+    for the whole run, and 'show stat' is parsed into an index keyed by
+    (pxname, svname) which is only refreshed for the servers that need it.
+
     The complete set of external commands Haproxy handles is documented
     on their website:
 
@@ -170,25 +217,71 @@ class HAProxy(object):
         self.wait = self.module.params['wait']
         self.wait_retries = self.module.params['wait_retries']
         self.wait_interval = self.module.params['wait_interval']
+        self.hosts = self.module.params['hosts']
+        self.host_match = self.module.params['host_match']
+        self.timeout = self.module.params['timeout']
         self.command_results = {}
+        self.client = None
+        self.stats = None
 
-    def execute(self, cmd, timeout=200, capture_output=True):
+    def connect(self):
         """
-        Executes a HAProxy command by sending a message to a HAProxy's local
-        UNIX socket and waiting up to 'timeout' milliseconds for the response.
+        Open the UNIX socket and switch it to interactive mode, in which
+        HAProxy keeps the connection open and ends every response with a prompt.
         """
         self.client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.client.settimeout(self.timeout)
         self.client.connect(self.socket)
-        self.client.sendall('%s\n' % cmd)
+        self.client.sendall('prompt\n')
+        self.read_response()
+
+    def close(self):
+        if self.client is not None:
+            try:
+                self.client.sendall('quit\n')
+            except socket.error:
+                pass
+            self.client.close()
+            self.client = None
+
+    def read_response(self):
+        """
+        Read from the socket up to the next prompt and return what came before it.
+        """
         result = ''
-        buf = ''
-        buf = self.client.recv(RECV_SIZE)
-        while buf:
-            result += buf
+        while not (result == PROMPT or result.endswith('\n' + PROMPT)):
             buf = self.client.recv(RECV_SIZE)
+            if not buf:
+                raise socket.error('connection closed by HAProxy')
+            result += buf
+        return result[:-len(PROMPT)]
+
+    def execute(self, cmd, timeout=200, capture_output=True):
+        """
+        Executes a HAProxy command, or several separated by ';', on the
+        persistent connection and returns the response. The connection is
+        reopened once if HAProxy closed it in the meantime; the module fails
+        if HAProxy doesn't answer within the timeout.
+        """
+        try:
+            try:
+                if self.client is None:
+                    self.connect()
+                self.client.sendall('%s\n' % cmd)
+                result = self.read_response()
+            except socket.timeout:
+                raise
+            except socket.error:
+                self.client = None
+                self.connect()
+                self.client.sendall('%s\n' % cmd)
+                result = self.read_response()
+        except socket.timeout:
+            self.client.close()
+            self.client = None
+            self.module.fail_json(msg="HAProxy did not answer '%s' within %d seconds" % (cmd, self.timeout))
         if capture_output:
             self.capture_command_output(cmd, result.strip())
-        self.client.close()
         return result
 
 
@@ -204,14 +297,56 @@ class HAProxy(object):
         self.command_results['output'].append(output)
 
 
+    def parse_stats(self, data):
+        """
+        Parse 'show stat' CSV output, possibly several dumps one after the
+        other each with its own '# ' header line, into a list of dicts.
+        """
+        rows = []
+        header = None
+        # Fields such as check_desc are quoted when they hold commas
+        for fields in csv.reader(data.splitlines()):
+            if fields and fields[0].startswith('# '):
+                fields[0] = fields[0][2:]
+                header = fields
+            elif fields and header:
+                rows.append(dict(zip(header, fields)))
+        return rows
+
+
+    def refresh_stats(self, keys=None):
+        """
+        Update the stat index. Without keys 'show stat' is dumped in full,
+        otherwise only the listed (pxname, svname) servers are fetched with
+        'show stat <iid> <type> <sid>', all pipelined in a single request.
+        """
+        if keys is None or self.stats is None:
+            self.stats = {}
+            cmd = 'show stat'
+        else:
+            cmds = []
+            for key in keys:
+                row = self.stats.get(key)
+                if row is not None:
+                    cmds.append('show stat %s -1 %s' % (row['iid'], row['sid']))
+            if not cmds:
+                return
+            cmd = '; '.join(cmds)
+
+        for row in self.parse_stats(self.execute(cmd, 200, False)):
+            self.stats[(row['pxname'], row['svname'])] = row
+
+
     def discover_all_backends(self):
         """
         Discover all entries with svname = 'BACKEND' and return a list of their corresponding
         pxnames
         """
-        data = self.execute('show stat', 200, False).lstrip('# ')
-        r = csv.DictReader(data.splitlines())
-        return map(lambda d: d['pxname'], filter(lambda d: d['svname'] == 'BACKEND', r))
+        if self.stats is None:
+            self.refresh_stats()
+        backends = [pxname for pxname, svname in self.stats if svname == 'BACKEND']
+        backends.sort()
+        return backends
 
 
     def execute_for_backends(self, cmd, pxname, svname, wait_for_status = None):
@@ -242,9 +377,11 @@ class HAProxy(object):
         Find the state of specific services. When pxname is not set, get all backends for a specific host.
         Returns a list of dictionaries containing the status and weight for those services.
         """
-        data = self.execute('show stat', 200, False).lstrip('# ')
-        r = csv.DictReader(data.splitlines())
-        state = map(lambda d: { 'status': d['status'], 'weight': d['weight'] }, filter(lambda d: (pxname is None or d['pxname'] == pxname) and d['svname'] == svname, r))
+        if self.stats is None:
+            self.refresh_stats()
+        keys = [key for key in self.stats if (pxname is None or key[0] == pxname) and key[1] == svname]
+        keys.sort()
+        state = [{ 'status': self.stats[key]['status'], 'weight': self.stats[key]['weight'] } for key in keys]
         return state or None
 
 
@@ -256,6 +393,7 @@ class HAProxy(object):
         not found, the module will fail.
         """
         for i in range(1, self.wait_retries):
+            self.refresh_stats([(pxname, svname)])
             state = self.get_state_for(pxname, svname)
 
             # We can assume there will only be 1 element in state because both svname and pxname are always set when we get here
@@ -267,16 +405,27 @@ class HAProxy(object):
         self.module.fail_json(msg="server %s/%s not status '%s' after %d retries. Aborting." % (pxname, svname, status, self.wait_retries))
 
 
+    def enable_command(self, weight):
+        cmd = "get weight $pxname/$svname; enable server $pxname/$svname"
+        if weight:
+            cmd += "; set weight $pxname/$svname %s" % weight
+        return cmd
+
+
+    def disable_command(self, shutdown_sessions):
+        cmd = "get weight $pxname/$svname; disable server $pxname/$svname"
+        if shutdown_sessions:
+            cmd += "; shutdown sessions server $pxname/$svname"
+        return cmd
+
+
     def enabled(self, host, backend, weight):
         """
         Enabled action, marks server to UP and checks are re-enabled,
         also supports to get current weight for server (default) and
         set the weight for haproxy backend server when provides.
         """
-        cmd = "get weight $pxname/$svname; enable server $pxname/$svname"
-        if weight:
-            cmd += "; set weight $pxname/$svname %s" % weight
-        self.execute_for_backends(cmd, backend, host, 'UP')
+        self.execute_for_backends(self.enable_command(weight), backend, host, 'UP')
 
 
     def disabled(self, host, backend, shutdown_sessions):
@@ -285,10 +434,108 @@ class HAProxy(object):
         performed on the server until it leaves maintenance,
         also it shutdown sessions while disabling backend host server.
         """
-        cmd = "get weight $pxname/$svname; disable server $pxname/$svname"
-        if shutdown_sessions:
-            cmd += "; shutdown sessions server $pxname/$svname"
-        self.execute_for_backends(cmd, backend, host, 'MAINT')
+        self.execute_for_backends(self.disable_command(shutdown_sessions), backend, host, 'MAINT')
+
+
+    def host_matches(self, pattern, svname):
+        if self.host_match == 'glob':
+            return fnmatch.fnmatchcase(svname, pattern)
+        elif self.host_match == 'regex':
+            return re.search(pattern, svname) is not None
+        return svname == pattern
+
+
+    def match_servers(self):
+        """
+        Return the sorted (pxname, svname) pairs of all servers matching
+        one of hosts, limited to backend when it is set.
+        """
+        if self.stats is None:
+            self.refresh_stats()
+
+        servers = []
+        unmatched = []
+        for pattern in self.hosts:
+            found = False
+            for pxname, svname in self.stats:
+                if svname in ('BACKEND', 'FRONTEND'):
+                    continue
+                if self.backend is not None and pxname != self.backend:
+                    continue
+                if self.host_matches(pattern, svname):
+                    found = True
+                    if (pxname, svname) not in servers:
+                        servers.append((pxname, svname))
+            if not found:
+                unmatched.append(pattern)
+
+        if unmatched and (self.fail_on_not_found or self.wait):
+            self.module.fail_json(msg="No backend server matches %s!" % ', '.join(unmatched))
+
+        servers.sort()
+        return servers
+
+
+    def execute_for_servers(self, cmd, servers):
+        """
+        Run the command template for every (pxname, svname) server,
+        pipelining the commands for PIPELINE_SIZE servers per request.
+        """
+        for i in range(0, len(servers), PIPELINE_SIZE):
+            cmds = [Template(cmd).substitute(pxname = pxname, svname = svname)
+                    for pxname, svname in servers[i:i + PIPELINE_SIZE]]
+            self.execute('; '.join(cmds))
+
+
+    def wait_until_status_all(self, servers, status):
+        """
+        Wait for all servers to reach the specified status, polling the ones
+        still pending with a single pipelined stat request per retry.
+        """
+        pending = list(servers)
+        for i in range(1, self.wait_retries):
+            self.refresh_stats(pending)
+            pending = [key for key in pending if self.stats[key]['status'] != status]
+            if not pending:
+                return True
+            time.sleep(self.wait_interval)
+
+        self.module.fail_json(msg="servers %s not status '%s' after %d retries. Aborting." % (
+            ', '.join(['%s/%s' % key for key in pending]), status, self.wait_retries))
+
+
+    def get_state_for_servers(self, servers):
+        return [{ 'pxname': pxname, 'svname': svname,
+                  'status': self.stats[(pxname, svname)]['status'],
+                  'weight': self.stats[(pxname, svname)]['weight'] } for pxname, svname in servers]
+
+
+    def act_many(self):
+        """
+        Apply the state to every server matched by hosts in one pass.
+        """
+        servers = self.match_servers()
+        state_before = self.get_state_for_servers(servers)
+        self.command_results['state_before'] = state_before
+
+        if self.state == 'enabled':
+            cmd, status = self.enable_command(self.weight), 'UP'
+        elif self.state == 'disabled':
+            cmd, status = self.disable_command(self.shutdown_sessions), 'MAINT'
+        else:
+            self.module.fail_json(msg="unknown state specified: '%s'" % self.state)
+
+        self.execute_for_servers(cmd, servers)
+        if self.wait and servers:
+            self.wait_until_status_all(servers, status)
+
+        self.refresh_stats()
+        state_after = self.get_state_for_servers(servers)
+        self.command_results['state_after'] = state_after
+        self.close()
+
+        self.command_results['changed'] = state_before != state_after
+        self.module.exit_json(**self.command_results)
 
 
     def act(self):
@@ -308,8 +555,10 @@ class HAProxy(object):
             self.module.fail_json(msg="unknown state specified: '%s'" % self.state)
 
         # Get the state after the run
+        self.refresh_stats()
         state_after = self.get_state_for(self.backend, self.host)
         self.command_results['state_after'] = state_after
+        self.close()
 
         # Report change status
         if state_before != state_after:
@@ -326,7 +575,9 @@ def main():
     module = AnsibleModule(
         argument_spec = dict(
             state = dict(required=True, default=None, choices=ACTION_CHOICES),
-            host=dict(required=True, default=None),
+            host=dict(required=False, default=None),
+            hosts=dict(required=False, default=None, type='list'),
+            host_match=dict(required=False, default='exact', choices=['exact', 'glob', 'regex']),
             backend=dict(required=False, default=None),
             weight=dict(required=False, default=None),
             socket = dict(required=False, default=DEFAULT_SOCKET_LOCATION),
@@ -335,14 +586,20 @@ def main():
             wait=dict(required=False, default=False, type='bool'),
             wait_retries=dict(required=False, default=WAIT_RETRIES, type='int'),
             wait_interval=dict(required=False, default=WAIT_INTERVAL, type='int'),
+            timeout=dict(required=False, default=SOCKET_TIMEOUT, type='int'),
         ),
+        required_one_of=[['host', 'hosts']],
+        mutually_exclusive=[['host', 'hosts']],
     )
 
     if not socket:
         module.fail_json(msg="unable to locate haproxy socket")
 
     ansible_haproxy = HAProxy(module)
-    ansible_haproxy.act()
+    if module.params['hosts'] is not None:
+        ansible_haproxy.act_many()
+    else:
+        ansible_haproxy.act()
 
 # import module snippets
 from ansible.module_utils.basic import *
@@ -30,8 +30,38 @@ requirements:
 options:
     host:
         description:
-            - Set to target snmp server (normally {{inventory_hostname}})
-        required: true
+            - Set to target snmp server (normally {{inventory_hostname}}),
+              required unless hosts is set
+        required: false
+    hosts:
+        description:
+            - List of snmp servers to poll concurrently instead of host.
+              Their facts are returned in ansible_snmp_hosts, keyed by host.
+        required: false
+        version_added: "2.3"
+    workers:
+        description:
+            - Number of hosts to poll at the same time
+        required: false
+        default: 8
+        version_added: "2.3"
+    max_repetitions:
+        description:
+            - Number of table rows to request per GETBULK round-trip
+        required: false
+        default: 25
+        version_added: "2.3"
+    tables:
+        description:
+            - MIB tables to walk along with the default facts, in the same
+              GETBULK requests. Each item is either the name of a known
+              table (ifTable, ifXTable, ipAddrTable, lldpRemTable,
+              entPhysicalTable) or a dict with the C(name) of the table,
+              the C(oid) of its entry and the C(columns) to walk, mapping
+              column numbers to names. Rows are returned in
+              ansible_snmp_tables, keyed by table name and row index.
+        required: false
+        version_added: "2.3"
     version:
         description:
             - SNMP Version to use, v2/v2c or v3
@@ -86,10 +116,37 @@ EXAMPLES = '''
     authkey=abc12345
     privkey=def6789
   delegate_to: localhost
+
+# Gather facts of several switches at once
+- snmp_facts:
+    hosts:
+      - switch1.example.com
+      - switch2.example.com
+    version: v2c
+    community: public
+    max_repetitions: 50
+  delegate_to: localhost
+
+# Gather 64-bit interface counters, LLDP neighbours and a custom table
+- snmp_facts:
+    host: "{{ inventory_hostname }}"
+    version: v2c
+    community: public
+    tables:
+      - ifXTable
+      - lldpRemTable
+      - name: dot1dBasePortTable
+        oid: 1.3.6.1.2.1.17.1.4.1
+        columns:
+          1: dot1dBasePort
+          2: dot1dBasePortIfIndex
+  delegate_to: localhost
 '''
 
 from ansible.module_utils.basic import *
+from ansible.module_utils.pycompat24 import get_exception
 from collections import defaultdict
+import threading
 
 try:
     from pysnmp.entity.rfc3413.oneliner import cmdgen
@@ -129,6 +186,74 @@ class DefineOid(object):
         self.ipAdEntNetMask = dp + "1.3.6.1.2.1.4.20.1.3"
 
 
+# Known MIB tables: the OID of their entry and their readable columns
+MIB_TABLES = {
+    'ifTable': {
+        'oid': '1.3.6.1.2.1.2.2.1',
+        'columns': {
+            1: 'ifIndex', 2: 'ifDescr', 3: 'ifType', 4: 'ifMtu',
+            5: 'ifSpeed', 6: 'ifPhysAddress', 7: 'ifAdminStatus',
+            8: 'ifOperStatus', 9: 'ifLastChange', 10: 'ifInOctets',
+            11: 'ifInUcastPkts', 13: 'ifInDiscards', 14: 'ifInErrors',
+            15: 'ifInUnknownProtos', 16: 'ifOutOctets',
+            17: 'ifOutUcastPkts', 19: 'ifOutDiscards', 20: 'ifOutErrors',
+        },
+    },
+    'ifXTable': {
+        'oid': '1.3.6.1.2.1.31.1.1.1',
+        'columns': {
+            1: 'ifName', 2: 'ifInMulticastPkts', 3: 'ifInBroadcastPkts',
+            4: 'ifOutMulticastPkts', 5: 'ifOutBroadcastPkts',
+            6: 'ifHCInOctets', 7: 'ifHCInUcastPkts',
+            8: 'ifHCInMulticastPkts', 9: 'ifHCInBroadcastPkts',
+            10: 'ifHCOutOctets', 11: 'ifHCOutUcastPkts',
+            12: 'ifHCOutMulticastPkts', 13: 'ifHCOutBroadcastPkts',
+            14: 'ifLinkUpDownTrapEnable', 15: 'ifHighSpeed',
+            16: 'ifPromiscuousMode', 17: 'ifConnectorPresent',
+            18: 'ifAlias', 19: 'ifCounterDiscontinuityTime',
+        },
+    },
+    'ipAddrTable': {
+        'oid': '1.3.6.1.2.1.4.20.1',
+        'columns': {
+            1: 'ipAdEntAddr', 2: 'ipAdEntIfIndex', 3: 'ipAdEntNetMask',
+            4: 'ipAdEntBcastAddr', 5: 'ipAdEntReasmMaxSize',
+        },
+    },
+    'lldpRemTable': {
+        'oid': '1.0.8802.1.1.2.1.4.1.1',
+        'columns': {
+            4: 'lldpRemChassisIdSubtype', 5: 'lldpRemChassisId',
+            6: 'lldpRemPortIdSubtype', 7: 'lldpRemPortId',
+            8: 'lldpRemPortDesc', 9: 'lldpRemSysName',
+            10: 'lldpRemSysDesc', 11: 'lldpRemSysCapSupported',
+            12: 'lldpRemSysCapEnabled',
+        },
+    },
+    'entPhysicalTable': {
+        'oid': '1.3.6.1.2.1.47.1.1.1.1',
+        'columns': {
+            2: 'entPhysicalDescr', 3: 'entPhysicalVendorType',
+            4: 'entPhysicalContainedIn', 5: 'entPhysicalClass',
+            6: 'entPhysicalParentRelPos', 7: 'entPhysicalName',
+            8: 'entPhysicalHardwareRev', 9: 'entPhysicalFirmwareRev',
+            10: 'entPhysicalSoftwareRev', 11: 'entPhysicalSerialNum',
+            12: 'entPhysicalMfgName', 13: 'entPhysicalModelName',
+            14: 'entPhysicalAlias', 15: 'entPhysicalAssetID',
+            16: 'entPhysicalIsFRU',
+        },
+    },
+}
+
+
+class SnmpError(Exception):
+    pass
+
+
+def oid_tuple(oid):
+    return tuple(int(x) for x in oid.strip('.').split('.'))
+
+
 def decode_hex(hexstring):
 
     if len(hexstring) < 3:
@@ -173,64 +298,54 @@ def lookup_operstatus(int_operstatus):
     else:
         return ""
 
-def main():
-    module = AnsibleModule(
-        argument_spec=dict(
-            host=dict(required=True),
-            version=dict(required=True, choices=['v2', 'v2c', 'v3']),
-            community=dict(required=False, default=False),
-            username=dict(required=False),
-            level=dict(required=False, choices=['authNoPriv', 'authPriv']),
-            integrity=dict(required=False, choices=['md5', 'sha']),
-            privacy=dict(required=False, choices=['des', 'aes']),
-            authkey=dict(required=False),
-            privkey=dict(required=False),
-            removeplaceholder=dict(required=False)),
-            required_together = ( ['username','level','integrity','authkey'],['privacy','privkey'],),
-        supports_check_mode=False)
-
-    m_args = module.params
-
-    if not has_pysnmp:
-        module.fail_json(msg='Missing required pysnmp module (check docs)')
-
-    cmdGen = cmdgen.CommandGenerator()
-
-    # Verify that we receive a community when using snmp v2
-    if m_args['version'] == "v2" or m_args['version'] == "v2c":
-        if m_args['community'] == False:
-            module.fail_json(msg='Community not set when using snmp version 2')
-
-    if m_args['version'] == "v3":
-        if m_args['username'] == None:
-            module.fail_json(msg='Username not set when using snmp version 3')
-
-        if m_args['level'] == "authPriv" and m_args['privacy'] == None:
-            module.fail_json(msg='Privacy algorithm not set when using authPriv')
-
-
-        if m_args['integrity'] == "sha":
-            integrity_proto = cmdgen.usmHMACSHAAuthProtocol
-        elif m_args['integrity'] == "md5":
-            integrity_proto = cmdgen.usmHMACMD5AuthProtocol
-
-        if m_args['privacy'] == "aes":
-            privacy_proto = cmdgen.usmAesCfb128Protocol
-        elif m_args['privacy'] == "des":
-            privacy_proto = cmdgen.usmDESPrivProtocol
-
-    # Use SNMP Version 2
-    if m_args['version'] == "v2" or m_args['version'] == "v2c":
-        snmp_auth = cmdgen.CommunityData(m_args['community'])
-
-    # Use SNMP Version 3 with authNoPriv
-    elif m_args['level'] == "authNoPriv":
-        snmp_auth = cmdgen.UsmUserData(m_args['username'], authKey=m_args['authkey'], authProtocol=integrity_proto)
-
-    # Use SNMP Version 3 with authPriv
-    else:
-        snmp_auth = cmdgen.UsmUserData(m_args['username'], authKey=m_args['authkey'], privKey=m_args['privkey'], authProtocol=integrity_proto, privProtocol=privacy_proto)
-
+def resolve_tables(tables):
+    """Return the table specs of tables, given by name or as specs.
+
+    Raises ValueError for unknown table names and malformed specs.
+    """
+    resolved = []
+    for table in tables or []:
+        if isinstance(table, dict):
+            spec = table
+        elif table in MIB_TABLES:
+            spec = dict(MIB_TABLES[table], name=table)
+        else:
+            raise ValueError('Unknown table %s, known tables are %s' % (table, ', '.join(sorted(MIB_TABLES))))
+        try:
+            resolved.append({
+                'name': spec['name'],
+                'oid': oid_tuple(str(spec['oid'])),
+                'columns': dict((int(k), v) for k, v in spec['columns'].items()),
+            })
+        except (KeyError, TypeError, ValueError, AttributeError):
+            raise ValueError('Table specs need a name, the oid of the table entry and a dict of columns, got %s' % table)
+    return resolved
+
+def define_columns(v, tables=()):
+    """Return the polled table columns keyed by OID tuple.
+
+    Each column maps to a list of its uses: the table it belongs to, the
+    fact or row field it sets and a function converting its values.
+    """
+    columns = {
+        oid_tuple(v.ifIndex): [('interface', 'ifindex', None)],
+        oid_tuple(v.ifDescr): [('interface', 'name', None)],
+        oid_tuple(v.ifMtu): [('interface', 'mtu', None)],
+        oid_tuple(v.ifSpeed): [('interface', 'speed', None)],
+        oid_tuple(v.ifPhysAddress): [('interface', 'mac', decode_mac)],
+        oid_tuple(v.ifAdminStatus): [('interface', 'adminstatus', lambda x: lookup_adminstatus(int(x)))],
+        oid_tuple(v.ifOperStatus): [('interface', 'operstatus', lambda x: lookup_operstatus(int(x)))],
+        oid_tuple(v.ifAlias): [('interface', 'description', None)],
+        oid_tuple(v.ipAdEntAddr): [('ipv4', 'address', None)],
+        oid_tuple(v.ipAdEntIfIndex): [('ipv4', 'interface', None)],
+        oid_tuple(v.ipAdEntNetMask): [('ipv4', 'netmask', None)],
+    }
+    for table in tables:
+        for number, name in table['columns'].items():
+            columns.setdefault(table['oid'] + (number,), []).append((table['name'], name, None))
+    return columns
+
+def poll_host(cmdGen, snmp_auth, host, max_repetitions, tables=()):
     # Use p to prefix OIDs with a dot for polling
     p = DefineOid(dotprefix=True)
     # Use v without a prefix to use with return values
@@ -242,7 +357,7 @@ def main():
 
     errorIndication, errorStatus, errorIndex, varBinds = cmdGen.getCmd(
         snmp_auth,
-        cmdgen.UdpTransportTarget((m_args['host'], 161)),
+        cmdgen.UdpTransportTarget((host, 161)),
         cmdgen.MibVariable(p.sysDescr,),
         cmdgen.MibVariable(p.sysObjectId,),
         cmdgen.MibVariable(p.sysUpTime,),
@@ -254,7 +369,7 @@ def main():
 
 
     if errorIndication:
-        module.fail_json(msg=str(errorIndication))
+        raise SnmpError(str(errorIndication))
 
     for oid, val in varBinds:
         current_oid = oid.prettyPrint()
@@ -272,76 +387,51 @@ def main():
         elif current_oid == v.sysLocation:
             results['ansible_syslocation'] = current_val
 
-    errorIndication, errorStatus, errorIndex, varTable = cmdGen.nextCmd(
-        snmp_auth,
-        cmdgen.UdpTransportTarget((m_args['host'], 161)),
-        cmdgen.MibVariable(p.ifIndex,),
-        cmdgen.MibVariable(p.ifDescr,),
-        cmdgen.MibVariable(p.ifMtu,),
-        cmdgen.MibVariable(p.ifSpeed,),
-        cmdgen.MibVariable(p.ifPhysAddress,),
-        cmdgen.MibVariable(p.ifAdminStatus,),
-        cmdgen.MibVariable(p.ifOperStatus,),
-        cmdgen.MibVariable(p.ipAdEntAddr,),
-        cmdgen.MibVariable(p.ipAdEntIfIndex,),
-        cmdgen.MibVariable(p.ipAdEntNetMask,),
-
-        cmdgen.MibVariable(p.ifAlias,),
-        lookupMib=False
+    columns = define_columns(v, tables)
+    prefix_lengths = sorted(set(len(column) for column in columns))
+
+    # GETBULK fetches max_repetitions rows of every column per round-trip
+    # Python 2.4 does not take keyword arguments after *args
+    args = [snmp_auth, cmdgen.UdpTransportTarget((host, 161)), 0, max_repetitions]
+    args.extend([cmdgen.MibVariable("." + ".".join([str(x) for x in column]),)
+                 for column in sorted(columns)])
+    errorIndication, errorStatus, errorIndex, varTable = cmdGen.bulkCmd(
+        *args, **{'lookupMib': False}
     )
 
 
     if errorIndication:
-        module.fail_json(msg=str(errorIndication))
-
-    interface_indexes = []
+        raise SnmpError(str(errorIndication))
 
     all_ipv4_addresses = []
     ipv4_networks = Tree()
 
     for varBinds in varTable:
         for oid, val in varBinds:
-            current_oid = oid.prettyPrint()
+            current_oid = oid_tuple(oid.prettyPrint())
             current_val = val.prettyPrint()
-            if v.ifIndex in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['ifindex'] = current_val
-                interface_indexes.append(ifIndex)
-            if v.ifDescr in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['name'] = current_val
-            if v.ifMtu in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['mtu'] = current_val
-            if v.ifMtu in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['speed'] = current_val
-            if v.ifPhysAddress in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['mac'] = decode_mac(current_val)
-            if v.ifAdminStatus in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['adminstatus'] = lookup_adminstatus(int(current_val))
-            if v.ifOperStatus in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['operstatus'] = lookup_operstatus(int(current_val))
-            if v.ipAdEntAddr in current_oid:
-                curIPList = current_oid.rsplit('.', 4)[-4:]
-                curIP = ".".join(curIPList)
-                ipv4_networks[curIP]['address'] = current_val
-                all_ipv4_addresses.append(current_val)
-            if v.ipAdEntIfIndex in current_oid:
-                curIPList = current_oid.rsplit('.', 4)[-4:]
-                curIP = ".".join(curIPList)
-                ipv4_networks[curIP]['interface'] = current_val
-            if v.ipAdEntNetMask in current_oid:
-                curIPList = current_oid.rsplit('.', 4)[-4:]
-                curIP = ".".join(curIPList)
-                ipv4_networks[curIP]['netmask'] = current_val
-
-            if v.ifAlias in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['description'] = current_val
+            for length in prefix_lengths:
+                column = columns.get(current_oid[:length])
+                if column:
+                    break
+            else:
+                continue
+            index = current_oid[length:]
+            for table, fact, convert in column:
+                if convert:
+                    value = convert(current_val)
+                else:
+                    value = current_val
+                if table == 'interface':
+                    results['ansible_interfaces'][index[-1]][fact] = value
+                elif table == 'ipv4':
+                    curIP = ".".join(str(x) for x in index[-4:])
+                    ipv4_networks[curIP][fact] = value
+                    if fact == 'address':
+                        all_ipv4_addresses.append(value)
+                else:
+                    row = ".".join(str(x) for x in index)
+                    results['ansible_snmp_tables'][table][row][fact] = value
 
     interface_to_ipv4 = {}
     for ipv4_network in ipv4_networks:
@@ -361,6 +451,125 @@ def main():
 
     results['ansible_all_ipv4_addresses'] = all_ipv4_addresses
 
+    return results
+
+def poll_hosts(snmp_auth, hosts, max_repetitions, workers, tables=()):
+    """Poll hosts concurrently, each worker with its own CommandGenerator.
+
+    Returns the facts and the errors, both keyed by host.
+    """
+    results = {}
+    errors = {}
+    pending = list(hosts)
+    lock = threading.Lock()
+
+    def worker():
+        cmdGen = cmdgen.CommandGenerator()
+        while True:
+            lock.acquire()
+            try:
+                if not pending:
+                    return
+                host = pending.pop(0)
+            finally:
+                lock.release()
+            try:
+                results[host] = poll_host(cmdGen, snmp_auth, host, max_repetitions, tables)
+            except Exception:
+                e = get_exception()
+                errors[host] = str(e)
+
+    threads = []
+    for i in range(min(workers, len(hosts))):
+        t = threading.Thread(target=worker)
+        t.daemon = True
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+
+    return results, errors
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            host=dict(required=False),
+            hosts=dict(required=False, type='list'),
+            workers=dict(required=False, type='int', default=8),
+            max_repetitions=dict(required=False, type='int', default=25),
+            tables=dict(required=False, type='list'),
+            version=dict(required=True, choices=['v2', 'v2c', 'v3']),
+            community=dict(required=False, default=False),
+            username=dict(required=False),
+            level=dict(required=False, choices=['authNoPriv', 'authPriv']),
+            integrity=dict(required=False, choices=['md5', 'sha']),
+            privacy=dict(required=False, choices=['des', 'aes']),
+            authkey=dict(required=False),
+            privkey=dict(required=False),
+            removeplaceholder=dict(required=False)),
+            required_together = ( ['username','level','integrity','authkey'],['privacy','privkey'],),
+            required_one_of = ( ['host','hosts'], ),
+            mutually_exclusive = ( ['host','hosts'], ),
+        supports_check_mode=False)
+
+    m_args = module.params
+
+    if not has_pysnmp:
+        module.fail_json(msg='Missing required pysnmp module (check docs)')
+
+    # Verify that we receive a community when using snmp v2
+    if m_args['version'] == "v2" or m_args['version'] == "v2c":
+        if m_args['community'] == False:
+            module.fail_json(msg='Community not set when using snmp version 2')
+
+    if m_args['version'] == "v3":
+        if m_args['username'] == None:
+            module.fail_json(msg='Username not set when using snmp version 3')
+
+        if m_args['level'] == "authPriv" and m_args['privacy'] == None:
+            module.fail_json(msg='Privacy algorithm not set when using authPriv')
+
+
+        if m_args['integrity'] == "sha":
+            integrity_proto = cmdgen.usmHMACSHAAuthProtocol
+        elif m_args['integrity'] == "md5":
+            integrity_proto = cmdgen.usmHMACMD5AuthProtocol
+
+        if m_args['privacy'] == "aes":
+            privacy_proto = cmdgen.usmAesCfb128Protocol
+        elif m_args['privacy'] == "des":
+            privacy_proto = cmdgen.usmDESPrivProtocol
+
+    # Use SNMP Version 2
+    if m_args['version'] == "v2" or m_args['version'] == "v2c":
+        snmp_auth = cmdgen.CommunityData(m_args['community'])
+
+    # Use SNMP Version 3 with authNoPriv
+    elif m_args['level'] == "authNoPriv":
+        snmp_auth = cmdgen.UsmUserData(m_args['username'], authKey=m_args['authkey'], authProtocol=integrity_proto)
+
+    # Use SNMP Version 3 with authPriv
+    else:
+        snmp_auth = cmdgen.UsmUserData(m_args['username'], authKey=m_args['authkey'], privKey=m_args['privkey'], authProtocol=integrity_proto, privProtocol=privacy_proto)
+
+    try:
+        tables = resolve_tables(m_args['tables'])
+    except ValueError:
+        e = get_exception()
+        module.fail_json(msg=str(e))
+
+    if m_args['hosts']:
+        hosts, errors = poll_hosts(snmp_auth, m_args['hosts'], m_args['max_repetitions'], m_args['workers'], tables)
+        if errors:
+            module.fail_json(msg='Failed to poll %s' % ', '.join(sorted(errors)), errors=errors, ansible_facts=dict(ansible_snmp_hosts=hosts))
+        module.exit_json(ansible_facts=dict(ansible_snmp_hosts=hosts))
+
+    try:
+        results = poll_host(cmdgen.CommandGenerator(), snmp_auth, m_args['host'], m_args['max_repetitions'], tables)
+    except SnmpError:
+        e = get_exception()
+        module.fail_json(msg=str(e))
+
     module.exit_json(ansible_facts=results)
 
 
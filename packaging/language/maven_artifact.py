@@ -27,6 +27,16 @@ import hashlib
 import sys
 import posixpath
 import urlparse
+import shutil
+import tempfile
+import threading
+import socket
+import stat
+from StringIO import StringIO
+try:
+    import json
+except ImportError:
+    import simplejson as json
 from ansible.module_utils.basic import *
 from ansible.module_utils.urls import *
 try:
@@ -35,6 +45,14 @@ try:
 except ImportError:
     HAS_BOTO = False
 
+# Read size for artifact downloads
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# Read once, before any download threads start, as os.umask() can only be
+# read by changing it
+UMASK = os.umask(0)
+os.umask(UMASK)
+
 DOCUMENTATION = '''
 ---
 module: maven_artifact
@@ -109,6 +127,36 @@ options:
         default: 'yes'
         choices: ['yes', 'no']
         version_added: "1.9.3"
+    cache_dir:
+        description:
+            - Directory of a local artifact cache, which can be shared between runs and, on shared storage, between
+              hosts. Artifacts are stored by MD5 and copied from there when already present; maven-metadata.xml and
+              checksum files are cached with their ETag/Last-Modified headers and revalidated with conditional
+              requests; digests of existing destination files are remembered by inode, size and mtime.
+        required: false
+        default: null
+        version_added: "2.3"
+    artifacts:
+        description:
+            - A list of artifacts to download in this task, each a dict with the C(group_id), C(artifact_id),
+              C(version), C(classifier), C(extension) and C(dest) keys. C(version), C(classifier) and C(extension)
+              default to the module parameters. Mutually exclusive with C(group_id), C(artifact_id) and C(dest).
+        required: false
+        default: null
+        version_added: "2.3"
+    threads:
+        description:
+            - Number of artifacts from C(artifacts) downloaded concurrently.
+        required: false
+        default: 4
+        version_added: "2.3"
+    connections:
+        description:
+            - Number of concurrent range requests an artifact of 16 MB or more is split across, when the repository
+              supports range requests. Interrupted downloads are kept in a C(.part) file and resumed on the next run.
+        required: false
+        default: 4
+        version_added: "2.3"
 '''
 
 EXAMPLES = '''
@@ -123,8 +171,30 @@ EXAMPLES = '''
 
 # Download a WAR File to the Tomcat webapps directory to be deployed
 - maven_artifact: group_id=com.company artifact_id=web-app extension=war repository_url=https://repo.company.com/maven dest=/var/lib/tomcat7/webapps/web-app.war
+
+# Download several artifacts concurrently through a cache on shared storage
+- maven_artifact:
+    repository_url: https://repo.company.com/maven
+    cache_dir: /mnt/shared/maven-cache
+    artifacts:
+      - { group_id: com.company, artifact_id: web-app, extension: war, version: 1.2.0, dest: /var/lib/tomcat7/webapps/web-app.war }
+      - { group_id: com.company, artifact_id: api, extension: war, version: 3.0.1, dest: /var/lib/tomcat7/webapps/api.war }
 '''
 
+
+def replace_file(src, dest):
+    """
+    Rename src over dest, giving it the mode of the file it replaces, or the
+    one a new file would get under the umask rather than mkstemp's 0600
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(dest).st_mode)
+    except OSError:
+        mode = int('0666', 8) & ~UMASK
+    os.chmod(src, mode)
+    os.rename(src, dest)
+
+
 class Artifact(object):
     def __init__(self, group_id, artifact_id, version, classifier=None, extension='jar'):
         if not group_id:
@@ -192,17 +262,237 @@ class Artifact(object):
             return None
 
 
+class ArtifactCache(object):
+    """
+    Content addressed on-disk cache, safe to share between runs and, when on
+    shared storage, between hosts. Artifacts are stored under their MD5,
+    repository metadata together with its ETag and Last-Modified headers so
+    it can be revalidated with conditional requests, and digests of local
+    files keyed by their inode, size and mtime so unchanged files are not
+    hashed again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        for subdir in ('objects', 'metadata', 'digests'):
+            d = os.path.join(path, subdir)
+            if not os.path.isdir(d):
+                try:
+                    os.makedirs(d)
+                except OSError:
+                    # Created concurrently by another run
+                    if not os.path.isdir(d):
+                        raise
+
+    def _key(self, name):
+        return hashlib.sha1(name.encode('utf-8')).hexdigest()
+
+    def object_path(self, md5):
+        return os.path.join(self.path, 'objects', md5)
+
+    def has_object(self, md5):
+        return os.path.exists(self.object_path(md5))
+
+    def copy_object(self, md5, dest):
+        """Copy a cached artifact to dest through a temporary file, so dest is replaced atomically"""
+        tmpfd, tmpfile = tempfile.mkstemp(dir=os.path.dirname(dest) or '.')
+        os.close(tmpfd)
+        shutil.copyfile(self.object_path(md5), tmpfile)
+        replace_file(tmpfile, dest)
+
+    def part_path(self, md5):
+        """Partial download of an object, per host so hosts sharing the cache never write the same file"""
+        return '%s.%s.part' % (self.object_path(md5), socket.gethostname())
+
+    def get_metadata(self, url):
+        """Return (body, etag, last_modified) stored for url, or None"""
+        try:
+            f = open(os.path.join(self.path, 'metadata', self._key(url)), 'r')
+            try:
+                entry = json.load(f)
+            finally:
+                f.close()
+        except (IOError, ValueError):
+            return None
+        return entry.get('body'), entry.get('etag'), entry.get('last_modified')
+
+    def put_metadata(self, url, body, etag, last_modified):
+        self._write_json(os.path.join(self.path, 'metadata', self._key(url)),
+                         dict(url=url, body=body, etag=etag, last_modified=last_modified))
+
+    def _stat_key(self, path):
+        st = os.stat(path)
+        return '%s:%s:%s:%s' % (st.st_dev, st.st_ino, st.st_size, st.st_mtime)
+
+    def get_digest(self, path):
+        try:
+            f = open(os.path.join(self.path, 'digests', self._key(os.path.abspath(path))), 'r')
+            try:
+                entry = json.load(f)
+            finally:
+                f.close()
+        except (IOError, ValueError):
+            return None
+        if entry.get('stat') != self._stat_key(path):
+            return None
+        return entry.get('md5')
+
+    def put_digest(self, path, md5):
+        self._write_json(os.path.join(self.path, 'digests', self._key(os.path.abspath(path))),
+                         dict(path=os.path.abspath(path), stat=self._stat_key(path), md5=md5))
+
+    def _write_json(self, path, data):
+        tmpfd, tmpfile = tempfile.mkstemp(dir=os.path.dirname(path))
+        f = os.fdopen(tmpfd, 'w')
+        try:
+            json.dump(data, f)
+        finally:
+            f.close()
+        replace_file(tmpfile, path)
+
+
+class SegmentedDownload(object):
+    """
+    Byte ranges of a download split across several connections into one
+    .part file. Each segment is [start, end, done] with end inclusive.
+    Progress is saved next to the .part file so an interrupted download
+    resumes where each segment stopped, and the MD5 is computed as the
+    contiguous prefix of the file grows instead of by a final full read.
+    """
+
+    # Bytes written between two saves of the segment state
+    SAVE_INTERVAL = 4 * 1024 * 1024
+
+    def __init__(self, part, url, total, segments):
+        self.part = part
+        self.url = url
+        self.total = total
+        self.segments = segments
+        self.md5 = hashlib.md5()
+        self.hashed = 0
+        self.unsaved = 0
+        self.lock = threading.Lock()
+        self.hash_lock = threading.Lock()
+
+    @staticmethod
+    def state_path(part):
+        return part + '.state'
+
+    @classmethod
+    def plan(cls, part, url, total, connections):
+        size = total // connections
+        segments = []
+        for n in range(connections):
+            start = n * size
+            end = total - 1 if n == connections - 1 else start + size - 1
+            segments.append([start, end, 0])
+
+        f = open(part, 'wb')
+        try:
+            f.truncate(total)
+        finally:
+            f.close()
+        download = cls(part, url, total, segments)
+        download.save()
+        return download
+
+    @classmethod
+    def load(cls, part, url):
+        """Return the saved download of url into part, or None if there is nothing to resume"""
+        try:
+            f = open(cls.state_path(part), 'r')
+            try:
+                state = json.load(f)
+            finally:
+                f.close()
+        except (IOError, ValueError):
+            return None
+        if state.get('url') != url or not os.path.exists(part) or os.path.getsize(part) != state.get('total'):
+            return None
+        return cls(part, url, state['total'], state['segments'])
+
+    def save(self):
+        tmpfd, tmpfile = tempfile.mkstemp(dir=os.path.dirname(self.part) or '.')
+        f = os.fdopen(tmpfd, 'w')
+        try:
+            json.dump(dict(url=self.url, total=self.total, segments=self.segments), f)
+        finally:
+            f.close()
+        replace_file(tmpfile, self.state_path(self.part))
+
+    def remove(self):
+        for path in (self.part, self.state_path(self.part)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def advance(self, index, count):
+        """Record count more bytes written, flushed, at the end of segment index"""
+        self.lock.acquire()
+        try:
+            self.segments[index][2] += count
+            self.unsaved += count
+            if self.unsaved >= self.SAVE_INTERVAL:
+                self.unsaved = 0
+                self.save()
+        finally:
+            self.lock.release()
+        self.update_digest(blocking=False)
+
+    def frontier(self):
+        """Length of the prefix of the file that has been written"""
+        end = 0
+        for start, last, done in self.segments:
+            end = start + done
+            if start + done <= last:
+                break
+        return end
+
+    def update_digest(self, blocking=True):
+        """Hash the part of the prefix that has not been hashed yet; without blocking, leave it to a thread already doing so"""
+        if not self.hash_lock.acquire(blocking):
+            return
+        try:
+            f = open(self.part, 'rb')
+            try:
+                f.seek(self.hashed)
+                end = self.frontier()
+                while self.hashed < end:
+                    chunk = f.read(min(DOWNLOAD_CHUNK_SIZE, end - self.hashed))
+                    if not chunk:
+                        break
+                    self.md5.update(chunk)
+                    self.hashed += len(chunk)
+            finally:
+                f.close()
+        finally:
+            self.hash_lock.release()
+
+    def complete(self):
+        return self.frontier() == self.total
+
+
 class MavenDownloader:
-    def __init__(self, module, base="http://repo1.maven.org/maven2"):
+    # Smallest file split across several connections
+    SEGMENT_MIN_SIZE = 16 * 1024 * 1024
+    # Reconnections per transfer before giving up
+    retries = 3
+
+    def __init__(self, module, base="http://repo1.maven.org/maven2", cache=None, connections=1):
         self.module = module
         if base.endswith("/"):
             base = base.rstrip("/")
         self.base = base
         self.user_agent = "Maven Artifact Downloader/1.0"
+        self.cache = cache
+        self._digests = {}
+        self._remote_digests = {}
+        self.connections = max(1, connections)
+        self._lock = threading.Lock()
+        self._object_locks = {}
 
     def _find_latest_version_available(self, artifact):
         path = "/%s/maven-metadata.xml" % (artifact.path(False))
-        xml = self._request(self.base + path, "Failed to download maven-metadata.xml", lambda r: etree.parse(r))
+        xml = self._request_cached(self.base + path, "Failed to download maven-metadata.xml", lambda r: etree.parse(r))
         v = xml.xpath("/metadata/versioning/versions/version[last()]/text()")
         if v:
             return v[0]
@@ -213,7 +503,7 @@ class MavenDownloader:
 
         if artifact.is_snapshot():
             path = "/%s/maven-metadata.xml" % (artifact.path())
-            xml = self._request(self.base + path, "Failed to download maven-metadata.xml", lambda r: etree.parse(r))
+            xml = self._request_cached(self.base + path, "Failed to download maven-metadata.xml", lambda r: etree.parse(r))
             timestamp = xml.xpath("/metadata/versioning/snapshot/timestamp/text()")[0]
             buildNumber = xml.xpath("/metadata/versioning/snapshot/buildNumber/text()")[0]
             return self._uri_for_artifact(artifact, artifact.version.replace("SNAPSHOT", timestamp + "-" + buildNumber))
@@ -230,7 +520,7 @@ class MavenDownloader:
 
         return posixpath.join(self.base, artifact.path(), artifact.artifact_id + "-" + version + "." + artifact.extension)
 
-    def _request(self, url, failmsg, f):
+    def _fetch(self, url, headers=None):
         url_to_use = url
         parsed_url = urlparse(url)
         if parsed_url.scheme=='s3':
@@ -245,12 +535,50 @@ class MavenDownloader:
         self.module.params['url_password'] = self.module.params.get('password', '')
         self.module.params['http_agent'] = self.module.params.get('user_agent', None)
 
-        response, info = fetch_url(self.module, url_to_use)
+        response, info = fetch_url(self.module, url_to_use, headers=headers)
+        return response, info, url_to_use
+
+    def _request(self, url, failmsg, f):
+        response, info, url_to_use = self._fetch(url)
         if info['status'] != 200:
             raise ValueError(failmsg + " because of " + info['msg'] + "for URL " + url_to_use)
         else:
             return f(response)
 
+    def _request_cached(self, url, failmsg, f):
+        """
+        Like _request, for small documents such as maven-metadata.xml and
+        checksums. With a cache, the stored copy is revalidated with
+        If-None-Match/If-Modified-Since and reused on 304 Not Modified.
+        """
+        if self.cache is None or urlparse(url).scheme == 's3':
+            return self._request(url, failmsg, f)
+
+        cached = self.cache.get_metadata(url)
+        headers = {}
+        if cached:
+            if cached[1]:
+                headers['If-None-Match'] = cached[1]
+            if cached[2]:
+                headers['If-Modified-Since'] = cached[2]
+
+        response, info, url_to_use = self._fetch(url, headers)
+        if info['status'] == 304 and cached:
+            body = cached[0].encode('utf-8')
+        elif info['status'] == 200:
+            body = response.read()
+            self.cache.put_metadata(url, body, info.get('etag'), info.get('last-modified'))
+        else:
+            raise ValueError(failmsg + " because of " + info['msg'] + "for URL " + url_to_use)
+        return f(StringIO(body))
+
+    def _remote_md5(self, remote_md5):
+        if remote_md5 not in self._remote_digests:
+            # Checksum files may carry the file name after the digest
+            body = self._request_cached(remote_md5, "Failed to download MD5", lambda r: r.read())
+            self._remote_digests[remote_md5] = body.strip().split(' ')[0]
+        return self._remote_digests[remote_md5]
+
 
     def download(self, artifact, filename=None):
         filename = artifact.get_filename(filename)
@@ -259,20 +587,220 @@ class MavenDownloader:
                                 artifact.classifier, artifact.extension)
 
         url = self.find_uri_for_artifact(artifact)
-        if not self.verify_md5(filename, url + ".md5"):
-            response = self._request(url, "Failed to download artifact " + str(artifact), lambda r: r)
-            if response:
-                f = open(filename, 'w')
-                # f.write(response.read())
-                self._write_chunks(response, f, report_hook=self.chunk_report)
-                f.close()
-                return True
-            else:
-                return False
-        else:
+        if self.verify_md5(filename, url + ".md5"):
             return True
 
+        if self.cache is not None:
+            return self._download_cached(artifact, url, filename)
+
+        try:
+            remote_md5 = self._remote_md5(url + ".md5")
+        except ValueError:
+            remote_md5 = None
+        self._digests[os.path.abspath(filename)] = self._download_file(url, filename, filename + ".part",
+                                                                       "Failed to download artifact " + str(artifact),
+                                                                       remote_md5)
+        return True
+
+    def _download_cached(self, artifact, url, filename):
+        """
+        Fetch the artifact into the cache unless an object with its MD5 is
+        already there, then copy it from the cache to filename.
+        """
+        remote_md5 = self._remote_md5(url + ".md5")
+        self._lock.acquire()
+        lock = self._object_locks.setdefault(remote_md5, threading.Lock())
+        self._lock.release()
+
+        # The same artifact may be wanted by several items of one task
+        lock.acquire()
+        try:
+            if not self.cache.has_object(remote_md5):
+                self._download_file(url, self.cache.object_path(remote_md5), self.cache.part_path(remote_md5),
+                                    "Failed to download artifact " + str(artifact), remote_md5)
+        finally:
+            lock.release()
+
+        self.cache.copy_object(remote_md5, filename)
+        self.cache.put_digest(filename, remote_md5)
+        self._digests[os.path.abspath(filename)] = remote_md5
+        return True
+
+    def _download_file(self, url, target, part, failmsg, expected_md5=None):
+        """
+        Download url into part, resuming from what an earlier attempt left
+        there, and rename it to target once complete. Files of at least
+        SEGMENT_MIN_SIZE are fetched with concurrent range requests when
+        the repository supports them. Returns the MD5 of the file, computed
+        while it is written, and raises ValueError if it differs from
+        expected_md5.
+        """
+        download = SegmentedDownload.load(part, url)
+        if download is not None:
+            md5 = self._download_segments(download, failmsg)
+        else:
+            md5, total = self._download_stream(url, part, failmsg)
+            if md5 is None:
+                download = SegmentedDownload.plan(part, url, total, self.connections)
+                md5 = self._download_segments(download, failmsg)
+
+        if expected_md5 is not None and md5 != expected_md5:
+            for path in (part, SegmentedDownload.state_path(part)):
+                if os.path.exists(path):
+                    os.remove(path)
+            raise ValueError("Checksum mismatch for downloaded artifact from " + url)
+        replace_file(part, target)
+        return md5
+
+    def _range_total(self, info):
+        """Total size from the Content-Range of a 206 response"""
+        content_range = info.get('content-range') or ''
+        try:
+            return int(content_range.rsplit('/', 1)[1])
+        except (IndexError, ValueError):
+            return None
+
+    def _download_stream(self, url, part, failmsg):
+        """
+        Download url into part over one connection, continuing a partial
+        part file with a range request and reconnecting from the current
+        offset when the transfer breaks off. Returns the MD5 and size of the
+        file; the MD5 is None, and nothing is downloaded, when the file
+        should rather be split across several connections.
+        """
+        offset = 0
+        if os.path.exists(part):
+            offset = os.path.getsize(part)
+
+        md5 = hashlib.md5()
+        f = None
+        attempt = 0
+        try:
+            while True:
+                response, info, url_to_use = self._fetch(url, {'Range': 'bytes=%d-' % offset})
+                if info['status'] == 206:
+                    total = self._range_total(info)
+                    if (f is None and offset == 0 and self.connections > 1 and total is not None
+                            and total >= self.SEGMENT_MIN_SIZE):
+                        response.close()
+                        return None, total
+                elif info['status'] == 200:
+                    # No range support, or the server ignored it: start over
+                    offset = 0
+                    total = info.get('content-length')
+                    if total is not None:
+                        total = int(total)
+                elif info['status'] == 416 and offset > 0:
+                    # The part file is as long as or longer than the remote file
+                    if f is not None:
+                        f.close()
+                        f = None
+                    os.remove(part)
+                    offset = 0
+                    continue
+                else:
+                    raise ValueError(failmsg + " because of " + info['msg'] + "for URL " + url_to_use)
+
+                if f is None:
+                    f = open(part, 'ab')
+                    if offset:
+                        md5 = self._prefix_md5(part, offset)
+                if offset == 0:
+                    f.seek(0)
+                    f.truncate()
+                    md5 = hashlib.md5()
+
+                try:
+                    offset = self._write_chunks(response, f, report_hook=self.chunk_report, digest=md5,
+                                                bytes_so_far=offset, total_size=total)
+                except Exception:
+                    attempt += 1
+                    if attempt > self.retries:
+                        raise
+                    offset = f.tell()
+                    continue
+
+                if total is None or offset >= total:
+                    return md5.hexdigest(), offset
+                attempt += 1
+                if attempt > self.retries:
+                    raise ValueError(failmsg + ": transfer ended after %d of %d bytes" % (offset, total))
+        finally:
+            if f is not None:
+                f.close()
+
+    def _prefix_md5(self, path, length):
+        md5 = hashlib.md5()
+        f = open(path, 'rb')
+        try:
+            while length > 0:
+                chunk = f.read(min(DOWNLOAD_CHUNK_SIZE, length))
+                if not chunk:
+                    break
+                md5.update(chunk)
+                length -= len(chunk)
+        finally:
+            f.close()
+        return md5
+
+    def _download_segments(self, download, failmsg):
+        """Fetch the missing bytes of every segment of download concurrently. Returns the MD5 of the file"""
+        errors = []
+
+        def worker(index):
+            segment = download.segments[index]
+            attempt = 0
+            while segment[0] + segment[2] <= segment[1]:
+                start = segment[0] + segment[2]
+                try:
+                    response, info, url_to_use = self._fetch(download.url, {'Range': 'bytes=%d-%d' % (start, segment[1])})
+                    if info['status'] != 206:
+                        raise ValueError(failmsg + " because of " + info['msg'] + "for URL " + url_to_use)
+                    f = open(download.part, 'r+b')
+                    try:
+                        f.seek(start)
+                        while segment[0] + segment[2] <= segment[1]:
+                            chunk = response.read(min(DOWNLOAD_CHUNK_SIZE, segment[1] + 1 - segment[0] - segment[2]))
+                            if not chunk:
+                                break
+                            f.write(chunk)
+                            f.flush()
+                            download.advance(index, len(chunk))
+                    finally:
+                        f.close()
+                except Exception:
+                    e = sys.exc_info()[1]
+                    attempt += 1
+                    if attempt > self.retries:
+                        errors.append(str(e))
+                        return
+                    continue
+                if segment[0] + segment[2] <= segment[1]:
+                    attempt += 1
+                    if attempt > self.retries:
+                        errors.append("transfer of bytes %d-%d ended early" % (segment[0], segment[1]))
+                        return
+
+        workers = []
+        for index in range(len(download.segments)):
+            t = threading.Thread(target=worker, args=(index,))
+            t.daemon = True
+            t.start()
+            workers.append(t)
+        for t in workers:
+            t.join()
+
+        download.save()
+        if errors or not download.complete():
+            raise ValueError(failmsg + ": " + "; ".join(errors or ["incomplete transfer"]))
+
+        download.update_digest()
+        os.remove(SegmentedDownload.state_path(download.part))
+        return download.md5.hexdigest()
+
     def chunk_report(self, bytes_so_far, chunk_size, total_size):
+        if not total_size:
+            return
         percent = float(bytes_so_far) / total_size
         percent = round(percent * 100, 2)
         sys.stdout.write("Downloaded %d of %d bytes (%0.2f%%)\r" %
@@ -281,10 +809,12 @@ class MavenDownloader:
         if bytes_so_far >= total_size:
             sys.stdout.write('\n')
 
-    def _write_chunks(self, response, file, chunk_size=8192, report_hook=None):
-        total_size = response.info().getheader('Content-Length').strip()
-        total_size = int(total_size)
-        bytes_so_far = 0
+    def _write_chunks(self, response, file, chunk_size=DOWNLOAD_CHUNK_SIZE, report_hook=None, digest=None,
+                      bytes_so_far=0, total_size=None):
+        if total_size is None:
+            content_length = response.info().getheader('Content-Length')
+            if content_length:
+                total_size = bytes_so_far + int(content_length.strip())
 
         while 1:
             chunk = response.read(chunk_size)
@@ -294,6 +824,8 @@ class MavenDownloader:
                 break
 
             file.write(chunk)
+            if digest is not None:
+                digest.update(chunk)
             if report_hook:
                 report_hook(bytes_so_far, chunk_size, total_size)
 
@@ -304,10 +836,26 @@ class MavenDownloader:
             return False
         else:
             local_md5 = self._local_md5(file)
-            remote = self._request(remote_md5, "Failed to download MD5", lambda r: r.read())
-            return local_md5 == remote
+            return local_md5 == self._remote_md5(remote_md5)
 
     def _local_md5(self, file):
+        """MD5 of a local file, remembered for this run and, with a cache, across runs until the file changes"""
+        path = os.path.abspath(file)
+        if path in self._digests:
+            return self._digests[path]
+
+        md5 = None
+        if self.cache is not None:
+            md5 = self.cache.get_digest(path)
+        if md5 is None:
+            md5 = self._file_md5(path)
+            if self.cache is not None:
+                self.cache.put_digest(path, md5)
+
+        self._digests[path] = md5
+        return md5
+
+    def _file_md5(self, file):
         md5 = hashlib.md5()
         f = open(file, 'rb')
         for chunk in iter(lambda: f.read(8192), ''):
@@ -316,6 +864,65 @@ class MavenDownloader:
         return md5.hexdigest()
 
 
+def ensure_artifact(downloader, artifact, dest):
+    """Make sure dest holds artifact. Returns (dest, changed), raises ValueError on failure"""
+    if os.path.isdir(dest):
+        dest = posixpath.join(dest, artifact.artifact_id + "-" + artifact.version + "." + artifact.extension)
+    if os.path.lexists(dest) and downloader.verify_md5(dest, downloader.find_uri_for_artifact(artifact) + '.md5'):
+        return dest, False
+    else:
+        path = os.path.dirname(dest)
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+    if downloader.download(artifact, dest):
+        return dest, True
+    raise ValueError("Unable to download the artifact")
+
+
+def ensure_artifacts(downloader, items, threads):
+    """
+    Run ensure_artifact for every item on up to threads worker threads.
+    Returns one result dict per item, in order.
+    """
+    results = [None] * len(items)
+    pending = list(range(len(items)))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            lock.acquire()
+            try:
+                if not pending:
+                    return
+                i = pending.pop(0)
+            finally:
+                lock.release()
+
+            item = items[i]
+            result = dict(group_id=item['group_id'], artifact_id=item['artifact_id'], version=item['version'],
+                          classifier=item['classifier'], extension=item['extension'], dest=item['dest'])
+            try:
+                artifact = Artifact(item['group_id'], item['artifact_id'], item['version'], item['classifier'], item['extension'])
+                result['dest'], result['changed'] = ensure_artifact(downloader, artifact, item['dest'])
+            except Exception:
+                e = sys.exc_info()[1]
+                result['failed'] = True
+                result['msg'] = str(e)
+            results[i] = result
+
+    workers = []
+    for n in range(max(1, min(threads, len(items)))):
+        t = threading.Thread(target=worker)
+        t.daemon = True
+        t.start()
+        workers.append(t)
+    for t in workers:
+        t.join()
+
+    return results
+
+
 def main():
     module = AnsibleModule(
         argument_spec = dict(
@@ -330,7 +937,12 @@ def main():
             state = dict(default="present", choices=["present","absent"]), # TODO - Implement a "latest" state
             dest = dict(type="path", default=None),
             validate_certs = dict(required=False, default=True, type='bool'),
-        )
+            cache_dir = dict(type="path", default=None),
+            connections = dict(type="int", default=4),
+            artifacts = dict(type="list", default=None),
+            threads = dict(type="int", default=4),
+        ),
+        mutually_exclusive = [['artifacts', 'group_id'], ['artifacts', 'artifact_id'], ['artifacts', 'dest']],
     )
 
     try:
@@ -355,35 +967,47 @@ def main():
     if not repository_url:
         repository_url = "http://repo1.maven.org/maven2"
 
+    cache = None
+    if module.params["cache_dir"]:
+        try:
+            cache = ArtifactCache(module.params["cache_dir"])
+        except OSError as e:
+            module.fail_json(msg="Unable to create cache directory %s: %s" % (module.params["cache_dir"], e))
+
     #downloader = MavenDownloader(module, repository_url, repository_username, repository_password)
-    downloader = MavenDownloader(module, repository_url)
+    downloader = MavenDownloader(module, repository_url, cache, module.params["connections"])
+
+    if module.params["artifacts"] is not None:
+        items = []
+        for item in module.params["artifacts"]:
+            if not isinstance(item, dict) or not item.get("dest"):
+                module.fail_json(msg="Each item of artifacts must be a dict with at least a dest, got %r" % (item,))
+            items.append(dict(group_id=item.get("group_id"), artifact_id=item.get("artifact_id"),
+                              version=item.get("version", version), classifier=item.get("classifier", classifier),
+                              extension=item.get("extension", extension), dest=os.path.expanduser(item["dest"])))
+
+        results = ensure_artifacts(downloader, items, module.params["threads"])
+        failed = [r for r in results if r.get("failed")]
+        changed = len([r for r in results if r.get("changed")]) > 0
+        if failed:
+            module.fail_json(msg="Unable to download %d artifact(s)" % len(failed), artifacts=results, changed=changed)
+        module.exit_json(state=state, artifacts=results, repository_url=repository_url, changed=changed)
 
     try:
         artifact = Artifact(group_id, artifact_id, version, classifier, extension)
     except ValueError as e:
         module.fail_json(msg=e.args[0])
 
-    prev_state = "absent"
-    if os.path.isdir(dest):
-        dest = posixpath.join(dest, artifact_id + "-" + version + "." + extension)
-    if os.path.lexists(dest) and downloader.verify_md5(dest, downloader.find_uri_for_artifact(artifact) + '.md5'):
-        prev_state = "present"
-    else:
-        path = os.path.dirname(dest)
-        if not os.path.exists(path):
-            os.makedirs(path)
-
-    if prev_state == "present":
-        module.exit_json(dest=dest, state=state, changed=False)
-
     try:
-        if downloader.download(artifact, dest):
-            module.exit_json(state=state, dest=dest, group_id=group_id, artifact_id=artifact_id, version=version, classifier=classifier, extension=extension, repository_url=repository_url, changed=True)
-        else:
-            module.fail_json(msg="Unable to download the artifact")
+        dest, changed = ensure_artifact(downloader, artifact, dest)
     except ValueError as e:
         module.fail_json(msg=e.args[0])
 
+    if not changed:
+        module.exit_json(dest=dest, state=state, changed=False)
+
+    module.exit_json(state=state, dest=dest, group_id=group_id, artifact_id=artifact_id, version=version, classifier=classifier, extension=extension, repository_url=repository_url, changed=True)
+
 
 
 if __name__ == '__main__':
@@ -126,27 +126,44 @@ def get_version(pacman_output):
             return line.split(':')[1].strip()
     return None
 
-def query_package(module, pacman_path, name, state="present"):
-    """Query the package status in both the local system and the repository. Returns a boolean to indicate if the package is installed, a second boolean to indicate if the package is up-to-date and a third boolean to indicate whether online information were available"""
+def build_package_index(module, pacman_path, remote=False):
+    """Read the local database with a single pacman -Q and, if remote is set, the sync databases with a single pacman -Sl. Returns a dict with the installed versions by name under 'local' and the repository versions under 'remote'"""
+    index = dict(local={}, remote=None)
+
+    cmd = "%s -Q" % (pacman_path)
+    rc, stdout, stderr = module.run_command(cmd, check_rc=False)
+    for line in stdout.split('\n'):
+        fields = line.split()
+        if len(fields) >= 2:
+            index['local'][fields[0]] = fields[1]
+
+    if remote:
+        index['remote'] = {}
+        cmd = "%s -Sl" % (pacman_path)
+        rc, stdout, stderr = module.run_command(cmd, check_rc=False)
+        for line in stdout.split('\n'):
+            # repo name version [installed]
+            fields = line.split()
+            # pacman -Si reports the package from the first repository listing it
+            if len(fields) >= 3 and fields[1] not in index['remote']:
+                index['remote'][fields[1]] = fields[2]
+
+    return index
+
+def query_package(module, index, name, state="present"):
+    """Query the package status in both the local system and the repository, as read by build_package_index. Returns a boolean to indicate if the package is installed, a second boolean to indicate if the package is up-to-date and a third boolean to indicate whether online information were available"""
     if state == "present":
-        lcmd = "%s -Qi %s" % (pacman_path, name)
-        lrc, lstdout, lstderr = module.run_command(lcmd, check_rc=False)
-        if lrc != 0:
+        if name not in index['local']:
             # package is not installed locally
             return False, False, False
 
         # get the version installed locally (if any)
-        lversion = get_version(lstdout)
-
-        rcmd = "%s -Si %s" % (pacman_path, name)
-        rrc, rstdout, rstderr = module.run_command(rcmd, check_rc=False)
-        # get the version in the repository
-        rversion = get_version(rstdout)
+        lversion = index['local'][name]
 
-        if rrc == 0:
+        if index['remote'] is not None and name in index['remote']:
             # Return True to indicate that the package is installed locally, and the result of the version number comparison
             # to determine if the package is up-to-date.
-            return True, (lversion == rversion), False
+            return True, (lversion == index['remote'][name]), False
 
     # package is installed but cannot fetch remote Version. Last True stands for the error
         return True, True, True
@@ -183,7 +200,7 @@ def upgrade(module, pacman_path):
     else:
         module.exit_json(changed=False, msg='Nothing to upgrade')
 
-def remove_packages(module, pacman_path, packages):
+def remove_packages(module, pacman_path, index, packages):
     if module.params["recurse"] or module.params["force"]:
         if module.params["recurse"]:
             args = "Rs"
@@ -198,7 +215,7 @@ def remove_packages(module, pacman_path, packages):
     # Using a for loop incase of error, we can report the package that failed
     for package in packages:
         # Query the package first, to see if we even need to remove
-        installed, updated, unknown = query_package(module, pacman_path, package)
+        installed, updated, unknown = query_package(module, index, package)
         if not installed:
             continue
 
@@ -217,14 +234,15 @@ def remove_packages(module, pacman_path, packages):
     module.exit_json(changed=False, msg="package(s) already absent")
 
 
-def install_packages(module, pacman_path, state, packages, package_files):
-    install_c = 0
+def install_packages(module, pacman_path, index, state, packages, package_files):
+    to_install_repos = []
+    to_install_files = []
     package_err = []
     message = ""
 
     for i, package in enumerate(packages):
         # if the package is installed and state == present or state == latest and is up-to-date then skip
-        installed, updated, latestError = query_package(module, pacman_path, package)
+        installed, updated, latestError = query_package(module, index, package)
         if latestError and state == 'latest':
             package_err.append(package)
 
@@ -232,17 +250,26 @@ def install_packages(module, pacman_path, state, packages, package_files):
             continue
 
         if package_files[i]:
-            params = '-U %s' % package_files[i]
+            to_install_files.append(package_files[i])
         else:
-            params = '-S %s' % package
+            to_install_repos.append(package)
+
+    # Install everything in one transaction per source instead of one per package
+    if to_install_repos:
+        cmd = "%s -S %s --noconfirm --needed" % (pacman_path, " ".join(to_install_repos))
+        rc, stdout, stderr = module.run_command(cmd, check_rc=False)
 
-        cmd = "%s %s --noconfirm --needed" % (pacman_path, params)
+        if rc != 0:
+            module.fail_json(msg="failed to install %s" % (" ".join(to_install_repos)), stderr=stderr)
+
+    if to_install_files:
+        cmd = "%s -U %s --noconfirm --needed" % (pacman_path, " ".join(to_install_files))
         rc, stdout, stderr = module.run_command(cmd, check_rc=False)
 
         if rc != 0:
-            module.fail_json(msg="failed to install %s" % (package))
+            module.fail_json(msg="failed to install %s" % (" ".join(to_install_files)), stderr=stderr)
 
-        install_c += 1
+    install_c = len(to_install_repos) + len(to_install_files)
 
     if state == 'latest' and len(package_err) > 0:
         message = "But could not ensure 'latest' state for %s package(s) as remote version could not be fetched." % (package_err)
@@ -252,10 +279,10 @@ def install_packages(module, pacman_path, state, packages, package_files):
 
     module.exit_json(changed=False, msg="package(s) already installed. %s" % (message))
 
-def check_packages(module, pacman_path, packages, state):
+def check_packages(module, index, packages, state):
     would_be_changed = []
     for package in packages:
-        installed, updated, unknown = query_package(module, pacman_path, package)
+        installed, updated, unknown = query_package(module, index, package)
         if ((state in ["present", "latest"] and not installed) or
                 (state == "absent" and installed) or
                 (state == "latest" and not updated)):
@@ -272,16 +299,20 @@ def check_packages(module, pacman_path, packages, state):
 def expand_package_groups(module, pacman_path, pkgs):
     expanded = []
 
-    for pkg in pkgs:
-        cmd = "%s -Sgq %s" % (pacman_path, pkg)
-        rc, stdout, stderr = module.run_command(cmd, check_rc=False)
+    # A single pacman -Sgg lists the members of every group as "group package"
+    # lines; -Sg without targets only prints the group names
+    groups = {}
+    cmd = "%s -Sgg" % (pacman_path)
+    rc, stdout, stderr = module.run_command(cmd, check_rc=False)
+    for line in stdout.split('\n'):
+        fields = line.split()
+        if len(fields) == 2:
+            groups.setdefault(fields[0], []).append(fields[1])
 
-        if rc == 0:
+    for pkg in pkgs:
+        if pkg in groups:
             # A group was found matching the name, so expand it
-            for name in stdout.split('\n'):
-                name = name.strip()
-                if name:
-                    expanded.append(name)
+            expanded.extend(groups[pkg])
         else:
             expanded.append(pkg)
 
@@ -335,13 +366,15 @@ def main():
             else:
                 pkg_files.append(None)
 
+        index = build_package_index(module, pacman_path, remote=(p['state'] == 'latest'))
+
         if module.check_mode:
-            check_packages(module, pacman_path, pkgs, p['state'])
+            check_packages(module, index, pkgs, p['state'])
 
         if p['state'] in ['present', 'latest']:
-            install_packages(module, pacman_path, p['state'], pkgs, pkg_files)
+            install_packages(module, pacman_path, index, p['state'], pkgs, pkg_files)
         elif p['state'] == 'absent':
-            remove_packages(module, pacman_path, pkgs)
+            remove_packages(module, pacman_path, index, pkgs)
 
 # import module snippets
 from ansible.module_utils.basic import *
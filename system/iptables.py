@@ -23,6 +23,64 @@ BINS = dict(
     ipv6='ip6tables',
 )
 
+SAVE_BINS = dict(
+    ipv4='iptables-save',
+    ipv6='ip6tables-save',
+)
+
+RESTORE_BINS = dict(
+    ipv4='iptables-restore',
+    ipv6='ip6tables-restore',
+)
+
+# Long options and aliases as iptables-save prints them
+OPTION_ALIASES = {
+    '--protocol': '-p',
+    '--source': '-s',
+    '--src': '-s',
+    '--destination': '-d',
+    '--dst': '-d',
+    '--match': '-m',
+    '--jump': '-j',
+    '--goto': '-g',
+    '--in-interface': '-i',
+    '--out-interface': '-o',
+    '--fragment': '-f',
+    '--source-port': '--sport',
+    '--destination-port': '--dport',
+    '--state': '--ctstate',
+}
+
+LIMIT_UNITS = dict(s='sec', m='min', h='hour', d='day')
+
+# Values of these options are printed by iptables-save exactly as given only
+# if they match; anything else (service, user or host names, DSCP classes,
+# ...) is resolved by iptables and the rule can't be compared in memory
+NUMERIC_VALUES = {
+    '--sport': r'^\d+(:\d+)?$',
+    '--dport': r'^\d+(:\d+)?$',
+    '--uid-owner': r'^\d+$',
+    '--icmp-type': r'^\d+(/\d+)?$',
+    '--set-dscp': r'^(0x[0-9a-fA-F]+|\d+)$',
+}
+
+UNCANONICAL_OPTIONS = ('-c', '-f', '--set-dscp-class')
+
+REJECT_WITH = dict(
+    ipv4=(
+        'icmp-net-unreachable', 'icmp-host-unreachable',
+        'icmp-port-unreachable', 'icmp-proto-unreachable',
+        'icmp-net-prohibited', 'icmp-host-prohibited',
+        'icmp-admin-prohibited', 'tcp-reset'),
+    ipv6=(
+        'icmp6-no-route', 'icmp6-adm-prohibited', 'icmp6-addr-unreachable',
+        'icmp6-port-unreachable', 'icmp6-policy-fail', 'icmp6-reject-route',
+        'tcp-reset'),
+)
+
+# Limit burst iptables-save leaves out
+DEFAULT_LIMIT_BURST = '5'
+
 DOCUMENTATION = '''
 ---
 module: iptables
@@ -291,6 +349,22 @@ options:
         ACCEPT, DROP, QUEUE, RETURN. Only built in chains can have policies.
         This parameter requires the chain parameter. Ignores all other
         parameters."
+  rules:
+    version_added: "2.3"
+    description:
+      - "A list of rules to manage in C(table) in one pass. Each item is
+        a dict taking the rule options of this module (C(chain),
+        C(protocol), C(source), C(jump), ...) as well as C(state) and
+        C(action). C(chain), C(state) and C(action) default to the module
+        parameters. The table is read once with iptables-save, compared in
+        memory and all changes are committed with a single
+        iptables-restore --noflush call. Rules using values which
+        iptables resolves itself (host, service or user names, netmasks,
+        DSCP classes, counters, fragments) are checked with iptables -C
+        instead and returned in C(checked). Ignores all other rule
+        parameters."
+    required: false
+    default: null
 '''
 
 EXAMPLES = '''
@@ -311,8 +385,23 @@ EXAMPLES = '''
 
 # Tag all outbound tcp packets with DSCP DiffServ class CS1
 - iptables: chain=OUTPUT jump=DSCP table=mangle set_dscp_mark_class=CS1 protocol=tcp
+
+# Apply several rules with a single iptables-save/iptables-restore
+- iptables:
+    chain: INPUT
+    rules:
+      - { ctstate: [ESTABLISHED, RELATED], jump: ACCEPT }
+      - { protocol: tcp, destination_port: 22, jump: ACCEPT }
+      - { source: 8.8.8.8, jump: DROP, action: insert }
+      - { source: 10.0.0.0/8, jump: ACCEPT, state: absent }
+  become: yes
 '''
 
+import binascii
+import re
+import shlex
+import socket
+
 
 def append_param(rule, param, flag, is_list):
     if is_list:
@@ -417,6 +506,230 @@ def set_chain_policy(iptables_path, module, params):
     module.run_command(cmd, check_rc=True)
 
 
+def canonical_address(value, ip_version):
+    """
+    Return an address or network the way iptables-save prints it, or None
+    if it is a host name or uses a dotted netmask.
+    """
+    if ip_version == 'ipv6':
+        family = socket.AF_INET6
+        bits = 128
+    else:
+        family = socket.AF_INET
+        bits = 32
+
+    parts = value.split('/', 1)
+    if len(parts) == 1:
+        prefix = bits
+    elif parts[1].isdigit() and int(parts[1]) <= bits:
+        prefix = int(parts[1])
+    else:
+        return None
+
+    try:
+        packed = socket.inet_pton(family, parts[0])
+    except (socket.error, ValueError):
+        return None
+
+    # iptables keeps only the network part
+    number = int(binascii.hexlify(packed), 16)
+    number &= ~((1 << (bits - prefix)) - 1)
+    packed = binascii.unhexlify('%0*x' % (bits // 4, number))
+
+    return '%s/%d' % (socket.inet_ntop(family, packed), prefix)
+
+
+def normalize_rule(tokens, ip_version):
+    """
+    Reduce the arguments of a rule, as given by construct_rule or printed
+    by iptables-save, to a canonical tuple of (option, values) groups so
+    that both can be compared. Handles the differences iptables-save is
+    known to introduce. Returns None for rules with values only iptables
+    itself can resolve, such as host, service or user names.
+    """
+    groups = []
+    negate = False
+    for token in tokens:
+        if token == '!':
+            negate = True
+        elif token.startswith('-') and not token.lstrip('-').isdigit():
+            option = OPTION_ALIASES.get(token, token)
+            if negate:
+                option = '!' + option
+                negate = False
+            groups.append([option])
+        elif groups:
+            # Old style "-s ! addr" and values like "!addr" negate the option
+            if token.startswith('!'):
+                negate = True
+                token = token[1:].strip()
+            if negate and not groups[-1][0].startswith('!'):
+                groups[-1][0] = '!' + groups[-1][0]
+            negate = False
+            groups[-1].append(token)
+
+    protocol = None
+    for group in groups:
+        option = group[0].lstrip('!')
+        values = group[1:]
+        if option in UNCANONICAL_OPTIONS:
+            return None
+        elif option in NUMERIC_VALUES:
+            for value in values:
+                if not re.match(NUMERIC_VALUES[option], value):
+                    return None
+            if option == '--set-dscp' and values:
+                group[1] = '0x%02x' % int(values[0], 0)
+        elif option in ('-s', '-d'):
+            for i in range(len(values)):
+                address = canonical_address(values[i], ip_version)
+                if address is None:
+                    return None
+                group[i + 1] = address
+        elif option == '-p' and values:
+            if values[0].isdigit():
+                return None
+            protocol = group[1] = values[0].lower()
+        elif option == '--reject-with' and values:
+            if values[0] not in REJECT_WITH[ip_version]:
+                return None
+        elif option == '-m' and values and values[0] == 'state':
+            group[1] = 'conntrack'
+        elif option == '--ctstate' and values:
+            states = values[0].upper().split(',')
+            states.sort()
+            group[1] = ','.join(states)
+        elif option == '--limit' and values:
+            if '/' in values[0]:
+                rate, unit = values[0].split('/', 1)
+            else:
+                rate, unit = values[0], 'sec'
+            group[1] = '%s/%s' % (rate, LIMIT_UNITS.get(unit[:1], unit))
+
+    result = []
+    for group in groups:
+        # iptables-save adds the implicit match for the protocol and leaves
+        # out "-p all" and the default limit burst
+        if group[0] == '-m' and group[1:] == [protocol]:
+            continue
+        if group == ['-p', 'all']:
+            continue
+        if group == ['--limit-burst', DEFAULT_LIMIT_BURST]:
+            continue
+        result.append(tuple(group))
+    result.sort()
+    return tuple(result)
+
+
+def quote_restore_arg(arg):
+    if not arg or ' ' in arg or '"' in arg or '\t' in arg:
+        return '"%s"' % arg.replace('\\', '\\\\').replace('"', '\\"')
+    return arg
+
+
+def read_table(module, ip_version, table):
+    """
+    Return a dict of chain name to the list of normalized rules in it,
+    read with a single iptables-save call.
+    """
+    save_path = module.get_bin_path(SAVE_BINS[ip_version], True)
+    rc, out, err = module.run_command([save_path, '-t', table], check_rc=True)
+
+    chains = {}
+    for line in out.splitlines():
+        if not line.startswith('-A '):
+            continue
+        tokens = shlex.split(line)
+        key = normalize_rule(tokens[2:], ip_version)
+        if key is not None:
+            chains.setdefault(tokens[1], []).append(key)
+    return chains
+
+
+def apply_rules(iptables_path, module, params):
+    """
+    Bring every rule of params['rules'] to its wanted state with one
+    iptables-save, an in-memory diff and one iptables-restore --noflush.
+    Only rules normalize_rule can't canonicalize are checked with
+    iptables -C; they are returned as the third list.
+    """
+    ip_version = params['ip_version']
+    table = params['table']
+    defaults = dict()
+    for name, spec in module.argument_spec.items():
+        defaults[name] = spec.get('default')
+
+    items = []
+    for item in params['rules']:
+        if not isinstance(item, dict):
+            module.fail_json(msg="Each item of rules must be a dict, got %r" % (item,))
+        unknown = [k for k in item if k not in defaults or k in ('table', 'ip_version', 'flush', 'policy', 'rules')]
+        if unknown:
+            module.fail_json(msg="Unsupported keys in rules item: %s" % ', '.join(unknown))
+
+        rule_params = defaults.copy()
+        rule_params.update(table=table, chain=params['chain'], state=params['state'], action=params['action'])
+        rule_params.update(item)
+        for name in ('match', 'ctstate'):
+            if not isinstance(rule_params[name], list):
+                rule_params[name] = [x.strip() for x in str(rule_params[name]).split(',')]
+        for name, value in rule_params.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                rule_params[name] = str(value)
+
+        if not rule_params['chain']:
+            module.fail_json(msg="Every item of rules needs a chain: %r" % (item,))
+        if rule_params['state'] not in ('present', 'absent'):
+            module.fail_json(msg="state must be one of present, absent, got %s" % rule_params['state'])
+        if rule_params['action'] not in ('append', 'insert'):
+            module.fail_json(msg="action must be one of append, insert, got %s" % rule_params['action'])
+        items.append(rule_params)
+
+    chains = read_table(module, ip_version, table)
+
+    commands = []
+    added = []
+    removed = []
+    checked = []
+    for rule_params in items:
+        chain = rule_params['chain']
+        rule = construct_rule(rule_params)
+        existing = chains.setdefault(chain, [])
+        key = normalize_rule(rule, ip_version)
+
+        if key is None:
+            # Only iptables itself can resolve these values
+            rule_is_present = check_present(iptables_path, module, rule_params)
+            checked.append('%s %s' % (chain, ' '.join(rule)))
+        else:
+            rule_is_present = key in existing
+
+        if rule_is_present == (rule_params['state'] == 'present'):
+            continue
+
+        line = ' '.join([quote_restore_arg(arg) for arg in rule])
+        if rule_params['state'] == 'present':
+            if rule_params['action'] == 'insert':
+                commands.append('-I %s 1 %s' % (chain, line))
+            else:
+                commands.append('-A %s %s' % (chain, line))
+            if key is not None:
+                existing.append(key)
+            added.append('%s %s' % (chain, ' '.join(rule)))
+        else:
+            commands.append('-D %s %s' % (chain, line))
+            if key is not None:
+                existing.remove(key)
+            removed.append('%s %s' % (chain, ' '.join(rule)))
+
+    if commands and not module.check_mode:
+        restore_path = module.get_bin_path(RESTORE_BINS[ip_version], True)
+        data = '*%s\n%s\nCOMMIT\n' % (table, '\n'.join(commands))
+        module.run_command([restore_path, '--noflush'], data=data, check_rc=True)
+
+    return added, removed, checked
+
+
 def main():
     module = AnsibleModule(
         supports_check_mode=True,
@@ -469,10 +782,13 @@ def main():
                 default=None,
                 type='str',
                 choices=['ACCEPT', 'DROP', 'QUEUE', 'RETURN']),
+            rules=dict(required=False, default=None, type='list'),
         ),
         mutually_exclusive=(
             ['set_dscp_mark', 'set_dscp_mark_class'],
             ['flush', 'policy'],
+            ['flush', 'rules'],
+            ['policy', 'rules'],
         ),
     )
     args = dict(
@@ -489,6 +805,16 @@ def main():
     ip_version = module.params['ip_version']
     iptables_path = module.get_bin_path(BINS[ip_version], True)
 
+    # Apply a whole list of rules at once
+    if module.params['rules'] is not None:
+        added, removed, checked = apply_rules(iptables_path, module, module.params)
+        args['rule'] = None
+        args['added'] = added
+        args['removed'] = removed
+        args['checked'] = checked
+        args['changed'] = bool(added or removed)
+        module.exit_json(**args)
+
     # Check if chain option is required
     if args['flush'] is False and args['chain'] is None:
         module.fail_json(
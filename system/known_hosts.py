@@ -32,14 +32,22 @@ options:
   name:
     aliases: [ 'host' ]
     description:
-      - The host to add or remove (must match a host specified in key)
-    required: true
+      - The host to add or remove (must match a host specified in key). Required unless C(keys) is given.
+    required: false
     default: null
   key:
     description:
       - The SSH public host key, as a string (required if state=present, optional when state=absent, in which case all keys for the host are removed). The key must be in the right format for ssh (see sshd(1), section "SSH_KNOWN_HOSTS FILE FORMAT")
     required: false
     default: null
+  keys:
+    description:
+      - A list of host keys to add or remove in a single read and write of the file, each a dict with
+        C(name), C(key) and optional C(state) (defaulting to the module C(state)), taking the same
+        values as the corresponding module parameters. Mutually exclusive with C(name) and C(key).
+    required: false
+    default: null
+    version_added: "2.3"
   path:
     description:
       - The known_hosts file to edit
@@ -61,6 +69,17 @@ EXAMPLES = '''
   known_hosts: path='/etc/ssh/ssh_known_hosts'
                name='foo.com.invalid'
                key="{{ lookup('file', 'pubkeys/foo.com.invalid') }}"
+
+# Add and remove many host keys with one read and one write of the file
+- known_hosts:
+    path: /etc/ssh/ssh_known_hosts
+    keys:
+      - name: foo.com.invalid
+        key: "{{ lookup('file', 'pubkeys/foo.com.invalid') }}"
+      - name: bar.com.invalid
+        key: "{{ lookup('file', 'pubkeys/bar.com.invalid') }}"
+      - name: old.com.invalid
+        state: absent
 '''
 
 # Makes sure public host keys are present or absent in the given known_hosts
@@ -70,6 +89,7 @@ EXAMPLES = '''
 # =========
 #    name = hostname whose key should be added (alias: host)
 #    key = line(s) to add to known_hosts file
+#    keys = list of name/key/state dicts to manage in one pass
 #    path = the known_hosts file to edit (default: ~/.ssh/known_hosts)
 #    state = absent|present (default: present)
 
@@ -78,21 +98,185 @@ import os.path
 import tempfile
 import errno
 import re
+import hmac
+import base64
+try:
+    from hashlib import sha1
+except ImportError:
+    import sha as sha1
 from ansible.module_utils.pycompat24 import get_exception
 from ansible.module_utils.basic import *
 
-def enforce_state(module, params):
+# Prefix of host fields hashed with HashKnownHosts, see sshd(8)
+HASH_MAGIC = '|1|'
+
+# Marker lines which ssh-keygen -R leaves alone
+MARKERS = ('@cert-authority', '@revoked')
+
+def pattern_to_regex(pattern):
+    '''Compile a known_hosts host pattern ('*' and '?' wildcards) to a regex'''
+    regex = ''
+    for c in pattern:
+        if c == '*':
+            regex += '.*'
+        elif c == '?':
+            regex += '.'
+        else:
+            regex += re.escape(c)
+    return re.compile('^' + regex + '$')
+
+def hash_host(host, salt):
+    '''Return the HMAC-SHA1 of host keyed with salt, as in hashed known_hosts entries'''
+    return hmac.new(salt, host.encode('utf-8'), sha1).digest()
+
+def parse_hashed(hostfield):
+    '''Return (salt, digest) decoded from a |1|salt|hash host field, or (None, None)'''
+    parts = hostfield[len(HASH_MAGIC):].split('|')
+    if len(parts) != 2:
+        return None, None
+    try:
+        return base64.b64decode(parts[0]), base64.b64decode(parts[1])
+    except (TypeError, ValueError):
+        return None, None
+
+def split_key_line(line):
+    '''
+    Split a known_hosts line into (marker, hostfield, remaining fields).
+    Returns None for comments, blank and malformed lines.
+    '''
+    fields = line.split()
+    if not fields or fields[0].startswith('#'):
+        return None
+    marker = None
+    if fields[0].startswith('@'):
+        marker = fields.pop(0)
+    if len(fields) < 3:
+        return None
+    return marker, fields[0], fields[1:]
+
+def host_matches(hostfield, host):
+    '''
+    Does host match the host field of a known_hosts line? Follows ssh-keygen -F:
+    hashed fields are compared by HMAC, otherwise the field is a comma separated
+    list of case insensitive wildcard patterns, a negated match excluding the host.
+    '''
+    if hostfield.startswith(HASH_MAGIC):
+        salt, digest = parse_hashed(hostfield)
+        return salt is not None and hash_host(host, salt) == digest
+
+    host = host.lower()
+    matched = False
+    for pattern in hostfield.lower().split(','):
+        negate = pattern.startswith('!')
+        if negate:
+            pattern = pattern[1:]
+        if pattern_to_regex(pattern).match(host):
+            if negate:
+                return False
+            matched = True
+    return matched
+
+class KnownHosts(object):
+    '''
+    In-memory copy of a known_hosts file, read once. Lines are indexed by
+    plain host name, hashed entry and wildcard pattern so that looking up a
+    host doesn't rescan the file. Removals and additions are only written
+    back to disk by write().
+    '''
+
+    def __init__(self, module, path):
+        self.module = module
+        self.path = path
+        self.lines = []
+        self.plain = {}
+        self.hashed = []
+        self.patterns = []
+        self.changed = False
+
+        try:
+            inf=open(path,"r")
+        except IOError:
+            e = get_exception()
+            if e.errno != errno.ENOENT:
+                module.fail_json(msg="Failed to read %s: %s" % \
+                                     (path,str(e)))
+            return
+
+        for line in inf:
+            self._append(line)
+        inf.close()
+
+    def _append(self, line):
+        index = len(self.lines)
+        self.lines.append(line)
+
+        parsed = split_key_line(line)
+        if parsed is None:
+            return
+        hostfield = parsed[1]
+
+        if hostfield.startswith(HASH_MAGIC):
+            salt, digest = parse_hashed(hostfield)
+            if salt is not None:
+                self.hashed.append((salt, digest, index))
+        elif '*' in hostfield or '?' in hostfield or '!' in hostfield:
+            self.patterns.append((hostfield, index))
+        else:
+            for name in hostfield.lower().split(','):
+                self.plain.setdefault(name, []).append(index)
+
+    def lookup(self, host):
+        '''Return the indexes of the lines matching host, in file order'''
+        found = list(self.plain.get(host.lower(), []))
+
+        # Hashed entries are compared case sensitively, as ssh-keygen does
+        for salt, digest, index in self.hashed:
+            if hash_host(host, salt) == digest:
+                found.append(index)
+
+        for hostfield, index in self.patterns:
+            if host_matches(hostfield, host):
+                found.append(index)
+
+        found = [index for index in set(found) if self.lines[index] is not None]
+        found.sort()
+        return found
+
+    def remove(self, index):
+        self.lines[index] = None
+        self.changed = True
+
+    def add(self, key):
+        for line in key.splitlines(True):
+            self._append(line)
+        self.changed = True
+
+    def write(self):
+        try:
+            outf=tempfile.NamedTemporaryFile(dir=os.path.dirname(self.path))
+            for line in self.lines:
+                if line is not None:
+                    outf.write(line)
+            outf.flush()
+            self.module.atomic_move(outf.name,self.path)
+        except (IOError,OSError):
+            e = get_exception()
+            self.module.fail_json(msg="Failed to write to file %s: %s" % \
+                                      (self.path,str(e)))
+
+        try:
+            outf.close()
+        except:
+            pass
+
+def enforce_state(module, params, known_hosts):
     """
-    Add or remove key.
+    Add or remove key in known_hosts, returning whether anything changed.
     """
 
     host = params["name"]
     key = params.get("key",None)
-    port = params.get("port",None)
-    path = params.get("path")
     state = params.get("state")
-    #Find the ssh-keygen binary
-    sshkeygen = module.get_bin_path("ssh-keygen",True)
 
     # Trailing newline in files gets lost, so re-add if necessary
     if key and key[-1] != '\n':
@@ -101,143 +285,79 @@ def enforce_state(module, params):
     if key is None and state != "absent":
         module.fail_json(msg="No key specified when adding a host")
 
-    sanity_check(module,host,key,sshkeygen)
+    sanity_check(module,host,key)
 
-    found,replace_or_add,found_line=search_for_host_key(module,host,key,path,sshkeygen)
+    found,replace_or_add,found_line=search_for_host_key(module,host,key,known_hosts)
 
     #We will change state if found==True & state!="present"
     #or found==False & state=="present"
     #i.e found XOR (state=="present")
     #Alternatively, if replace is true (i.e. key present, and we must change it)
-    if module.check_mode:
-        module.exit_json(changed = replace_or_add or (state=="present") != found)
+    changed = replace_or_add or (state=="present") != found
 
     #Now do the work.
 
-    #Only remove whole host if found and no key provided
+    #Only remove whole host if found and no key provided. Like ssh-keygen -R,
+    #@cert-authority and @revoked lines are kept.
     if found and key is None and state=="absent":
-        module.run_command([sshkeygen,'-R',host,'-f',path], check_rc=True)
-        params['changed'] = True
+        for index in known_hosts.lookup(host):
+            if split_key_line(known_hosts.lines[index])[0] not in MARKERS:
+                known_hosts.remove(index)
 
     #Next, add a new (or replacing) entry
     if replace_or_add or found != (state=="present"):
-        try:
-            inf=open(path,"r")
-        except IOError:
-            e = get_exception()
-            if e.errno == errno.ENOENT:
-                inf=None
-            else:
-                module.fail_json(msg="Failed to read %s: %s" % \
-                                     (path,str(e)))
-        try:
-            outf=tempfile.NamedTemporaryFile(dir=os.path.dirname(path))
-            if inf is not None:
-                for line_number, line in enumerate(inf, start=1):
-                    if found_line==line_number and (replace_or_add or state=='absent'):
-                        continue # skip this line to replace its key
-                    outf.write(line)
-                inf.close()
-            if state == 'present':
-                outf.write(key)
-            outf.flush()
-            module.atomic_move(outf.name,path)
-        except (IOError,OSError):
-            e = get_exception()
-            module.fail_json(msg="Failed to write to file %s: %s" % \
-                                 (path,str(e)))
-
-        try:
-            outf.close()
-        except:
-            pass
-
-        params['changed'] = True
+        if found_line is not None and (replace_or_add or state=='absent'):
+            known_hosts.remove(found_line) # drop this line to replace its key
+        if state == 'present':
+            known_hosts.add(key)
 
-    return params
+    return changed
 
-def sanity_check(module,host,key,sshkeygen):
+def sanity_check(module,host,key):
     '''Check supplied key is sensible
 
     host and key are parameters provided by the user; If the host
     provided is inconsistent with the key supplied, then this function
     quits, providing an error to the user.
-    sshkeygen is the path to ssh-keygen, found earlier with get_bin_path
     '''
     #If no key supplied, we're doing a removal, and have nothing to check here.
     if key is None:
         return
-    #Rather than parsing the key ourselves, get ssh-keygen to do it
-    #(this is essential for hashed keys, but otherwise useful, as the
-    #key question is whether ssh-keygen thinks the key matches the host).
-
-    #The approach is to write the key to a temporary file,
-    #and then attempt to look up the specified host in that file.
-    try:
-        outf=tempfile.NamedTemporaryFile()
-        outf.write(key)
-        outf.flush()
-    except IOError:
-        e = get_exception()
-        module.fail_json(msg="Failed to write to temporary file %s: %s" % \
-                             (outf.name,str(e)))
-    rc,stdout,stderr=module.run_command([sshkeygen,'-F',host,
-                                         '-f',outf.name],
-                                        check_rc=True)
-    try:
-        outf.close()
-    except:
-        pass
+    #The key question is whether ssh-keygen -F would find the host in the
+    #supplied key, which host_matches answers for hashed keys too.
+    for line in key.splitlines():
+        parsed = split_key_line(line)
+        if parsed is not None and host_matches(parsed[1], host):
+            return
 
-    if stdout=='': #host not found
-        module.fail_json(msg="Host parameter does not match hashed host field in supplied key")
+    module.fail_json(msg="Host parameter does not match hashed host field in supplied key")
 
-def search_for_host_key(module,host,key,path,sshkeygen):
-    '''search_for_host_key(module,host,key,path,sshkeygen) -> (found,replace_or_add,found_line)
+def search_for_host_key(module,host,key,known_hosts):
+    '''search_for_host_key(module,host,key,known_hosts) -> (found,replace_or_add,found_line)
 
-    Looks up host and keytype in the known_hosts file path; if it's there, looks to see
+    Looks up host and keytype in known_hosts; if it's there, looks to see
     if one of those entries matches key. Returns:
-    found (Boolean): is host found in path?
-    replace_or_add (Boolean): is the key in path different to that supplied by user?
-    found_line (int or None): the line where a key of the same type was found
+    found (Boolean): is host found in known_hosts?
+    replace_or_add (Boolean): is the key in known_hosts different to that supplied by user?
+    found_line (int or None): the index of the line where a key of the same type was found
     if found=False, then replace is always False.
-    sshkeygen is the path to ssh-keygen, found earlier with get_bin_path
     '''
-    if os.path.exists(path)==False:
-        return False, False, None
-    #openssh >=6.4 has changed ssh-keygen behaviour such that it returns
-    #1 if no host is found, whereas previously it returned 0
-    rc,stdout,stderr=module.run_command([sshkeygen,'-F',host,'-f',path],
-                                 check_rc=False)
-    if stdout=='' and stderr=='' and (rc==0 or rc==1):
-        return False, False, None #host not found, no other errors
-    if rc!=0: #something went wrong
-        module.fail_json(msg="ssh-keygen failed (rc=%d,stdout='%s',stderr='%s')" % (rc,stdout,stderr))
+    lines = known_hosts.lookup(host)
+    if not lines:
+        return False, False, None #host not found
 
     #If user supplied no key, we don't want to try and replace anything with it
     if key is None:
         return True, False, None
 
-    lines=stdout.split('\n')
     new_key = normalize_known_hosts_key(key, host)
 
-    for l in lines:
-        if l=='':
-            continue
-        elif l[0]=='#': # info output from ssh-keygen; contains the line number where key was found
-            try:
-                # This output format has been hardcoded in ssh-keygen since at least OpenSSH 4.0
-                # It always outputs the non-localized comment before the found key
-                found_line = int(re.search(r'found: line (\d+)', l).group(1))
-            except IndexError:
-                e = get_exception()
-                module.fail_json(msg="failed to parse output of ssh-keygen for line number: '%s'" % l)
-        else:
-            found_key = normalize_known_hosts_key(l,host)
-            if new_key==found_key: #found a match
-                return True, False, found_line  #found exactly the same key, don't replace
-            elif new_key['type'] == found_key['type']: # found a different key for the same key type
-                return True, True, found_line
+    for index in lines:
+        found_key = normalize_known_hosts_key(known_hosts.lines[index],host)
+        if new_key==found_key: #found a match
+            return True, False, index  #found exactly the same key, don't replace
+        elif new_key['type'] == found_key['type']: # found a different key for the same key type
+            return True, True, index
     #No match found, return found and replace, but no line
     return True, True, None
 
@@ -269,15 +389,43 @@ def main():
 
     module = AnsibleModule(
         argument_spec = dict(
-            name      = dict(required=True,  type='str', aliases=['host']),
+            name      = dict(required=False, type='str', aliases=['host']),
             key       = dict(required=False,  type='str'),
+            keys      = dict(required=False, type='list'),
             path      = dict(default="~/.ssh/known_hosts", type='path'),
             state     = dict(default='present', choices=['absent','present']),
             ),
+        required_one_of = [['name', 'keys']],
+        mutually_exclusive = [['name', 'keys'], ['key', 'keys']],
         supports_check_mode = True
         )
 
-    results = enforce_state(module,module.params)
-    module.exit_json(**results)
+    params = module.params
+
+    if params['keys'] is None:
+        items = [params]
+    else:
+        items = []
+        for item in params['keys']:
+            if not isinstance(item, dict) or not item.get('name'):
+                module.fail_json(msg="Each item of keys needs a name, got %r" % (item,))
+            state = item.get('state', params['state'])
+            if state not in ('absent', 'present'):
+                module.fail_json(msg="state must be one of present, absent, got %s" % state)
+            items.append(dict(name=item['name'], key=item.get('key'), state=state))
+
+    #Read the file once, however many keys are managed
+    known_hosts = KnownHosts(module, params['path'])
+
+    changed = False
+    for item in items:
+        if enforce_state(module, item, known_hosts):
+            changed = True
+
+    if known_hosts.changed and not module.check_mode:
+        known_hosts.write()
+
+    params['changed'] = changed
+    module.exit_json(**params)
 
 main()
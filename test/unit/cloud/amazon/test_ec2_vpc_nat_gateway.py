@@ -261,8 +261,31 @@ class AnsibleVpcNatGatewayTasks(unittest.TestCase):
         self.failUnless(tqm._stats.ok['localhost'] == 2)
         self.assertTrue(tqm._stats.changed.has_key('localhost'))
 
+class FakeClock(object):
+    """Stands in for the time module and records the delays slept."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.delays = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.delays.append(delay)
+        self.now += delay
+
+
 class AnsibleEc2VpcNatGatewayFunctions(unittest.TestCase):
 
+    def setUp(self):
+        self.clock = FakeClock()
+        self.time = ng.time
+        ng.time = self.clock
+
+    def tearDown(self):
+        ng.time = self.time
+
     def test_convert_to_lower(self):
         example = ng.DRY_RUN_GATEWAY_UNCONVERTED
         converted_example = ng.convert_to_lower(example[0])
@@ -330,6 +353,24 @@ class AnsibleEc2VpcNatGatewayFunctions(unittest.TestCase):
         )
         self.assertFalse(success)
         self.assertEqual(gws, {})
+        self.assertAlmostEqual(sum(self.clock.delays), 2)
+
+    def test_wait_for_gateways(self):
+        client = boto3.client('ec2', region_name=aws_region)
+        success, err_msg, gws = (
+            ng.wait_for_gateways(
+                client, 2, ['nat-123456789', 'nat-12345678'], 'available',
+                check_mode=True
+            )
+        )
+        should_return = {'nat-123456789': ng.DRY_RUN_GATEWAYS[0]}
+        self.assertFalse(success)
+        self.assertEqual(gws, should_return)
+        # Jittered exponential backoff, cut short by the wait timeout
+        self.assertTrue(0.5 <= self.clock.delays[0] <= 1)
+        for i, delay in enumerate(self.clock.delays):
+            self.assertTrue(0 < delay <= 2 ** i)
+        self.assertAlmostEqual(sum(self.clock.delays), 2)
 
     def test_gateway_in_subnet_exists_with_allocation_id(self):
         client = boto3.client('ec2', region_name=aws_region)
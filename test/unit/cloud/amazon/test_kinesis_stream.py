@@ -1,6 +1,7 @@
 #!/usr/bin/python
 
 import boto3
+import botocore
 import unittest
 
 import cloud.amazon.kinesis_stream as kinesis_stream
@@ -8,8 +9,31 @@ import cloud.amazon.kinesis_stream as kinesis_stream
 aws_region = 'us-west-2'
 
 
+class FakeClock(object):
+    """Stands in for the time module and records the delays slept."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.delays = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.delays.append(delay)
+        self.now += delay
+
+
 class AnsibleKinesisStreamFunctions(unittest.TestCase):
 
+    def setUp(self):
+        self.clock = FakeClock()
+        self.time = kinesis_stream.time
+        kinesis_stream.time = self.clock
+
+    def tearDown(self):
+        kinesis_stream.time = self.time
+
     def test_convert_to_lower(self):
         example = {
             'HasMoreShards': True,
@@ -123,6 +147,111 @@ class AnsibleKinesisStreamFunctions(unittest.TestCase):
         self.assertTrue(success)
         self.assertEqual(stream, should_return)
 
+    def test_wait_for_streams(self):
+        client = boto3.client('kinesis', region_name=aws_region)
+        success, err_msg, streams = (
+            kinesis_stream.wait_for_streams(
+                client, ['test'], 'ACTIVE', check_mode=True
+            )
+        )
+        self.assertTrue(success)
+        self.assertEqual(streams['test']['StreamStatus'], 'ACTIVE')
+        self.assertEqual(self.clock.delays, [])
+
+    def test_wait_for_resources(self):
+        throttled = botocore.exceptions.ClientError(
+            {'Error': {'Code': 'LimitExceededException', 'Message': 'Rate exceeded'}},
+            'DescribeStream'
+        )
+        polls = [
+            {'a': 'CREATING', 'b': 'CREATING'},
+            throttled,
+            {'a': 'ACTIVE', 'b': 'CREATING'},
+            {'b': 'ACTIVE'},
+        ]
+        calls = []
+
+        def describe(names):
+            calls.append(list(names))
+            result = polls.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        success, err_msg, streams = kinesis_stream.wait_for_resources(
+            describe, ['a', 'b'], lambda name, status: status == 'ACTIVE'
+        )
+        self.assertTrue(success)
+        self.assertEqual(streams, {'a': 'ACTIVE', 'b': 'ACTIVE'})
+        self.assertEqual(calls, [['a', 'b'], ['a', 'b'], ['a', 'b'], ['b']])
+        # The first delay is jittered around WAIT_DELAY, throttling jumps
+        # straight to WAIT_MAX_DELAY
+        delays = self.clock.delays
+        self.assertEqual(len(delays), 3)
+        self.assertTrue(0.5 <= delays[0] <= 1)
+        self.assertTrue(15 <= delays[1] <= 30)
+        self.assertTrue(15 <= delays[2] <= 30)
+
+    def test_wait_for_resources_timeout(self):
+        success, err_msg, streams = kinesis_stream.wait_for_resources(
+            lambda names: {}, ['a'], lambda name, status: False, wait_timeout=100
+        )
+        self.assertFalse(success)
+        self.assertEqual(streams, {})
+        self.assertAlmostEqual(sum(self.clock.delays), 100)
+        for delay in self.clock.delays:
+            self.assertTrue(0 < delay <= kinesis_stream.WAIT_MAX_DELAY)
+
+    def test_plan_resharding(self):
+        self.assertEqual(kinesis_stream.plan_resharding(4, 20), [8, 16, 20])
+        self.assertEqual(kinesis_stream.plan_resharding(20, 3), [10, 5, 3])
+        self.assertEqual(kinesis_stream.plan_resharding(5, 5), [])
+
+    def test_next_split_or_merge(self):
+        shards = [
+            {
+                'ShardId': 'shardId-000000000001',
+                'HashKeyRange': {'StartingHashKey': '0', 'EndingHashKey': '99'},
+            },
+            {
+                'ShardId': 'shardId-000000000002',
+                'HashKeyRange': {'StartingHashKey': '100', 'EndingHashKey': '149'},
+            },
+            {
+                'ShardId': 'shardId-000000000003',
+                'HashKeyRange': {'StartingHashKey': '150', 'EndingHashKey': '199'},
+            },
+        ]
+        self.assertEqual(
+            kinesis_stream.next_split_or_merge(shards, 4),
+            ('split', {'ShardToSplit': 'shardId-000000000001', 'NewStartingHashKey': '50'})
+        )
+        self.assertEqual(
+            kinesis_stream.next_split_or_merge(shards, 2),
+            ('merge', {'ShardToMerge': 'shardId-000000000002', 'AdjacentShardToMerge': 'shardId-000000000003'})
+        )
+        self.assertEqual(kinesis_stream.next_split_or_merge(shards, 3), None)
+
+    def test_manage_streams(self):
+        client = boto3.client('kinesis', region_name=aws_region)
+        streams = [
+            {
+                'name': 'test', 'shards': 10, 'retention_period': None,
+                'tags': None, 'state': 'present'
+            },
+            {
+                'name': 'other', 'shards': None, 'retention_period': None,
+                'tags': None, 'state': 'absent'
+            },
+        ]
+        success, changed, err_msg, results = (
+            kinesis_stream.manage_streams(client, streams, check_mode=True)
+        )
+        self.assertTrue(success)
+        self.assertEqual(
+            [result['stream_name'] for result in results], ['test', 'other']
+        )
+
     def test_tags_action_create(self):
         client = boto3.client('kinesis', region_name=aws_region)
         tags = {
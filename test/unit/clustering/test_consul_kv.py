@@ -0,0 +1,143 @@
+#!/usr/bin/python
+
+import base64
+import json
+import threading
+import unittest
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from urlparse import urlparse, parse_qs
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from urllib.parse import urlparse, parse_qs
+
+import consul
+
+import clustering.consul_kv as consul_kv
+
+
+class FakeConsulHandler(BaseHTTPRequestHandler):
+    """Stand-in for the kv and txn endpoints of a consul agent."""
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body=None):
+        data = ''.encode('ascii')
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('X-Consul-Index', str(self.server.index))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        prefix = url.path[len('/v1/kv/'):]
+        entries = [dict(entry, Key=key) for key, entry in sorted(self.server.store.items())
+                   if key.startswith(prefix)]
+        if 'recurse' not in parse_qs(url.query, keep_blank_values=True):
+            entries = [entry for entry in entries if entry['Key'] == prefix]
+        if entries:
+            self.reply(200, entries)
+        else:
+            self.reply(404)
+
+    def do_PUT(self):
+        operations = json.loads(self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8'))
+        self.server.transactions.append(operations)
+        store = self.server.store
+        errors = []
+        for i, operation in enumerate(operations):
+            kv = operation['KV']
+            current = store.get(kv['Key'], {}).get('ModifyIndex', 0)
+            if kv['Index'] != current:
+                errors.append({'OpIndex': i, 'What': 'cas failed'})
+        if errors:
+            return self.reply(409, {'Results': None, 'Errors': errors})
+        for operation in operations:
+            kv = operation['KV']
+            self.server.index += 1
+            if kv['Verb'] == 'delete-cas':
+                del store[kv['Key']]
+            else:
+                store[kv['Key']] = {'Value': kv['Value'],
+                                    'Flags': kv.get('Flags', 0),
+                                    'ModifyIndex': self.server.index}
+        self.reply(200, {'Results': [], 'Errors': None})
+
+
+class AnsibleConsulKvFunctions(unittest.TestCase):
+
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), FakeConsulHandler)
+        self.server.store = {}
+        self.server.index = 1
+        self.server.transactions = []
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.consul_api = consul.Consul(host='127.0.0.1', port=self.server.server_port)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def store(self, key, value, flags=0):
+        self.server.index += 1
+        self.server.store[key] = {'Value': base64.b64encode(value.encode('utf-8')).decode('ascii'),
+                                  'Flags': flags,
+                                  'ModifyIndex': self.server.index}
+
+    def sync(self, desired, purge=False):
+        index, existing = self.consul_api.kv.get('app/', recurse=True)
+        operations, added, updated, deleted = consul_kv.diff_values(
+            existing, consul_kv.flatten_values(desired, 'app/'), purge=purge)
+        consul_kv.apply_operations(self.consul_api, operations)
+        return added, updated, deleted
+
+    def test_flatten_values(self):
+        flat = consul_kv.flatten_values({'db': {'host': 'db1', 'port': 5432}, 'debug': False}, 'app/')
+        self.assertEqual(flat, {'app/db/host': 'db1', 'app/db/port': '5432', 'app/debug': 'False'})
+
+    def test_sync_values(self):
+        self.store('app/keep', 'same')
+        self.store('app/change', 'old')
+        self.store('app/stale', 'gone')
+        self.store('other/key', 'untouched')
+
+        added, updated, deleted = self.sync({'keep': 'same', 'change': 'new', 'new': 'value'}, purge=True)
+
+        self.assertEqual(added, ['app/new'])
+        self.assertEqual(updated, ['app/change'])
+        self.assertEqual(deleted, ['app/stale'])
+        self.assertEqual(sorted(self.server.store), ['app/change', 'app/keep', 'app/new', 'other/key'])
+        self.assertEqual(len(self.server.transactions), 1)
+        self.assertEqual(self.sync({'keep': 'same', 'change': 'new', 'new': 'value'}, purge=True), ([], [], []))
+        self.assertEqual(len(self.server.transactions), 1)
+
+    def test_sync_values_in_chunks(self):
+        added, updated, deleted = self.sync(dict(('key%03d' % i, str(i)) for i in range(150)))
+
+        self.assertEqual(len(added), 150)
+        self.assertEqual([len(txn) for txn in self.server.transactions], [64, 64, 22])
+        self.assertEqual(len(self.server.store), 150)
+
+    def test_sync_values_concurrent_change(self):
+        self.store('app/key', 'old')
+        index, existing = self.consul_api.kv.get('app/', recurse=True)
+        operations = consul_kv.diff_values(existing, {'app/key': 'new'})[0]
+        self.store('app/key', 'changed elsewhere')
+
+        self.assertRaises(Exception, consul_kv.apply_operations, self.consul_api, operations)
+        self.assertEqual(base64.b64decode(self.server.store['app/key']['Value']), 'changed elsewhere'.encode('ascii'))
+
+    def test_sync_values_keeps_flags(self):
+        self.store('app/key', 'old', flags=42)
+
+        self.sync({'key': 'new'})
+
+        self.assertEqual(self.server.store['app/key']['Flags'], 42)
@@ -0,0 +1,138 @@
+#!/usr/bin/python
+
+import json
+import threading
+import unittest
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+import clustering.kubernetes as kubernetes
+
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+    """Stand-in for the list, create and patch calls of the Kubernetes API."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_body(self):
+        return json.loads(self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8'))
+
+    def do_GET(self):
+        self.server.requests.append(('GET', self.path))
+        items = [obj for path, obj in sorted(self.server.objects.items())
+                 if path.rsplit('/', 1)[0] == self.path]
+        self.reply(200, {'kind': 'List', 'items': items})
+
+    def do_POST(self):
+        self.server.requests.append(('POST', self.path))
+        obj = self.read_body()
+        parts = self.path.split('/')
+        if len(parts) > 5 and '/'.join(parts[:5]) not in self.server.objects:
+            return self.reply(404, {'message': 'namespaces "%s" not found' % parts[4]})
+        obj['metadata']['resourceVersion'] = '1'
+        obj['status'] = {'phase': 'Active'}
+        self.server.objects[self.path + '/' + obj['metadata']['name']] = obj
+        self.reply(201, obj)
+
+    def do_PATCH(self):
+        self.server.requests.append(('PATCH', self.path))
+        patch = self.read_body()
+        obj = self.server.objects[self.path]
+        if patch['metadata']['resourceVersion'] != obj['metadata']['resourceVersion']:
+            return self.reply(409, {'message': 'the object has been modified'})
+        obj['metadata']['labels'] = patch['metadata'].get('labels', {})
+        obj['metadata']['resourceVersion'] = str(int(obj['metadata']['resourceVersion']) + 1)
+        self.reply(200, obj)
+
+
+class FakeApiServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class AnsibleKubernetesFunctions(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeApiServer(('127.0.0.1', 0), FakeApiHandler)
+        self.server.objects = {}
+        self.server.requests = []
+        self.server.connections = 0
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        host = '127.0.0.1:%d' % self.server.server_port
+        self.connect = lambda: kubernetes.K8sConnection(host, secure=False)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def namespace(self, name, **labels):
+        return {'kind': 'Namespace', 'apiVersion': 'v1',
+                'metadata': {'name': name, 'labels': labels}}
+
+    def test_k8s_matches(self):
+        desired = {'metadata': {'name': 'a', 'labels': {'env': 'prod'}},
+                   'spec': {'ports': [{'port': 80}]}}
+        live = {'metadata': {'name': 'a', 'labels': {'env': 'prod'}, 'uid': 'x'},
+                'spec': {'ports': [{'port': 80, 'protocol': 'TCP'}]}, 'status': {}}
+        self.assertTrue(kubernetes.k8s_matches(desired, live))
+        self.assertFalse(kubernetes.k8s_matches({'metadata': {'labels': {'env': 'dev'}}}, live))
+        self.assertFalse(kubernetes.k8s_matches({'spec': {'ports': []}}, live))
+
+    def test_k8s_apply_resources(self):
+        data = [self.namespace('ns%d' % i, env='prod') for i in range(10)]
+
+        changed, body, summary = kubernetes.k8s_apply_resources(self.connect, data, workers=2)
+        self.assertTrue(changed)
+        self.assertEqual(len(summary['created']), 10)
+        self.assertEqual([obj['metadata']['name'] for obj in body], ['ns%d' % i for i in range(10)])
+        self.assertTrue(self.server.connections <= 3)
+
+        data[3]['metadata']['labels']['env'] = 'dev'
+        del self.server.requests[:]
+        changed, body, summary = kubernetes.k8s_apply_resources(self.connect, data, workers=2)
+        self.assertTrue(changed)
+        self.assertEqual(summary['updated'], ['/api/v1/namespaces/ns3'])
+        self.assertEqual(len(summary['unchanged']), 9)
+        self.assertEqual(self.server.requests, [('GET', '/api/v1/namespaces'),
+                                                ('PATCH', '/api/v1/namespaces/ns3')])
+        self.assertEqual(body[3]['metadata']['labels'], {'env': 'dev'})
+
+        changed, body, summary = kubernetes.k8s_apply_resources(self.connect, data, workers=2)
+        self.assertFalse(changed)
+
+    def test_k8s_apply_resources_invalid_kind(self):
+        self.assertRaises(ValueError, kubernetes.k8s_apply_resources, self.connect,
+                          [{'kind': 'Widget', 'metadata': {'name': 'a'}}])
+
+    def test_k8s_apply_resources_namespace_first(self):
+        data = [{'kind': 'Service', 'apiVersion': 'v1',
+                 'metadata': {'name': 'svc%d' % i, 'namespace': 'app'}} for i in range(5)]
+        data.append(self.namespace('app'))
+
+        changed, body, summary = kubernetes.k8s_apply_resources(self.connect, data, workers=4)
+        self.assertTrue(changed)
+        self.assertEqual(len(summary['created']), 6)
+        posts = [path for method, path in self.server.requests if method == 'POST']
+        self.assertEqual(posts[0], '/api/v1/namespaces')
+        self.assertEqual(sorted(posts[1:]), ['/api/v1/namespaces/app/services'] * 5)
@@ -0,0 +1,45 @@
+#!/usr/bin/python
+
+import unittest
+
+import packaging.os.pacman as pacman
+
+# pacman -Sgg output, which repeats the group name for each of its members
+PACMAN_SGG = """\
+base bash
+base bzip2
+base coreutils
+base-devel autoconf
+base-devel automake
+base-devel binutils
+gnome eog
+xorg xorg-server
+xorg xorg-xinit
+"""
+
+
+class FakeModule(object):
+
+    def __init__(self, outputs):
+        self.outputs = outputs
+        self.commands = []
+
+    def run_command(self, cmd, check_rc=False):
+        self.commands.append(cmd)
+        return 0, self.outputs.get(cmd.split()[-1], ''), ''
+
+
+class AnsiblePacmanFunctions(unittest.TestCase):
+
+    def test_expand_package_groups(self):
+        module = FakeModule({'-Sgg': PACMAN_SGG})
+
+        pkgs = pacman.expand_package_groups(module, '/usr/bin/pacman', ['base-devel', 'vim', 'xorg'])
+
+        self.assertEqual(module.commands, ['/usr/bin/pacman -Sgg'])
+        self.assertEqual(pkgs, ['autoconf', 'automake', 'binutils', 'vim', 'xorg-server', 'xorg-xinit'])
+
+    def test_expand_package_groups_no_groups(self):
+        module = FakeModule({})
+
+        self.assertEqual(pacman.expand_package_groups(module, '/usr/bin/pacman', ['vim']), ['vim'])
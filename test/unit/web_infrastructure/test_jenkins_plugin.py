@@ -0,0 +1,214 @@
+#!/usr/bin/python
+
+import base64
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+import web_infrastructure.jenkins_plugin as jenkins_plugin
+
+
+PLUGINS = {
+    'git': {'version': '3.0.0', 'dependencies': [
+        {'name': 'scm-api', 'version': '1.2', 'optional': False},
+        {'name': 'credentials', 'version': '2.1', 'optional': False},
+        {'name': 'token-macro', 'version': '1.0', 'optional': True}]},
+    'scm-api': {'version': '1.3', 'dependencies': [
+        {'name': 'credentials', 'version': '2.0', 'optional': False}]},
+    'credentials': {'version': '2.1.8', 'dependencies': []},
+    'token-macro': {'version': '2.0', 'dependencies': []},
+}
+
+
+def plugin_data(name, version):
+    return ('%s-%s' % (name, version)).encode('ascii') * 1000
+
+
+def write_file(path, data):
+    f = open(path, 'wb')
+    try:
+        f.write(data)
+    finally:
+        f.close()
+
+
+def update_center(base_url):
+    plugins = {}
+    for name, plugin in PLUGINS.items():
+        data = plugin_data(name, plugin['version'])
+        plugins[name] = dict(
+            plugin,
+            name=name,
+            sha1=base64.b64encode(hashlib.sha1(data).digest()).decode('ascii'),
+            url='%s/latest/%s.hpi' % (base_url, name))
+    return 'updateCenter.post(\n%s\n);' % json.dumps({'plugins': plugins})
+
+
+class FakeJenkinsHandler(BaseHTTPRequestHandler):
+    """Stand-in for the Jenkins API and the update centre."""
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, data):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        parts = self.path.strip('/').split('/')
+        if self.path == '/api/json':
+            data = json.dumps({'useCrumbs': False})
+        elif self.path.startswith('/pluginManager/api/json'):
+            data = json.dumps({'plugins': [
+                {'shortName': name, 'version': version, 'pinned': False, 'enabled': True}
+                for name, version in self.server.installed.items()]})
+        elif self.path == '/update-center.json':
+            data = update_center('http://127.0.0.1:%d' % self.server.server_port)
+        elif parts[0] == 'latest' and parts[1][:-4] in PLUGINS:
+            name = parts[1][:-4]
+            return self.reply(200, plugin_data(name, PLUGINS[name]['version']))
+        elif parts[0] == 'download' and len(parts) == 5:
+            return self.reply(200, plugin_data(parts[2], parts[3]))
+        else:
+            return self.reply(404, ''.encode('ascii'))
+        self.reply(200, data.encode('utf-8'))
+
+
+class FakeJenkinsServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class ModuleFailed(Exception):
+    pass
+
+
+class FakeModule(object):
+
+    check_mode = False
+    tmpdir = tempfile.gettempdir()
+
+    def __init__(self, **params):
+        self.params = params
+
+    def fail_json(self, **kwargs):
+        raise ModuleFailed(kwargs)
+
+    def atomic_move(self, src, dest):
+        os.rename(src, dest)
+
+    def load_file_common_arguments(self, params):
+        return {}
+
+    def set_fs_attributes_if_different(self, file_args, changed):
+        return changed
+
+
+class AnsibleJenkinsPluginFunctions(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeJenkinsServer(('127.0.0.1', 0), FakeJenkinsHandler)
+        self.server.requests = []
+        self.server.installed = {}
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.url = 'http://127.0.0.1:%d' % self.server.server_port
+        self.index = jenkins_plugin.parse_update_center(update_center(self.url))
+
+        self.home = tempfile.mkdtemp()
+        self.environ_home = os.environ.get('HOME')
+        os.environ['HOME'] = self.home
+        os.mkdir(os.path.join(self.home, 'plugins'))
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.environ_home is not None:
+            os.environ['HOME'] = self.environ_home
+        shutil.rmtree(self.home)
+
+    def jenkins(self, plugins, version=None):
+        module = FakeModule(
+            url=self.url, updates_url=self.url, jenkins_home=self.home,
+            name=None, plugins=plugins, version=version, timeout=10,
+            updates_expiration=86400, with_dependencies=True, workers=2,
+            force_basic_auth=True, url_username=None, url_password=None,
+            validate_certs=True, use_proxy=True, http_agent=None,
+            force=False, client_cert=None, client_key=None)
+        return jenkins_plugin.JenkinsPlugin(module)
+
+    def test_parse_update_center(self):
+        self.assertEqual(sorted(self.index), ['credentials', 'git', 'scm-api', 'token-macro'])
+        self.assertEqual(self.index['scm-api']['dependencies'],
+                         [{'name': 'credentials', 'version': '2.0', 'optional': False}])
+
+    def test_resolve_plugins(self):
+        resolved = jenkins_plugin.resolve_plugins(self.index, [('git', None)])
+        self.assertEqual([item['name'] for item in resolved], ['git', 'scm-api', 'credentials'])
+        self.assertEqual(resolved[2]['minimum'], '2.1')
+
+        resolved = jenkins_plugin.resolve_plugins(self.index, [('git', '2.0')])
+        self.assertEqual(resolved, [{'name': 'git', 'version': '2.0', 'minimum': None}])
+
+        self.assertRaises(ValueError, jenkins_plugin.resolve_plugins, self.index, [('missing', None)])
+
+    def test_file_digests(self):
+        path = os.path.join(self.home, 'plugin.hpi')
+        data = plugin_data('git', '3.0.0')
+        write_file(path, data)
+        self.assertEqual(jenkins_plugin.file_digests(path),
+                         (hashlib.md5(data).hexdigest(), self.index['git']['sha1']))
+
+    def test_install_plugins(self):
+        changed, plugins = self.jenkins(['git', {'name': 'token-macro', 'version': '1.5'}]).install_plugins()
+
+        self.assertTrue(changed)
+        self.assertEqual(sorted(plugins), ['credentials', 'git', 'scm-api', 'token-macro'])
+        f = open(os.path.join(self.home, 'plugins', 'token-macro.jpi'), 'rb')
+        try:
+            self.assertEqual(f.read(), plugin_data('token-macro', '1.5'))
+        finally:
+            f.close()
+        self.assertEqual(sorted(os.listdir(os.path.join(self.home, 'plugins'))),
+                         ['credentials.jpi', 'git.jpi', 'scm-api.jpi', 'token-macro.jpi'])
+        self.assertEqual(self.server.requests.count('/update-center.json'), 1)
+
+        # The index is cached on disk and nothing but the versioned plugin
+        # is downloaded again
+        self.server.installed = {'git': '3.0.0', 'scm-api': '1.3', 'credentials': '2.1.8'}
+        del self.server.requests[:]
+        changed, plugins = self.jenkins(['git', {'name': 'token-macro', 'version': '1.5'}]).install_plugins()
+
+        self.assertFalse(changed)
+        self.assertEqual(plugins, [])
+        self.assertNotIn('/update-center.json', self.server.requests)
+        self.assertEqual([path for path in self.server.requests if path.endswith('.hpi')],
+                         ['/download/plugins/token-macro/1.5/token-macro.hpi'])
+
+    def test_install_plugins_outdated_dependency(self):
+        self.server.installed = {'git': '3.0.0', 'scm-api': '1.3', 'credentials': '2.0'}
+        for name in self.server.installed:
+            write_file(os.path.join(self.home, 'plugins', name + '.jpi'),
+                       plugin_data(name, self.server.installed[name]))
+
+        changed, plugins = self.jenkins(['git']).install_plugins()
+
+        self.assertTrue(changed)
+        self.assertEqual(plugins, ['credentials'])
+
+    def test_install_plugins_missing(self):
+        self.assertRaises(ModuleFailed, self.jenkins(['missing']).install_plugins)
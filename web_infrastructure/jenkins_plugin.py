@@ -23,11 +23,13 @@ from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.pycompat24 import get_exception
 from ansible.module_utils.urls import fetch_url
 from ansible.module_utils.urls import url_argument_spec
+from distutils.version import LooseVersion
 import base64
 import hashlib
 import json
 import os
 import tempfile
+import threading
 import time
 import urllib
 
@@ -58,14 +60,27 @@ options:
     description:
       - File mode applied on versioned plugins.
   name:
-    required: true
+    required: false
+    default: null
     description:
       - Plugin name.
+      - Either I(name) or I(plugins) is required.
   owner:
     required: false
     default: jenkins
     description:
       - Name of the Jenkins user on the OS.
+  plugins:
+    required: false
+    default: null
+    version_added: "2.3"
+    description:
+      - List of plugins to install at once. Each item is either a plugin
+        name or a dictionary with the I(name) and I(version) keys.
+      - The update centre index is parsed only once and dependencies are
+        resolved locally from it. Plugins which are missing or outdated are
+        downloaded in parallel directly into the plugins directory.
+      - Only the C(present) and C(latest) states are supported.
   params:
     required: false
     default: null
@@ -122,6 +137,12 @@ options:
     default: 'yes'
     description:
       - Defines whether to install plugin dependencies.
+  workers:
+    required: false
+    default: 4
+    version_added: "2.3"
+    description:
+      - Number of plugins downloaded in parallel when I(plugins) is used.
 
 notes:
   - Plugin installation shoud be run under root or the same user which owns
@@ -157,6 +178,15 @@ EXAMPLES = '''
     name: token-macro
     version: 1.15
 
+- name: Install several plugins and their dependencies at once
+  jenkins_plugin:
+    plugins:
+      - build-pipeline-plugin
+      - git
+      - name: token-macro
+        version: 1.15
+    workers: 8
+
 - name: Pin the plugin
   jenkins_plugin:
     name: token-macro
@@ -294,6 +324,11 @@ plugin:
     returned: success
     type: string
     sample: build-pipeline-plugin
+plugins:
+    description: plugins which were installed or updated
+    returned: when plugins is used
+    type: list
+    sample: ["git", "scm-api"]
 state:
     description: state of the target, after execution
     returned: success
@@ -302,6 +337,100 @@ state:
 '''
 
 
+# Size of the blocks in which plugin files are read, hashed and written
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_update_center(data):
+    """Build the plugin index from the update-center.json data.
+
+    The file is JSONP; only the name, version, checksum, download URL and
+    dependencies of each plugin are kept.
+    """
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+
+    data = json.loads(data[data.index('{'):data.rindex('}') + 1])
+
+    index = {}
+    for name, plugin in data.get('plugins', {}).items():
+        index[name] = {
+            'version': plugin.get('version'),
+            'sha1': plugin.get('sha1'),
+            'url': plugin.get('url'),
+            'dependencies': [
+                {
+                    'name': dep['name'],
+                    'version': dep.get('version'),
+                    'optional': dep.get('optional', False)
+                } for dep in plugin.get('dependencies', [])]
+        }
+
+    return index
+
+
+def resolve_plugins(index, requested, with_dependencies=True):
+    """Return the requested plugins and their transitive dependencies.
+
+    requested is a list of (name, version) pairs. Each returned item has
+    the plugin name, its requested version (None for the current one)
+    and, for dependencies, the minimum version required. Dependencies of
+    plugins with a specific version are not resolved.
+    """
+    resolved = []
+    seen = set()
+    queue = [
+        {'name': name, 'version': version, 'minimum': None}
+        for name, version in requested]
+
+    while queue:
+        item = queue.pop(0)
+
+        if item['name'] in seen:
+            continue
+
+        seen.add(item['name'])
+
+        if item['version'] in [None, 'latest'] and item['name'] not in index:
+            raise ValueError(
+                "Cannot find plugin %s in the updates file." % item['name'])
+
+        resolved.append(item)
+
+        if with_dependencies and item['version'] in [None, 'latest']:
+            for dep in index[item['name']]['dependencies']:
+                if not dep['optional']:
+                    queue.append({
+                        'name': dep['name'],
+                        'version': None,
+                        'minimum': dep['version']})
+
+    return resolved
+
+
+def file_digests(path):
+    """Return the MD5 hex digest and base64 SHA1 digest of a file,
+    reading it in chunks."""
+    md5 = hashlib.md5()
+    sha1 = hashlib.sha1()
+
+    f = open(path, 'rb')
+
+    try:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+
+            if not chunk:
+                break
+
+            md5.update(chunk)
+            sha1.update(chunk)
+    finally:
+        f.close()
+
+    return md5.hexdigest(), base64.b64encode(sha1.digest()).decode('ascii')
+
+
 class JenkinsPlugin(object):
     def __init__(self, module):
         # To be able to call fail_json
@@ -315,6 +444,9 @@ class JenkinsPlugin(object):
         # Crumb
         self.crumb = {}
 
+        # Plugin index of the update center
+        self.updates_index = None
+
         if self._csrf_enabled():
             self.crumb = self._get_crumb()
 
@@ -393,6 +525,8 @@ class JenkinsPlugin(object):
         self.is_installed = False
         self.is_pinned = False
         self.is_enabled = False
+        self.installed = dict(
+            (p['shortName'], p) for p in plugins_data['plugins'])
 
         for p in plugins_data['plugins']:
             if p['shortName'] == self.params['name']:
@@ -449,23 +583,10 @@ class JenkinsPlugin(object):
             md5sum_old = None
             if os.path.isfile(plugin_file):
                 # Make the checksum of the currently installed plugin
-                md5sum_old = hashlib.md5(
-                    open(plugin_file, 'rb').read()).hexdigest()
-
-            if self.params['version'] in [None, 'latest']:
-                # Take latest version
-                plugin_url = (
-                    "%s/latest/%s.hpi" % (
-                        self.params['updates_url'],
-                        self.params['name']))
-            else:
-                # Take specific version
-                plugin_url = (
-                    "{0}/download/plugins/"
-                    "{1}/{2}/{1}.hpi".format(
-                        self.params['updates_url'],
-                        self.params['name'],
-                        self.params['version']))
+                md5sum_old = file_digests(plugin_file)[0]
+
+            plugin_url = self._plugin_url(
+                self.params['name'], self.params['version'])
 
             if (
                     self.params['updates_expiration'] == 0 or
@@ -501,15 +622,13 @@ class JenkinsPlugin(object):
                 plugin_data = self._download_updates()
 
                 try:
-                    sha1_old = hashlib.sha1(open(plugin_file, 'rb').read())
+                    sha1sum_old = file_digests(plugin_file)[1]
                 except Exception:
                     e = get_exception()
                     self.module.fail_json(
                         msg="Cannot calculate SHA1 of the old plugin.",
                         details=e.message)
 
-                sha1sum_old = base64.b64encode(sha1_old.digest())
-
                 # If the latest version changed, download it
                 if sha1sum_old != plugin_data['sha1']:
                     if not self.module.check_mode:
@@ -536,99 +655,285 @@ class JenkinsPlugin(object):
 
         return changed
 
-    def _download_updates(self):
-        updates_filename = 'jenkins-plugin-cache.json'
+    def _get_updates_index(self):
+        # Parsed once per run and cached on disk for updates_expiration
+        if self.updates_index is not None:
+            return self.updates_index
+
         updates_dir = os.path.expanduser('~/.ansible/tmp')
-        updates_file = "%s/%s" % (updates_dir, updates_filename)
-        download_updates = True
+        index_file = "%s/%s" % (updates_dir, 'jenkins-plugin-index.json')
 
-        # Check if we need to download new updates file
-        if os.path.isfile(updates_file):
-            # Get timestamp when the file was changed last time
-            ts_file = os.stat(updates_file).st_mtime
-            ts_now = time.time()
+        # Use the cached index if it's fresh enough
+        if (
+                os.path.isfile(index_file) and
+                time.time() - os.stat(index_file).st_mtime <
+                self.params['updates_expiration']):
+            try:
+                f = open(index_file)
 
-            if ts_now - ts_file < self.params['updates_expiration']:
-                download_updates = False
+                try:
+                    self.updates_index = json.load(f)
+                finally:
+                    f.close()
 
-        updates_file_orig = updates_file
+                return self.updates_index
+            except (IOError, ValueError):
+                pass
 
-        # Download the updates file if needed
-        if download_updates:
-            url = "%s/update-center.json" % self.params['updates_url']
+        # Download and index the updates file
+        url = "%s/update-center.json" % self.params['updates_url']
 
-            # Get the data
-            r = self._get_url_data(
-                url,
-                msg_status="Remote updates not found.",
-                msg_exception="Updates download failed.")
+        r = self._get_url_data(
+            url,
+            msg_status="Remote updates not found.",
+            msg_exception="Updates download failed.")
 
-            # Write the updates file
-            updates_file = tempfile.mkstemp()
+        try:
+            self.updates_index = parse_update_center(r.read())
+        except Exception:
+            e = get_exception()
+            self.module.fail_json(
+                msg="Cannot load JSON data from the updates file.",
+                details=str(e))
 
+        # Make sure the destination directory exists
+        if not os.path.isdir(updates_dir):
             try:
-                fd = open(updates_file, 'wb')
-            except IOError:
+                os.makedirs(updates_dir, int('0700', 8))
+            except OSError:
                 e = get_exception()
                 self.module.fail_json(
-                    msg="Cannot open the tmp updates file %s." % updates_file,
+                    msg="Cannot create temporal directory.",
                     details=str(e))
 
-            fd.write(r.read())
+        # Store the index into a temp file and then move it
+        try:
+            fd, tmp_f = tempfile.mkstemp(dir=updates_dir)
 
-            try:
-                fd.close()
-            except IOError:
-                e = get_exception()
-                self.module.fail_json(
-                    msg="Cannot close the tmp updates file %s." % updates_file,
-                    detail=str(e))
+            f = os.fdopen(fd, 'w')
 
-        # Open the updates file
-        try:
-            f = open(updates_file)
-        except IOError:
+            try:
+                json.dump(self.updates_index, f)
+            finally:
+                f.close()
+        except (IOError, OSError):
             e = get_exception()
             self.module.fail_json(
-                msg="Cannot open temporal updates file.",
+                msg="Cannot write the updates index file.",
                 details=str(e))
 
-        i = 0
-        for line in f:
-            # Read only the second line
-            if i == 1:
+        self.module.atomic_move(tmp_f, index_file)
+
+        return self.updates_index
+
+    def _download_updates(self):
+        index = self._get_updates_index()
+
+        # Check if we have the plugin data available
+        if self.params['name'] not in index:
+            self.module.fail_json(
+                msg="Cannot find plugin data in the updates file.")
+
+        return index[self.params['name']]
+
+    def _plugin_url(self, name, version):
+        if version in [None, 'latest']:
+            # Take latest version
+            return "%s/latest/%s.hpi" % (self.params['updates_url'], name)
+        else:
+            # Take specific version
+            return (
+                "{0}/download/plugins/"
+                "{1}/{2}/{1}.hpi".format(
+                    self.params['updates_url'], name, version))
+
+    def _fetch_plugin(self, url, directory):
+        # Stream the plugin into a temp file, hashing it on the way. This
+        # runs in worker threads, so it raises instead of failing.
+        response, info = fetch_url(self.module, url, timeout=self.timeout)
+
+        if info['status'] != 200:
+            raise Exception(
+                "Plugin download from %s failed: %s" % (url, info['msg']))
+
+        md5 = hashlib.md5()
+        sha1 = hashlib.sha1()
+        fd, tmp_f = tempfile.mkstemp(dir=directory, suffix='.tmp')
+
+        try:
+            f = os.fdopen(fd, 'wb')
+
+            try:
+                while True:
+                    chunk = response.read(CHUNK_SIZE)
+
+                    if not chunk:
+                        break
+
+                    md5.update(chunk)
+                    sha1.update(chunk)
+                    f.write(chunk)
+            finally:
+                f.close()
+        except Exception:
+            os.remove(tmp_f)
+            raise
+
+        return (
+            tmp_f, md5.hexdigest(),
+            base64.b64encode(sha1.digest()).decode('ascii'))
+
+    def _map(self, func, items):
+        # Run func on each item in up to 'workers' threads
+        results = [None] * len(items)
+        errors = []
+        pending = list(range(len(items)))
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                lock.acquire()
+
                 try:
-                    data = json.loads(line)
+                    if not pending:
+                        return
+
+                    i = pending.pop(0)
+                finally:
+                    lock.release()
+
+                try:
+                    results[i] = func(items[i])
                 except Exception:
-                    e = get_exception()
-                    self.module.fail_json(
-                        msg="Cannot load JSON data from the tmp updates file.",
-                        details=e.message)
+                    errors.append(str(get_exception()))
 
-                break
+        threads = []
 
-            i += 1
+        for _ in range(min(self.params['workers'], len(items))):
+            t = threading.Thread(target=worker)
+            t.daemon = True
+            t.start()
+            threads.append(t)
 
-        # Move the updates file to the right place if we could read it
-        if download_updates:
-            # Make sure the destination directory exists
-            if not os.path.isdir(updates_dir):
-                try:
-                    os.makedirs(updates_dir, int('0700', 8))
-                except OSError:
-                    e = get_exception()
-                    self.module.fail_json(
-                        msg="Cannot create temporal directory.",
-                        details=e.message)
+        for t in threads:
+            t.join()
 
-            self.module.atomic_move(updates_file, updates_file_orig)
+        return results, errors
 
-        # Check if we have the plugin data available
-        if 'plugins' not in data or self.params['name'] not in data['plugins']:
+    def install_plugins(self):
+        plugins_dir = '%s/plugins' % self.params['jenkins_home']
+
+        # Check if the plugin directory exists
+        if not os.path.isdir(plugins_dir):
             self.module.fail_json(
-                msg="Cannot find plugin data in the updates file.")
+                msg="Jenkins plugins directory doesn't exist.")
 
-        return data['plugins'][self.params['name']]
+        requested = []
+
+        for plugin in self.params['plugins']:
+            if isinstance(plugin, dict):
+                requested.append((
+                    plugin['name'],
+                    plugin.get('version') or self.params['version']))
+            else:
+                requested.append((plugin, self.params['version']))
+
+        index = self._get_updates_index()
+
+        try:
+            resolved = resolve_plugins(
+                index, requested, self.params['with_dependencies'])
+        except ValueError:
+            e = get_exception()
+            self.module.fail_json(msg=str(e))
+
+        # Decide locally which plugins need to be downloaded
+        downloads = []
+
+        for item in resolved:
+            name = item['name']
+            plugin_file = '%s/%s.jpi' % (plugins_dir, name)
+            exists = os.path.isfile(plugin_file)
+            installed = self.installed.get(name)
+
+            if item['version'] not in [None, 'latest']:
+                # Specific version, compared by its MD5 after download
+                downloads.append((item, None))
+            elif not exists and installed is None:
+                downloads.append((item, index[name]['sha1']))
+            elif (
+                    item['version'] == 'latest' or
+                    item['minimum'] is not None and (
+                        installed is None or
+                        LooseVersion(str(installed['version'])) <
+                        LooseVersion(str(item['minimum'])))):
+                # Update if the file isn't the current version
+                if (
+                        not exists or
+                        file_digests(plugin_file)[1] != index[name]['sha1']):
+                    downloads.append((item, index[name]['sha1']))
+
+        def fetch(download):
+            item, sha1 = download
+            version = item['version']
+
+            if sha1 is not None:
+                version = None
+
+            tmp_f, md5sum, sha1sum = self._fetch_plugin(
+                self._plugin_url(item['name'], version), plugins_dir)
+
+            if sha1 is not None and sha1sum != sha1:
+                os.remove(tmp_f)
+                raise Exception(
+                    "Checksum of plugin %s doesn't match the updates "
+                    "file." % item['name'])
+
+            return tmp_f, md5sum
+
+        results, errors = self._map(fetch, downloads)
+
+        changed_plugins = []
+
+        for (item, sha1), result in zip(downloads, results):
+            if result is None:
+                continue
+
+            tmp_f, md5sum = result
+            plugin_file = '%s/%s.jpi' % (plugins_dir, item['name'])
+
+            if (
+                    os.path.isfile(plugin_file) and
+                    file_digests(plugin_file)[0] == md5sum):
+                os.remove(tmp_f)
+            elif self.module.check_mode:
+                os.remove(tmp_f)
+                changed_plugins.append(item['name'])
+            else:
+                self.module.atomic_move(tmp_f, plugin_file)
+                changed_plugins.append(item['name'])
+
+        if errors:
+            self.module.fail_json(
+                msg="Plugin installation has failed.",
+                details=errors, plugins=changed_plugins)
+
+        changed = len(changed_plugins) > 0
+
+        # Change file attributes if needed
+        for item in resolved:
+            plugin_file = '%s/%s.jpi' % (plugins_dir, item['name'])
+
+            if os.path.isfile(plugin_file) and not self.module.check_mode:
+                params = {
+                    'dest': plugin_file
+                }
+                params.update(self.params)
+                file_args = self.module.load_file_common_arguments(params)
+                changed = self.module.set_fs_attributes_if_different(
+                    file_args, changed)
+
+        return changed, changed_plugins
 
     def _download_plugin(self, plugin_url):
         # Download the plugin
@@ -747,7 +1052,7 @@ def main():
         group=dict(default='jenkins'),
         jenkins_home=dict(default='/var/lib/jenkins'),
         mode=dict(default='0644', type='raw'),
-        name=dict(required=True),
+        name=dict(),
         owner=dict(default='jenkins'),
         params=dict(type='dict'),
         state=dict(
@@ -767,12 +1072,16 @@ def main():
         url_password=dict(no_log=True),
         version=dict(),
         with_dependencies=dict(default=True, type='bool'),
+        plugins=dict(type='list'),
+        workers=dict(default=4, type='int'),
     )
     # Module settings
     module = AnsibleModule(
         argument_spec=argument_spec,
         add_file_common_args=True,
         supports_check_mode=True,
+        required_one_of=[['name', 'plugins']],
+        mutually_exclusive=[['name', 'plugins']],
     )
 
     # Update module parameters by user's parameters if defined
@@ -808,6 +1117,16 @@ def main():
     # Instantiate the JenkinsPlugin object
     jp = JenkinsPlugin(module)
 
+    # Install a list of plugins at once
+    if module.params['plugins'] is not None:
+        if state != 'present':
+            module.fail_json(
+                msg="The plugins option requires state present or latest.")
+
+        changed, plugins = jp.install_plugins()
+
+        module.exit_json(changed=changed, plugins=plugins, state=state)
+
     # Perform action depending on the requested state
     if state == 'present':
         changed = jp.install()